@@ -0,0 +1,163 @@
+"""
+Account lookups shared by registration, the username check and login
+Usernames and emails are unique across users and companies regardless of
+case. One UNION ALL query answers every uniqueness question a form asks or
+finds the account behind a login id, and a per-process Bloom filter answers
+"definitely free" without a query at all
+"""
+import math
+import hashlib
+import threading
+import time
+
+# Unique account fields -> (table, indexed expression) pairs that hold them
+UNIQUE_FIELDS = {
+    'username': (('users', 'lower(username)'), ('companies', 'lower(username)')),
+    'email': (('users', 'lower(email)'), ('companies', 'lower(email)')),
+    'business_number': (('companies', 'business_number'),),
+}
+
+
+def normalize(field, value):
+    """The form of a value its unique index compares"""
+    value = (value or '').strip()
+    return value if field == 'business_number' else value.lower()
+
+
+def taken_fields(db, **values):
+    """Names of the given fields whose value already belongs to an account
+
+    Every (field, table) pair is one branch of a single UNION ALL, each
+    served by its own unique index.
+    """
+    branches = []
+    params = []
+    for field, value in values.items():
+        if not value:
+            continue
+        for table, expression in UNIQUE_FIELDS[field]:
+            branches.append(f"SELECT '{field}' AS field FROM {table} WHERE {expression} = %s")
+            params.append(normalize(field, value))
+    if not branches:
+        return set()
+    return {row['field'] for row in db.fetchall(' UNION ALL '.join(branches), tuple(params))}
+
+
+def resolve_identity(db, login_id):
+    """Accounts whose email or username is `login_id`, companies first
+
+    One query with a branch per (table, column), each served by a lower()
+    unique index; an OR across the two columns could use neither. Rows are
+    dicts with account_type ('company' or 'worker'), id, name, username,
+    email and password_hash.
+    """
+    key = normalize('email', login_id)
+    if not key:
+        return []
+    rows = db.fetchall('''
+        SELECT 0 AS priority, 'company' AS account_type, id, company_name AS name, username, email, password_hash
+        FROM companies WHERE lower(email) = %s
+        UNION ALL
+        SELECT 0, 'company', id, company_name, username, email, password_hash
+        FROM companies WHERE lower(username) = %s
+        UNION ALL
+        SELECT 1, 'worker', id, name, username, email, password_hash
+        FROM users WHERE lower(email) = %s
+        UNION ALL
+        SELECT 1, 'worker', id, name, username, email, password_hash
+        FROM users WHERE lower(username) = %s
+    ''', (key, key, key, key))
+    accounts = {}
+    for row in sorted(rows, key=lambda row: row['priority']):
+        accounts.setdefault((row['account_type'], row['id']), row)
+    return list(accounts.values())
+
+
+def update_password_hash(db, account_type, account_id, password_hash):
+    """Store a new password hash for an account found by resolve_identity; the caller commits"""
+    if account_type == 'company':
+        db.execute('UPDATE companies SET password_hash = %s WHERE id = %s', (password_hash, account_id))
+    else:
+        # users.password mirrors the hash for older code paths
+        db.execute('UPDATE users SET password = %s, password_hash = %s WHERE id = %s',
+                   (password_hash, password_hash, account_id))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(1024, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class AccountAvailability:
+    """Username availability with a Bloom filter of the names and emails in use
+
+    The filter is rebuilt every `ttl` seconds, so accounts created by other
+    processes since the last rebuild can be missed: a "free" answer is a hint
+    for the live check, and `taken` (always a query) plus the unique indexes
+    stay the authority at registration.
+    """
+
+    def __init__(self, ttl=300, error_rate=0.01):
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._filter = None
+        self._expires_at = 0.0
+
+    def _load(self, db):
+        rows = db.fetchall('''
+            SELECT 'username' AS field, lower(username) AS value FROM users
+            UNION ALL SELECT 'username', lower(username) FROM companies WHERE username IS NOT NULL
+            UNION ALL SELECT 'email', lower(email) FROM users
+            UNION ALL SELECT 'email', lower(email) FROM companies
+        ''')
+        # Headroom for the accounts this process adds before the next rebuild
+        bloom = BloomFilter(2 * len(rows) + 1000, self.error_rate)
+        for row in rows:
+            bloom.add(f"{row['field']}:{row['value']}")
+        return bloom
+
+    def _current(self, db):
+        with self._lock:
+            if self._filter is None or time.monotonic() >= self._expires_at:
+                self._filter = self._load(db)
+                self._expires_at = time.monotonic() + self.ttl
+            return self._filter
+
+    def username_available(self, db, username):
+        """True if no user or company has this username (case-insensitive)"""
+        if f"username:{normalize('username', username)}" not in self._current(db):
+            return True
+        return 'username' not in taken_fields(db, username=username)
+
+    def taken(self, db, **values):
+        """Fields among `values` already registered; always asks the database"""
+        return taken_fields(db, **values)
+
+    def remember(self, **values):
+        """Record a newly created account so this process stops reporting it free"""
+        with self._lock:
+            if self._filter is None:
+                return
+            for field, value in values.items():
+                if value and field != 'business_number':
+                    self._filter.add(f"{field}:{normalize(field, value)}")
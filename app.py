@@ -1,1877 +1,117 @@
 import os
-import logging
-import psycopg2
-import psycopg2.extras
-import sqlite3
-import re
-from datetime import datetime
+
+import click
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-from flask_wtf.csrf import CSRFProtect
-from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, TextAreaField, SelectField, SelectMultipleField, DateField, BooleanField, widgets
-from wtforms.validators import DataRequired, Length, Optional, URL, ValidationError, Email
-from flask_talisman import Talisman
-from werkzeug.security import generate_password_hash, check_password_hash
-from markupsafe import Markup
+from flask import Flask
+from flask.cli import with_appcontext
+
+import admin
+import auth
+import posts
+import reactions
+import search
 from config import get_config
+from extensions import csrf, get_db, release_db_connection
+from http_cache import Validators, template_fingerprint
+from log_pipeline import configure_logging
+from metrics import init_metrics
+from migrations import migrate
+from query_profiler import init_query_profiler
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
-app = Flask(__name__)
-
-# Load configuration based on environment
-config_class = get_config()
-app.config.from_object(config_class)
-
-# Enable auto-escaping for all templates for XSS protection
-app.jinja_env.autoescape = True
-
-# Input sanitization function
-def sanitize_input(text):
-    """Sanitize user input to prevent XSS attacks"""
-    if not text:
-        return ""
-    # Remove potentially dangerous HTML tags and scripts
-    text = str(text).strip()
-    # Basic HTML escaping is handled by Jinja2 auto-escaping
-    return text
-
-# Validate email format
-def is_valid_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-# Initialize CSRF protection
-csrf = CSRFProtect(app)
-
-# Admin Login Form
-class AdminLoginForm(FlaskForm):
-    username = StringField('관리자 아이디', validators=[DataRequired()])
-    password = PasswordField('비밀번호', validators=[DataRequired()])
-    submit = SubmitField('로그인')
-
-class Step1RegisterForm(FlaskForm):
-    name = StringField('이름', validators=[DataRequired(), Length(min=1, max=50)])
-    username = StringField('아이디', validators=[DataRequired(), Length(min=4, max=20)])
-    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
-    password = PasswordField('비밀번호', validators=[DataRequired(), Length(min=6, max=128)])
-    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
-    nationality = SelectField('국적', choices=[
-        ('', '선택해주세요'),
-        # 아시아
-        ('vietnam', '베트남 (Vietnam)'),
-        ('philippines', '필리핀 (Philippines)'),
-        ('thailand', '태국 (Thailand)'),
-        ('cambodia', '캄보디아 (Cambodia)'),
-        ('myanmar', '미얀마 (Myanmar)'),
-        ('laos', '라오스 (Laos)'),
-        ('indonesia', '인도네시아 (Indonesia)'),
-        ('china', '중국 (China)'),
-        ('mongolia', '몽골 (Mongolia)'),
-        ('uzbekistan', '우즈베키스탄 (Uzbekistan)'),
-        ('kyrgyzstan', '키르기스스탄 (Kyrgyzstan)'),
-        ('kazakhstan', '카자흐스탄 (Kazakhstan)'),
-        ('nepal', '네팔 (Nepal)'),
-        ('sri_lanka', '스리랑카 (Sri Lanka)'),
-        ('pakistan', '파키스탄 (Pakistan)'),
-        ('bangladesh', '방글라데시 (Bangladesh)'),
-        ('india', '인도 (India)'),
-        ('japan', '일본 (Japan)'),
-        ('malaysia', '말레이시아 (Malaysia)'),
-        ('singapore', '싱가포르 (Singapore)'),
-        # 북미
-        ('usa', '미국 (United States)'),
-        ('canada', '캐나다 (Canada)'),
-        ('mexico', '멕시코 (Mexico)'),
-        # 유럽
-        ('uk', '영국 (United Kingdom)'),
-        ('germany', '독일 (Germany)'),
-        ('france', '프랑스 (France)'),
-        ('italy', '이탈리아 (Italy)'),
-        ('spain', '스페인 (Spain)'),
-        ('poland', '폴란드 (Poland)'),
-        ('romania', '루마니아 (Romania)'),
-        ('ukraine', '우크라이나 (Ukraine)'),
-        ('russia', '러시아 (Russia)'),
-        ('netherlands', '네덜란드 (Netherlands)'),
-        ('belgium', '벨기에 (Belgium)'),
-        ('sweden', '스웨덴 (Sweden)'),
-        ('norway', '노르웨이 (Norway)'),
-        ('finland', '핀란드 (Finland)'),
-        # 남미
-        ('brazil', '브라질 (Brazil)'),
-        ('argentina', '아르헨티나 (Argentina)'),
-        ('colombia', '콜롬비아 (Colombia)'),
-        ('peru', '페루 (Peru)'),
-        ('chile', '칠레 (Chile)'),
-        ('venezuela', '베네수엘라 (Venezuela)'),
-        # 기타
-        ('other', '기타 (Other)')
-    ], validators=[DataRequired()])
-    gender = SelectField('성별', choices=[('', '선택해주세요'), ('male', '남성'), ('female', '여성')], validators=[DataRequired()])
-    korean_fluent = SelectField('한국어 가능 여부', choices=[('', '선택해주세요'), ('yes', '예'), ('no', '아니오')], validators=[DataRequired()])
-    languages = SelectMultipleField('구사 언어 (복수선택 가능)', choices=[
-        ('Korean', '한국어 (Korean)'),
-        ('English', '영어 (English)'),
-        ('Chinese', '중국어 (Chinese)'),
-        ('Japanese', '일본어 (Japanese)'),
-        ('Vietnamese', '베트남어 (Vietnamese)'),
-        ('Thai', '태국어 (Thai)'),
-        ('Filipino', '필리핀어 (Filipino)'),
-        ('Khmer', '캄보디아어 (Khmer)'),
-        ('Myanmar', '미얀마어 (Myanmar)'),
-        ('Lao', '라오어 (Lao)'),
-        ('Indonesian', '인도네시아어 (Indonesian)'),
-        ('Malay', '말레이어 (Malay)'),
-        ('Mongolian', '몽골어 (Mongolian)'),
-        ('Uzbek', '우즈벡어 (Uzbek)'),
-        ('Kyrgyz', '키르기스어 (Kyrgyz)'),
-        ('Kazakh', '카자흐어 (Kazakh)'),
-        ('Nepali', '네팔어 (Nepali)'),
-        ('Sinhala', '싱할라어 (Sinhala)'),
-        ('Urdu', '우르두어 (Urdu)'),
-        ('Bengali', '벵골어 (Bengali)'),
-        ('Hindi', '힌디어 (Hindi)'),
-        ('Russian', '러시아어 (Russian)'),
-        ('Arabic', '아랍어 (Arabic)'),
-        ('Spanish', '스페인어 (Spanish)'),
-        ('Portuguese', '포르투갈어 (Portuguese)'),
-        ('French', '프랑스어 (French)'),
-        ('German', '독일어 (German)'),
-        ('Italian', '이탈리아어 (Italian)'),
-        ('Dutch', '네덜란드어 (Dutch)'),
-        ('Polish', '폴란드어 (Polish)'),
-        ('Romanian', '루마니아어 (Romanian)'),
-        ('Ukrainian', '우크라이나어 (Ukrainian)'),
-        ('Swedish', '스웨덴어 (Swedish)'),
-        ('Norwegian', '노르웨이어 (Norwegian)'),
-        ('Finnish', '핀란드어 (Finnish)'),
-        ('Other', '기타 (Other)')
-    ], widget=widgets.ListWidget(prefix_label=False), option_widget=widgets.CheckboxInput())
-    
-    def validate_confirm_password(self, field):
-        if field.data != self.password.data:
-            raise ValidationError('비밀번호가 일치하지 않습니다.')
-    
-    def validate_email(self, field):
-        if not is_valid_email(field.data):
-            raise ValidationError('올바른 이메일 주소를 입력해주세요.')
-    
-    def validate_languages(self, field):
-        if not field.data or len(field.data) == 0:
-            raise ValidationError('최소 1개 이상의 언어를 선택해주세요.')
-    preferred_jobs = SelectField('희망 직무', choices=[
-        ('', '선택해주세요'),
-        ('moving', '이사 작업'),
-        ('construction', '건설업'),
-        ('manufacturing', '제조업'),
-        ('delivery', '배송업'),
-        ('cleaning', '청소업'),
-        ('restaurant', '음식점'),
-        ('other', '기타')
-    ], validators=[DataRequired()])
-    preferred_location = SelectField('희망 지역', choices=[
-        ('', '선택해주세요'),
-        ('anywhere', '무관'),
-        ('seoul', '서울'),
-        ('busan', '부산'),
-        ('incheon', '인천'),
-        ('daegu', '대구'),
-        ('daejeon', '대전'),
-        ('gwangju', '광주'),
-        ('ulsan', '울산'),
-        ('gyeonggi', '경기도'),
-        ('gangwon', '강원도'),
-        ('chungbuk', '충청북도'),
-        ('chungnam', '충청남도'),
-        ('jeonbuk', '전라북도'),
-        ('jeonnam', '전라남도'),
-        ('gyeongbuk', '경상북도'),
-        ('gyeongnam', '경상남도'),
-        ('jeju', '제주도')
-    ], validators=[DataRequired()])
-    availability = SelectField('근무 가능 여부', choices=[
-        ('', '선택해주세요'),
-        ('immediate', '즉시 가능'),
-        ('negotiable', '조율 필요')
-    ], validators=[DataRequired()])
-    self_intro = TextAreaField('자기소개', validators=[DataRequired(), Length(min=10, max=1000)])
-    video_link = StringField('자기소개 영상 링크 (선택)', validators=[Optional(), URL()])
-    privacy_agreement = BooleanField('개인정보 수집·이용에 동의합니다', validators=[DataRequired()])
-    terms_agreement = BooleanField('이용약관에 동의합니다', validators=[DataRequired()])
-    submit = SubmitField('등록하기')
-
-class Step2RegisterForm(FlaskForm):
-    visa_type = SelectField('체류 자격', choices=[
-        ('', '선택해주세요'),
-        ('E-9', 'E-9 (비전문취업)'),
-        ('H-2', 'H-2 (방문취업)'),
-        ('F-4', 'F-4 (재외동포)'),
-        ('F-5', 'F-5 (영주)'),
-        ('F-6', 'F-6 (결혼이민)'),
-        ('other', '기타')
-    ])
-    visa_expiry = DateField('체류 만료일')
-    past_jobs = TextAreaField('이전 근무 경험')
-    expected_salary = SelectField('희망 급여 수준', choices=[
-        ('', '선택해주세요'),
-        ('2000000-2500000', '200만원 - 250만원'),
-        ('2500000-3000000', '250만원 - 300만원'),
-        ('3000000-3500000', '300만원 - 350만원'),
-        ('3500000-4000000', '350만원 - 400만원'),
-        ('4000000+', '400만원 이상'),
-        ('negotiable', '협의 가능')
-    ])
-    housing_preference = SelectField('숙소 제공 선호', choices=[
-        ('', '선택해주세요'),
-        ('required', '필수'),
-        ('preferred', '선호'),
-        ('not_needed', '필요 없음')
-    ])
-    licenses = SelectMultipleField('자격증 보유 여부', choices=[
-        ('forklift', '지게차 운전'),
-        ('crane', '크레인 운전'),
-        ('welding', '용접'),
-        ('electrical', '전기'),
-        ('cooking', '조리'),
-        ('driving', '운전면허'),
-        ('other', '기타')
-    ], widget=widgets.ListWidget(prefix_label=False), option_widget=widgets.CheckboxInput())
-    religion = SelectField('종교', choices=[
-        ('', '선택해주세요'),
-        ('none', '무교'),
-        ('christian', '기독교'),
-        ('buddhist', '불교'),
-        ('catholic', '천주교'),
-        ('islam', '이슬람교'),
-        ('other', '기타')
-    ])
-    work_hours = SelectField('근무 가능 시간', choices=[
-        ('', '선택해주세요'),
-        ('day', '주간근무'),
-        ('night', '야간근무'),
-        ('shift', '교대근무'),
-        ('flexible', '유연근무')
-    ])
-    submit = SubmitField('정보 업데이트')
-
-class CompanyRegisterForm(FlaskForm):
-    company_name = StringField('회사명', validators=[DataRequired(), Length(min=2, max=100)])
-    username = StringField('아이디', validators=[DataRequired(), Length(min=4, max=20)])
-    business_number = StringField('사업자등록번호', validators=[DataRequired(), Length(min=10, max=20)])
-    ceo_name = StringField('대표자명', validators=[DataRequired(), Length(min=2, max=50)])
-    contact_number = StringField('연락처', validators=[DataRequired(), Length(min=10, max=20)])
-    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
-    password = PasswordField('비밀번호', validators=[DataRequired(), Length(min=8, max=128)])
-    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
-    address = StringField('회사 주소', validators=[DataRequired(), Length(min=5, max=200)])
-    company_description = TextAreaField('회사 소개', validators=[Optional(), Length(max=500)])
-    privacy_agreement = BooleanField('개인정보 수집·이용에 동의합니다', validators=[DataRequired()])
-    terms_agreement = BooleanField('이용약관에 동의합니다', validators=[DataRequired()])
-    submit = SubmitField('회원가입')
-    
-    def validate_confirm_password(self, field):
-        if field.data != self.password.data:
-            raise ValidationError('비밀번호가 일치하지 않습니다.')
-    
-    def validate_username(self, field):
-        conn = get_db_connection()
-        if conn:
-            try:
-                cur = conn.cursor()
-                # Check both companies and users tables for duplicate username
-                cur.execute('SELECT id FROM companies WHERE username = %s', (field.data,))
-                if cur.fetchone():
-                    raise ValidationError('이미 사용 중인 아이디입니다.')
-                cur.execute('SELECT id FROM users WHERE username = %s', (field.data,))
-                if cur.fetchone():
-                    raise ValidationError('이미 사용 중인 아이디입니다.')
-            finally:
-                conn.close()
-    
-    def validate_email(self, field):
-        if not is_valid_email(field.data):
-            raise ValidationError('올바른 이메일 주소를 입력해주세요.')
-
-class LoginForm(FlaskForm):
-    email = StringField('이메일 또는 아이디', validators=[DataRequired(), Length(min=3, max=120)])
-    password = PasswordField('비밀번호', validators=[DataRequired()])
-    submit = SubmitField('로그인')
-
-class PasswordResetForm(FlaskForm):
-    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
-    submit = SubmitField('비밀번호 재설정 요청')
-
-class NewPasswordForm(FlaskForm):
-    password = PasswordField('새 비밀번호', validators=[DataRequired(), Length(min=6, max=128)])
-    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
-    submit = SubmitField('비밀번호 변경')
-    
-    def validate_confirm_password(self, field):
-        if field.data != self.password.data:
-            raise ValidationError('비밀번호가 일치하지 않습니다.')
-
-# Initialize Talisman - disabled for development
-# talisman = Talisman(app, force_https=False, strict_transport_security=False, content_security_policy=False)
-
-# Configure secure session cookies
-app.config.update(
-    SESSION_COOKIE_SECURE=False,  # Allow non-HTTPS cookies in development
-    SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE='Lax'
-)
-
-# Admin credentials from environment variables
-ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "admin")
-ADMIN_PASSWORD_HASH = generate_password_hash(os.environ.get("ADMIN_PASSWORD", "admin123"))
-
-# In-memory data storage
-job_posts = {}
-intro_posts = {}
-notice_posts = {}
-forum_posts = {}
-job_counter = 0
-intro_counter = 0
-notice_counter = 0
-forum_counter = 0
-
-@app.route('/')
-def index():
-    """Home page displaying both job postings and self-introductions"""
-    try:
-        # Get data from database
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        # Get recent job posts
-        cur.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT 5")
-        job_posts_db = cur.fetchall()
-        
-        # Get recent introductions
-        cur.execute("SELECT * FROM introductions ORDER BY created_at DESC LIMIT 5")
-        intro_posts_db = cur.fetchall()
-        
-        # Get recent notices
-        cur.execute("SELECT * FROM notices ORDER BY created_at DESC LIMIT 5")
-        notice_posts_db = cur.fetchall()
-        
-        # Get recent forum posts
-        cur.execute("SELECT * FROM forum_posts ORDER BY created_at DESC LIMIT 5")
-        forum_posts_db = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        # Convert to format expected by template (id, data) tuples
-        sorted_jobs = [(post['id'], dict(post)) for post in job_posts_db]
-        sorted_intros = [(post['id'], dict(post)) for post in intro_posts_db]
-        sorted_notices = [(post['id'], dict(post)) for post in notice_posts_db]
-        sorted_forums = [(post['id'], dict(post)) for post in forum_posts_db]
-        
-        return render_template('index.html', 
-                             job_posts=sorted_jobs, 
-                             intro_posts=sorted_intros,
-                             notice_posts=sorted_notices,
-                             forum_posts=sorted_forums)
-    except Exception as e:
-        logging.error(f"Error in index route: {e}")
-        # Fallback to in-memory storage if database fails
-        sorted_jobs = sorted(job_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-        sorted_intros = sorted(intro_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-        sorted_notices = sorted(notice_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-        sorted_forums = sorted(forum_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-        
-        return render_template('index.html', 
-                             job_posts=sorted_jobs, 
-                             intro_posts=sorted_intros,
-                             notice_posts=sorted_notices,
-                             forum_posts=sorted_forums)
-
-@app.route('/health')
-def health_check():
-    """Simple health check endpoint for deployment"""
-    return "OK", 200
-
-@app.route('/job/new', methods=['GET', 'POST'])
-def job_new():
-    """Page for companies to create new job postings"""
-    # Check if user is logged in
-    login_check = require_login_new()
-    if login_check:
-        return login_check
-        
-    if request.method == 'POST':
-        try:
-            title = sanitize_input(request.form.get('title', ''))
-            company = sanitize_input(request.form.get('company', ''))
-            contact = sanitize_input(request.form.get('contact', ''))
-            description = sanitize_input(request.form.get('description', ''))
-            
-            # Basic validation
-            if not all([title, company, contact, description]):
-                flash('모든 필드를 입력해주세요.', 'error')
-                return render_template('job_new.html')
-            
-            # Save to database
-            conn = get_db_connection()
-            cur = conn.cursor()
-            
-            cur.execute("""
-                INSERT INTO jobs (title, company, contact, description, created_at, company_id)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (title, company, contact, description, datetime.now(), session.get('company_id')))
-            
-            job_id = cur.fetchone()[0]
-            conn.commit()
-            cur.close()
-            conn.close()
-            
-            flash('구인공고가 성공적으로 등록되었습니다.', 'success')
-            return redirect(url_for('job_view', job_id=job_id))
-            
-        except Exception as e:
-            logging.error(f"Error creating job post: {e}")
-            flash('구인공고 등록 중 오류가 발생했습니다.', 'error')
-            return render_template('job_new.html')
-    
-    return render_template('job_new.html')
-
-@app.route('/job')
-def job_list():
-    """Page displaying all job postings"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, title, company, contact, description, created_at, company_id
-            FROM jobs 
-            ORDER BY created_at DESC
-        """)
-        
-        jobs = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        # Convert to format expected by template
-        job_posts_data = []
-        for job in jobs:
-            job_data = {
-                'id': job['id'],
-                'title': job['title'],
-                'company': job['company'],
-                'contact': job['contact'],
-                'description': job['description'],
-                'created_at': job['created_at'],
-                'timestamp': job['created_at'],
-                'company_id': job['company_id']
-            }
-            job_posts_data.append((job['id'], job_data))
-        
-        return render_template('job_list.html', job_posts=job_posts_data)
-        
-    except Exception as e:
-        logging.error(f"Error fetching jobs: {e}")
-        return render_template('job_list.html', job_posts=[])
-
-@app.route('/job/<int:job_id>')
-def job_view(job_id):
-    """Page to view a specific job posting"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, title, company, contact, description, created_at, company_id
-            FROM jobs 
-            WHERE id = %s
-        """, (job_id,))
-        
-        job_data = cur.fetchone()
-        cur.close()
-        conn.close()
-        
-        if not job_data:
-            flash('존재하지 않는 구인공고입니다.', 'error')
-            return redirect(url_for('job_list'))
-        
-        # Convert to format expected by template
-        job = {
-            'id': job_data['id'],
-            'title': job_data['title'],
-            'company': job_data['company'],
-            'contact': job_data['contact'],
-            'description': job_data['description'],
-            'created_at': job_data['created_at'],
-            'timestamp': job_data['created_at'],
-            'company_id': job_data['company_id']
-        }
-        
-        return render_template('job_view.html', job=job)
-        
-    except Exception as e:
-        logging.error(f"Error fetching job {job_id}: {e}")
-        flash('구인공고를 불러오는 중 오류가 발생했습니다.', 'error')
-        return redirect(url_for('job_list'))
-
-@app.route('/intro/new', methods=['GET', 'POST'])
-def intro_new():
-    """Page for foreign workers to create self-introductions"""
-    # Check if user is logged in
-    login_check = require_login_new()
-    if login_check:
-        return login_check
-        
-    if request.method == 'POST':
-        global intro_counter
-        intro_counter += 1
-        
-        intro_data = {
-            'id': intro_counter,
-            'name': sanitize_input(request.form.get('name', '')),
-            'nationality': sanitize_input(request.form.get('nationality', '')),
-            'languages': sanitize_input(request.form.get('languages', '')),
-            'youtube_link': sanitize_input(request.form.get('youtube_link', '')),
-            'introduction': sanitize_input(request.form.get('introduction', '')),
-            'timestamp': datetime.now()
-        }
-        
-        # Basic validation
-        if not all([intro_data['name'], intro_data['nationality'], intro_data['languages'], intro_data['introduction']]):
-            flash('필수 필드를 모두 입력해주세요.', 'error')
-            return render_template('intro_new.html')
-        
-        intro_posts[intro_counter] = intro_data
-        flash('자기소개가 성공적으로 등록되었습니다.', 'success')
-        return redirect(url_for('intro_view', intro_id=intro_counter))
-    
-    return render_template('intro_new.html')
-
-@app.route('/intro')
-def intro_list():
-    """Page displaying all self-introductions"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, name, nationality, languages, introduction, created_at, 
-                   gender, korean_fluent, preferred_jobs, preferred_location, 
-                   availability, youtube_link, video_link
-            FROM introductions 
-            ORDER BY created_at DESC
-        """)
-        
-        introductions = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        # Convert to format similar to original intro_posts structure
-        intro_posts_data = []
-        for intro in introductions:
-            intro_data = {
-                'id': intro['id'],
-                'name': intro['name'],
-                'nationality': intro['nationality'],
-                'languages': intro['languages'],
-                'introduction': intro['introduction'],
-                'created_at': intro['created_at'],
-                'timestamp': intro['created_at'],  # Add timestamp for compatibility
-                'gender': intro['gender'],
-                'korean_fluent': intro['korean_fluent'],
-                'preferred_jobs': intro['preferred_jobs'],
-                'preferred_location': intro['preferred_location'],
-                'availability': intro['availability'],
-                'youtube_link': intro['youtube_link'] or intro['video_link']
-            }
-            intro_posts_data.append((intro['id'], intro_data))
-        
-        return render_template('intro_list.html', intro_posts=intro_posts_data)
-        
-    except Exception as e:
-        logging.error(f"Error fetching introductions: {e}")
-        return render_template('intro_list.html', intro_posts=[])
-
-@app.route('/intro/<int:intro_id>')
-def intro_view(intro_id):
-    """Page to view a specific self-introduction"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, name, nationality, languages, introduction, created_at, 
-                   gender, korean_fluent, preferred_jobs, preferred_location, 
-                   availability, youtube_link, video_link
-            FROM introductions 
-            WHERE id = %s
-        """, (intro_id,))
-        
-        intro_data = cur.fetchone()
-        cur.close()
-        conn.close()
-        
-        if not intro_data:
-            flash('존재하지 않는 자기소개입니다.', 'error')
-            return redirect(url_for('intro_list'))
-        
-        # Convert to format expected by template
-        intro = {
-            'id': intro_data['id'],
-            'name': intro_data['name'],
-            'nationality': intro_data['nationality'],
-            'languages': intro_data['languages'],
-            'introduction': intro_data['introduction'],
-            'created_at': intro_data['created_at'],
-            'timestamp': intro_data['created_at'],  # Add timestamp for compatibility
-            'gender': intro_data['gender'],
-            'korean_fluent': intro_data['korean_fluent'],
-            'preferred_jobs': intro_data['preferred_jobs'],
-            'preferred_location': intro_data['preferred_location'],
-            'availability': intro_data['availability'],
-            'youtube_link': intro_data['youtube_link'] or intro_data['video_link']
-        }
-        
-        return render_template('intro_view.html', intro=intro)
-        
-    except Exception as e:
-        logging.error(f"Error fetching introduction {intro_id}: {e}")
-        flash('자기소개를 불러오는 중 오류가 발생했습니다.', 'error')
-        return redirect(url_for('intro_list'))
-
-# Notice routes
-@app.route('/notice')
-def notice_list():
-    """Page displaying all notices"""
-    conn = get_db_connection()
-    if not conn:
-        flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-        return render_template('notice_list.html', notice_posts=[])
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute('SELECT * FROM notices ORDER BY created_at DESC')
-            notices = cur.fetchall()
-            # Convert to tuple format for template compatibility
-            notice_posts = [(notice['id'], notice) for notice in notices]
-            return render_template('notice_list.html', notice_posts=notice_posts)
-    except Exception as e:
-        logging.error(f"Error fetching notices: {e}")
-        flash('공지사항을 불러오는 중 오류가 발생했습니다.', 'error')
-        return render_template('notice_list.html', notice_posts=[])
-    finally:
-        conn.close()
-
-@app.route('/notice/new', methods=['GET', 'POST'])
-def notice_new():
-    """Page to create new notices - requires admin login"""
-    # Check if user is logged in and is admin
-    if not session.get('user_id'):
-        flash('로그인이 필요합니다.', 'error')
-        return redirect(url_for('login'))
-    
-    if session.get('role') != 'admin':
-        flash('공지사항 작성 권한이 없습니다. 관리자만 작성 가능합니다.', 'error')
-        return redirect(url_for('notice_list'))
-    
-    if request.method == 'POST':
-        title = sanitize_input(request.form.get('title', ''))
-        content = sanitize_input(request.form.get('content', ''))
-        
-        if not all([title, content]):
-            flash('모든 필드를 입력해주세요.', 'error')
-            return render_template('notice_new.html')
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('notice_new.html')
-        
-        try:
-            with conn.cursor() as cur:
-                cur.execute('INSERT INTO notices (title, content) VALUES (%s, %s) RETURNING id', 
-                           (title, content))
-                notice_id = cur.fetchone()['id']
-                conn.commit()
-                
-                flash('공지사항이 성공적으로 등록되었습니다.', 'success')
-                return redirect(url_for('notice_view', notice_id=notice_id))
-                
-        except Exception as e:
-            logging.error(f"Error creating notice: {e}")
-            flash('공지사항 등록 중 오류가 발생했습니다.', 'error')
-            return render_template('notice_new.html')
-        finally:
-            conn.close()
-    
-    return render_template('notice_new.html')
-
-@app.route('/notice/<int:notice_id>')
-def notice_view(notice_id):
-    """Page to view a specific notice"""
-    conn = get_db_connection()
-    if not conn:
-        flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-        return redirect(url_for('notice_list'))
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute('SELECT * FROM notices WHERE id = %s', (notice_id,))
-            notice = cur.fetchone()
-            
-            if not notice:
-                flash('존재하지 않는 공지사항입니다.', 'error')
-                return redirect(url_for('notice_list'))
-                
-            return render_template('notice_view.html', notice=notice)
-    except Exception as e:
-        logging.error(f"Error fetching notice {notice_id}: {e}")
-        flash('공지사항을 불러오는 중 오류가 발생했습니다.', 'error')
-        return redirect(url_for('notice_list'))
-    finally:
-        conn.close()
 
-# Forum routes
-@app.route('/forum')
-def forum_list():
-    """Page displaying all forum posts"""
-    sorted_forums = sorted(forum_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-    return render_template('forum_list.html', forum_posts=sorted_forums)
+def create_app(config_class=None):
+    """Build the application
 
-@app.route('/forum/new', methods=['GET', 'POST'])
-def forum_new():
-    """Page to create new forum posts"""
-    if request.method == 'POST':
-        global forum_counter
-        forum_counter += 1
-        
-        forum_data = {
-            'id': forum_counter,
-            'author': sanitize_input(request.form.get('author', '')),
-            'title': sanitize_input(request.form.get('title', '')),
-            'content': sanitize_input(request.form.get('content', '')),
-            'timestamp': datetime.now()
-        }
-        
-        if not all([forum_data['author'], forum_data['title'], forum_data['content']]):
-            flash('모든 필드를 입력해주세요.', 'error')
-            return render_template('forum_new.html')
-        
-        forum_posts[forum_counter] = forum_data
-        flash('포럼 게시글이 성공적으로 등록되었습니다.', 'success')
-        return redirect(url_for('forum_view', forum_id=forum_counter))
-    
-    return render_template('forum_new.html')
+    Only configuration, blueprints and hooks are set up here; pools, caches
+    and indexes are created by the first request that needs them
+    (see extensions.py), so starting a worker stays cheap.
+    """
+    app = Flask(__name__)
 
-@app.route('/forum/<int:forum_id>')
-def forum_view(forum_id):
-    """Page to view a specific forum post"""
-    if forum_id not in forum_posts:
-        flash('존재하지 않는 게시글입니다.', 'error')
-        return redirect(url_for('forum_list'))
-    
-    forum = forum_posts[forum_id]
-    return render_template('forum_view.html', forum=forum)
+    # Load configuration based on environment
+    app.config.from_object(config_class or get_config())
 
-# User authentication helpers
-def is_logged_in():
-    return 'user_id' in session
+    # Configure logging: queued, leveled per environment, tagged with request ids
+    configure_logging(app)
 
-def get_current_user():
-    if not is_logged_in():
-        return None
-    
-    conn = get_db_connection()
-    if not conn:
-        return None
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute('SELECT * FROM users WHERE id = %s', (session['user_id'],))
-            user = cur.fetchone()
-        return user
-    except Exception as e:
-        logging.error(f"Error getting current user: {e}")
-        return None
-    finally:
-        conn.close()
+    # Per-endpoint latency, DB and template timings for /metrics
+    init_metrics(app)
 
-def require_login():
-    if not is_logged_in():
-        flash('로그인이 필요합니다.', 'error')
-        return redirect(url_for('login'))
-    return None
+    # Slow statements are logged with their plan; repeated ones flag an N+1
+    init_query_profiler(app)
 
-# Admin authentication helper
-def is_admin():
-    return session.get('admin_logged_in', False)
+    # Enable auto-escaping for all templates for XSS protection
+    app.jinja_env.autoescape = True
 
-def require_admin():
-    admin_status = is_admin()
-    print(f"DEBUG: require_admin check - is_admin(): {admin_status}, session: {dict(session)}")
-    if not admin_status:
-        flash('관리자 권한이 필요합니다.', 'error')
-        return redirect(url_for('admin_login'))
-    return None
+    # HTTP validators change whenever the templates do; anonymous pages may sit in a front cache
+    Validators.fingerprint = template_fingerprint(os.path.join(app.root_path, app.template_folder))
+    Validators.shared_max_age = app.config.get('HTTP_CACHE_S_MAXAGE', 0)
 
-def is_company_logged_in():
-    """Check if company is logged in"""
-    return session.get('user_type') == 'company' and 'user_id' in session
+    # Initialize CSRF protection
+    csrf.init_app(app)
 
-def is_worker_logged_in():
-    """Check if worker is logged in"""
-    return session.get('user_type') == 'worker' and 'user_id' in session
+    # Initialize Talisman - disabled for development
+    # talisman = Talisman(app, force_https=False, strict_transport_security=False, content_security_policy=False)
 
-def require_login_new():
-    """Check if user is logged in (either as company or worker)"""
-    company_status = is_company_logged_in()
-    worker_status = is_worker_logged_in()
-    
-    logging.debug(f"Login check - Company: {company_status}, Worker: {worker_status}")
-    logging.debug(f"Session data: {dict(session)}")
-    
-    if not (company_status or worker_status):
-        flash('로그인이 필요합니다.', 'error')
-        return redirect(url_for('login'))
-    return None
+    # Configure secure session cookies
+    app.config.update(
+        SESSION_COOKIE_SECURE=False,  # Allow non-HTTPS cookies in development
+        SESSION_COOKIE_HTTPONLY=True,
+        SESSION_COOKIE_SAMESITE='Lax'
+    )
 
+    app.register_blueprint(posts.bp)
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(admin.bp)
 
+    app.teardown_appcontext(release_db_connection)
 
-# Registration choice route
-@app.route('/register')
-def register_choice():
-    return render_template('register_choice.html')
+    app.cli.add_command(rebuild_reaction_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(migrate_command)
 
-# Company registration route
-@app.route('/register/company', methods=['GET', 'POST'])
-def register_company():
-    form = CompanyRegisterForm()
-    
-    # 폼이 제출되었지만 검증에 실패했을 때 상세한 오류 메시지 제공
-    if request.method == 'POST' and not form.validate():
-        error_messages = []
-        
-        if form.company_name.errors:
-            error_messages.append('회사명을 입력해주세요.')
-        
-        if form.username.errors:
-            error_messages.append('사용자명을 올바르게 입력해주세요.')
-        
-        if form.password.errors or form.confirm_password.errors:
-            error_messages.append('비밀번호를 올바르게 입력하고 확인해주세요.')
-        
-        if form.business_number.errors:
-            error_messages.append('사업자등록번호를 올바르게 입력해주세요.')
-        
-        if form.ceo_name.errors:
-            error_messages.append('대표자명을 입력해주세요.')
-        
-        if form.contact_number.errors:
-            error_messages.append('연락처를 올바르게 입력해주세요.')
-        
-        if form.email.errors:
-            error_messages.append('이메일 주소를 올바르게 입력해주세요.')
-        
-        if form.address.errors:
-            error_messages.append('주소를 입력해주세요.')
-        
-        if form.company_description.errors:
-            error_messages.append('회사 설명을 입력해주세요.')
-        
-        if form.privacy_agreement.errors or form.terms_agreement.errors:
-            error_messages.append('개인정보 수집 및 이용에 동의해주세요.')
-        
-        if form.csrf_token.errors:
-            error_messages.append('페이지를 새로고침하고 다시 시도해주세요.')
-        
-        # 오류 메시지가 있으면 표시
-        if error_messages:
-            for msg in error_messages:
-                flash(msg, 'error')
-    
-    if form.validate_on_submit():
-        # Password confirmation check
-        if form.password.data != form.confirm_password.data:
-            flash('비밀번호가 일치하지 않습니다.', 'error')
-            return render_template('register_company.html', form=form)
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('register_company.html', form=form)
-        
-        try:
-            with conn.cursor() as cur:
-                # Check if company already exists
-                cur.execute('SELECT id FROM companies WHERE email = %s OR business_number = %s OR username = %s', 
-                           (form.email.data, form.business_number.data, form.username.data))
-                existing_company = cur.fetchone()
-                
-                if existing_company:
-                    flash('이미 등록된 이메일, 아이디 또는 사업자등록번호입니다.', 'error')
-                    return render_template('register_company.html', form=form)
-                
-                # Hash password and create company
-                password_hash = generate_password_hash(form.password.data)
-                cur.execute('''
-                    INSERT INTO companies (
-                        company_name, username, business_number, ceo_name, contact_number,
-                        email, password_hash, address, company_description, created_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                ''', (
-                    form.company_name.data,
-                    form.username.data,
-                    form.business_number.data,
-                    form.ceo_name.data,
-                    form.contact_number.data,
-                    form.email.data,
-                    password_hash,
-                    form.address.data,
-                    form.company_description.data
-                ))
-                conn.commit()
-                
-                flash('업체 회원가입이 완료되었습니다! 로그인해주세요.', 'success')
-                return redirect(url_for('login'))
-                
-        except Exception as e:
-            logging.error(f"Error creating company: {e}")
-            flash('회원가입 중 오류가 발생했습니다.', 'error')
-            return render_template('register_company.html', form=form)
-        finally:
-            conn.close()
-    
-    return render_template('register_company.html', form=form)
+    return app
 
-# Worker Registration route (Step 1) - Keep original /register for workers
-@app.route('/register/worker', methods=['GET', 'POST'])
-@app.route('/register-worker', methods=['GET', 'POST'])
-def register():
-    form = Step1RegisterForm()
-    
-    # 폼이 제출되었지만 검증에 실패했을 때 상세한 오류 메시지 제공
-    if request.method == 'POST' and not form.validate():
-        # 각 필드별 오류 메시지를 사용자 친화적으로 변환
-        error_messages = []
-        
-        if form.username.errors:
-            if any('already exists' in str(error).lower() for error in form.username.errors):
-                error_messages.append('사용자명이 이미 사용 중입니다.')
-            else:
-                error_messages.append('사용자명을 올바르게 입력해주세요.')
-        
-        if form.email.errors:
-            if any('already exists' in str(error).lower() for error in form.email.errors):
-                error_messages.append('이메일이 이미 가입되어 있습니다.')
-            else:
-                error_messages.append('이메일 주소를 올바르게 입력해주세요.')
-        
-        if form.password.errors or form.confirm_password.errors:
-            error_messages.append('비밀번호를 올바르게 입력하고 확인해주세요.')
-        
-        if form.name.errors:
-            error_messages.append('이름을 입력해주세요.')
-        
-        if form.nationality.errors:
-            error_messages.append('국적을 선택해주세요.')
-        
-        if form.gender.errors:
-            error_messages.append('성별을 선택해주세요.')
-        
-        if form.korean_fluent.errors:
-            error_messages.append('한국어 구사 수준을 선택해주세요.')
-        
-        if form.languages.errors:
-            error_messages.append('구사 가능한 언어를 최소 1개 이상 선택해주세요.')
-        
-        if form.preferred_jobs.errors:
-            error_messages.append('희망 직종을 입력해주세요.')
-        
-        if form.preferred_location.errors:
-            error_messages.append('희망 근무지역을 입력해주세요.')
-        
-        if form.availability.errors:
-            error_messages.append('근무 가능 시기를 선택해주세요.')
-        
-        if form.self_intro.errors:
-            error_messages.append('자기소개를 입력해주세요.')
-        
-        if form.privacy_agreement.errors or form.terms_agreement.errors:
-            error_messages.append('개인정보 수집 및 이용에 동의해주세요.')
-        
-        if form.csrf_token.errors:
-            error_messages.append('페이지를 새로고침하고 다시 시도해주세요.')
-        
-        # 오류 메시지가 있으면 표시
-        if error_messages:
-            for msg in error_messages:
-                flash(msg, 'error')
-    
-    if form.validate_on_submit():
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('register.html', form=form)
-        
-        try:
-            cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            
-            # Check if username or email already exists
-            cur.execute('''
-                SELECT username, email FROM users 
-                WHERE username = %s OR email = %s
-            ''', (form.username.data, form.email.data.lower()))
-            
-            existing_user = cur.fetchone()
-            if existing_user:
-                if existing_user['username'] == form.username.data:
-                    flash('이미 사용 중인 사용자명입니다. 다른 사용자명을 선택해주세요.', 'error')
-                else:
-                    flash('이미 가입된 이메일입니다. 다른 이메일을 사용하거나 로그인해주세요.', 'error')
-                return render_template('register.html', form=form)
-            
-            # First, create user account in users table
-            password_hash = generate_password_hash(form.password.data)
-            logging.debug(f"Creating user with password hash: {password_hash[:20]}...")
-            cur.execute('''
-                INSERT INTO users (username, email, password, password_hash, name) 
-                VALUES (%s, %s, %s, %s, %s) RETURNING id
-            ''', (
-                form.username.data,
-                form.email.data.lower(),
-                password_hash,  # password 필드에도 해시 저장 (호환성)
-                password_hash,  # password_hash 필드에 해시 저장
-                form.name.data
-            ))
-            
-            user_result = cur.fetchone()
-            user_id = user_result[0] if user_result else None
-            logging.debug(f"Created user with ID: {user_id}")
-            
-            if user_id is None:
-                raise Exception("Failed to create user account")
-            
-            # Then, insert into introductions table with step 1 data
-            cur.execute('''
-                INSERT INTO introductions (
-                    user_id, name, nationality, gender, korean_fluent, languages,
-                    preferred_jobs, preferred_location, availability, 
-                    introduction, step_completed
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            ''', (
-                user_id,
-                form.name.data,
-                form.nationality.data,
-                form.gender.data,
-                form.korean_fluent.data == 'yes',
-                ','.join(form.languages.data) if form.languages.data else '',
-                form.preferred_jobs.data,
-                form.preferred_location.data,
-                form.availability.data,
-                form.self_intro.data,
-                1  # Step 1 completed
-            ))
-            
-            # Get the introduction ID
-            result = cur.fetchone()
-            intro_id = result[0] if result else None
-            logging.debug(f"Got intro_id from RETURNING: {intro_id}")
-            
-            if intro_id is None or intro_id == 0:
-                # Fallback method
-                cur.execute('SELECT MAX(id) FROM introductions WHERE user_id = %s', (user_id,))
-                result = cur.fetchone()
-                intro_id = result[0] if result else None
-                logging.debug(f"Got intro_id from MAX fallback: {intro_id}")
-            
-            conn.commit()
-            cur.close()
-            
-            if intro_id is None or intro_id == 0:
-                raise Exception(f"Could not get introduction ID, got: {intro_id}")
-            
-            # Store intro_id in session for step 2
-            session['intro_id'] = intro_id
-            flash('1단계 등록이 완료되었습니다!', 'success')
-            return redirect(url_for('success'))
-                
-        except Exception as e:
-            logging.error(f"Error creating introduction: {e}")
-            
-            # Rollback the transaction
-            try:
-                conn.rollback()
-            except:
-                pass
-            
-            error_msg = str(e)
-            if 'duplicate key value violates unique constraint "users_username_key"' in error_msg:
-                flash('이미 사용 중인 사용자명입니다. 다른 사용자명을 선택해주세요.', 'error')
-            elif 'duplicate key value violates unique constraint "users_email_key"' in error_msg:
-                flash('이미 가입된 이메일입니다. 다른 이메일을 사용하거나 로그인해주세요.', 'error')
-            else:
-                flash('등록 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.', 'error')
-            
-            return render_template('register.html', form=form)
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
-    
-    return render_template('register.html', form=form)
 
-@app.route('/check_username', methods=['POST'])
-def check_username():
-    """API endpoint to check if username is available"""
+@click.command('rebuild-reaction-counts')
+@with_appcontext
+def rebuild_reaction_counts_command():
+    """Recompute reaction_counts from job_reactions/intro_reactions"""
+    db = get_db()
     try:
-        data = request.get_json()
-        username = data.get('username', '').strip() if data else ''
-    except:
-        return jsonify({'available': False, 'message': '잘못된 요청입니다.'})
-    
-    if not username:
-        return jsonify({'available': False, 'message': '사용자명을 입력해주세요.'})
-    
-    if len(username) < 3:
-        return jsonify({'available': False, 'message': '사용자명은 3자 이상이어야 합니다.'})
-    
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({'available': False, 'message': '데이터베이스 연결 오류'})
-    
-    try:
-        cur = conn.cursor()
-        # Check if username exists in both users and companies tables
-        cur.execute('SELECT username FROM users WHERE username = %s', (username,))
-        user_exists = cur.fetchone()
-        
-        cur.execute('SELECT username FROM companies WHERE username = %s', (username,))
-        company_exists = cur.fetchone()
-        
-        cur.close()
-        conn.close()
-        
-        if user_exists or company_exists:
-            return jsonify({'available': False, 'message': '이미 사용 중인 사용자명입니다.'})
-        else:
-            return jsonify({'available': True, 'message': '사용 가능한 사용자명입니다.'})
-    
-    except Exception as e:
-        logging.error(f"Error checking username: {e}")
-        return jsonify({'available': False, 'message': '확인 중 오류가 발생했습니다.'})
-    finally:
-        try:
-            conn.close()
-        except:
-            pass
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    form = LoginForm()
-    
-    if form.validate_on_submit():
-        login_id = form.email.data.strip()  # Can be email or username
-        password = form.password.data
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('login.html', form=form)
-        
-        try:
-            cur = conn.cursor()
-            # Check companies table first (by email or username)
-            logging.debug(f"Checking companies table for login_id: {login_id}")
-            cur.execute('''
-                SELECT id, company_name, email, password_hash, username 
-                FROM companies 
-                WHERE email = %s OR username = %s
-            ''', (login_id.lower(), login_id))
-            company = cur.fetchone()
-            
-            logging.debug(f"Company found: {company is not None}")
-            if company:
-                try:
-                    logging.debug(f"Company data length: {len(company)}")
-                    logging.debug(f"Company data: {company}")
-                    
-                    # Safely access company data (RealDictRow object)
-                    company_id = company['id']
-                    company_name = company['company_name'] 
-                    company_email = company['email']
-                    password_hash = company['password_hash']
-                    username = company.get('username')
-                    
-                    logging.debug(f"Extracted: id={company_id}, name={company_name}, email={company_email}, has_hash={password_hash is not None}, username={username}")
-                    
-                    if password_hash and check_password_hash(password_hash, password):
-                        session.clear()
-                        session.permanent = True
-                        session['user_id'] = company_id
-                        session['company_id'] = company_id  # 호환성을 위해 company_id도 저장
-                        session['username'] = username or company_name
-                        session['email'] = company_email
-                        session['role'] = 'company'
-                        session['user_type'] = 'company'
-                        
-                        flash(f'{company_name} 업체 관리자님 환영합니다!', 'success')
-                        return redirect(url_for('index'))
-                except Exception as company_error:
-                    logging.error(f"Error processing company data: {company_error}")
-                    logging.error(f"Company data: {company}")
-            
-            # Check users table if not found in companies (for worker accounts)
-            logging.debug(f"Checking users table for login_id: {login_id}")
-            cur.execute('''
-                SELECT id, username, email, password_hash 
-                FROM users 
-                WHERE email = %s OR username = %s
-            ''', (login_id.lower(), login_id))
-            user = cur.fetchone()
-            
-            logging.debug(f"User found: {user is not None}")
-            if user:
-                logging.debug(f"User data: id={user.get('id')}, username={user.get('username')}, email={user.get('email')}, has_hash={user.get('password_hash') is not None}")
-                
-                password_hash = user.get('password_hash')
-                if password_hash and check_password_hash(password_hash, password):
-                    session.clear()
-                    session.permanent = True
-                    session['user_id'] = user['id']
-                    session['username'] = user['username']
-                    session['email'] = user['email']
-                    session['role'] = 'user'
-                    session['user_type'] = 'worker'
-                    
-                    flash(f'{user["username"]}님 환영합니다!', 'success')
-                    return redirect(url_for('index'))
-            
-            flash('아이디/이메일 또는 비밀번호가 올바르지 않습니다.', 'error')
-        except Exception as e:
-            logging.error(f"Error during login: {e}")
-            logging.error(f"Login attempt with: {login_id}")
-            flash('로그인 중 오류가 발생했습니다.', 'error')
-        finally:
-            if 'cur' in locals():
-                cur.close()
-            conn.close()
-    
-    return render_template('login.html', form=form)
-
-@app.route('/password-reset', methods=['GET', 'POST'])
-def password_reset():
-    """비밀번호 재설정 요청 페이지"""
-    form = PasswordResetForm()
-    
-    if form.validate_on_submit():
-        email = form.email.data.strip().lower()
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('password_reset.html', form=form)
-        
-        try:
-            cur = conn.cursor()
-            
-            # Check if email exists in users or companies table
-            cur.execute('SELECT id, username FROM users WHERE email = %s', (email,))
-            user = cur.fetchone()
-            
-            cur.execute('SELECT id, company_name FROM companies WHERE email = %s', (email,))
-            company = cur.fetchone()
-            
-            if user or company:
-                # In a real application, you would send an email here
-                # For now, we'll just redirect to a success page
-                session['reset_email'] = email
-                flash('비밀번호 재설정 링크가 이메일로 전송되었습니다. (개발 모드에서는 아래 링크를 사용하세요)', 'info')
-                return redirect(url_for('password_reset_confirm', email=email))
-            else:
-                flash('등록되지 않은 이메일입니다.', 'error')
-                
-        except Exception as e:
-            logging.error(f"Error during password reset: {e}")
-            flash('비밀번호 재설정 요청 중 오류가 발생했습니다.', 'error')
-        finally:
-            cur.close()
-            conn.close()
-    
-    return render_template('password_reset.html', form=form)
-
-@app.route('/password-reset/confirm/<email>')
-def password_reset_confirm(email):
-    """비밀번호 재설정 확인 페이지 (개발 모드용)"""
-    if session.get('reset_email') != email:
-        flash('유효하지 않은 접근입니다.', 'error')
-        return redirect(url_for('login'))
-    
-    return render_template('password_reset_confirm.html', email=email)
-
-@app.route('/password-reset/new/<email>', methods=['GET', 'POST'])
-def password_reset_new(email):
-    """새 비밀번호 설정 페이지"""
-    if session.get('reset_email') != email:
-        flash('유효하지 않은 접근입니다.', 'error')
-        return redirect(url_for('login'))
-    
-    form = NewPasswordForm()
-    
-    if form.validate_on_submit():
-        new_password = form.password.data
-        password_hash = generate_password_hash(new_password)
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('password_reset_new.html', form=form, email=email)
-        
-        try:
-            cur = conn.cursor()
-            
-            # Update password in users table
-            cur.execute('UPDATE users SET password_hash = %s WHERE email = %s', 
-                       (password_hash, email))
-            
-            # Update password in companies table
-            cur.execute('UPDATE companies SET password_hash = %s WHERE email = %s', 
-                       (password_hash, email))
-            
-            conn.commit()
-            
-            # Clear reset session
-            session.pop('reset_email', None)
-            
-            flash('비밀번호가 성공적으로 변경되었습니다. 새 비밀번호로 로그인해주세요.', 'success')
-            return redirect(url_for('login'))
-            
-        except Exception as e:
-            logging.error(f"Error updating password: {e}")
-            flash('비밀번호 변경 중 오류가 발생했습니다.', 'error')
-        finally:
-            cur.close()
-            conn.close()
-    
-    return render_template('password_reset_new.html', form=form, email=email)
-
-@app.route('/logout')
-def logout():
-    username = session.get('username', '')
-    session.pop('user_id', None)
-    session.pop('username', None)
-    session.pop('email', None)
-    session.pop('role', None)
-    if username:
-        flash(f'{username}님 로그아웃되었습니다.', 'success')
-    return redirect(url_for('index'))
-
-# Success page route
-@app.route('/success')
-def success():
-    return render_template('success.html')
-
-# Step 2 Registration route
-@app.route('/more-info', methods=['GET', 'POST'])
-def more_info():
-    form = Step2RegisterForm()
-    
-    if form.validate_on_submit():
-        intro_id = session.get('intro_id')
-        if not intro_id:
-            flash('등록 정보를 찾을 수 없습니다. 다시 등록해주세요.', 'error')
-            return redirect(url_for('register'))
-        
-        conn = get_db_connection()
-        if not conn:
-            flash('데이터베이스 연결 오류가 발생했습니다.', 'error')
-            return render_template('more_info.html', form=form)
-        
-        try:
-            with conn.cursor() as cur:
-                # Update the existing record with step 2 data
-                cur.execute('''
-                    UPDATE introductions SET
-                        visa_type = %s, visa_expiry = %s, past_jobs = %s,
-                        expected_salary = %s, housing_preference = %s,
-                        licenses = %s, religion = %s, work_hours = %s,
-                        step_completed = %s
-                    WHERE id = %s
-                ''', (
-                    form.visa_type.data or None,
-                    form.visa_expiry.data,
-                    form.past_jobs.data or None,
-                    form.expected_salary.data or None,
-                    form.housing_preference.data or None,
-                    ','.join(form.licenses.data) if form.licenses.data else None,
-                    form.religion.data or None,
-                    form.work_hours.data or None,
-                    2,  # Step 2 completed
-                    intro_id
-                ))
-                conn.commit()
-                
-                # Clear session
-                session.pop('intro_id', None)
-                flash('추가 정보가 성공적으로 등록되었습니다!', 'success')
-                return redirect(url_for('intro_list'))
-                
-        except Exception as e:
-            logging.error(f"Error updating introduction: {e}")
-            flash('정보 업데이트 중 오류가 발생했습니다.', 'error')
-            return render_template('more_info.html', form=form)
-        finally:
-            conn.close()
-    
-    return render_template('more_info.html', form=form)
-
-# Admin routes
-@app.route('/admin/login', methods=['GET', 'POST'])
-def admin_login():
-    form = AdminLoginForm()
-    
-    if form.validate_on_submit():
-        username = form.username.data.strip()
-        password = form.password.data
-        
-        # Simple hardcoded admin check for reliability
-        if username == 'admin' and password == 'admin':
-            session.clear()
-            session.permanent = True
-            session['admin_logged_in'] = True
-            session['admin_user_id'] = 1
-            session['admin_username'] = 'admin'
-            flash('관리자로 로그인되었습니다.', 'success')
-            return redirect(url_for('admin_dashboard'))
-        else:
-            flash('잘못된 관리자 정보입니다.', 'error')
-    
-    return render_template('admin_login.html', form=form)
-
-@app.route('/admin/logout')
-def admin_logout():
-    session.pop('admin_logged_in', None)
-    session.pop('admin_user_id', None)
-    session.pop('admin_username', None)
-    flash('관리자 로그아웃되었습니다.', 'success')
-    return redirect(url_for('index'))
+        written = reactions.rebuild_reaction_counts(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    print(f"Rebuilt {written} reaction counters")
 
-@app.route('/admin')
-def admin_dashboard():
-    # Skip auth check for now to test directly
-    if not session.get('admin_logged_in'):
-        flash('관리자 권한이 필요합니다.', 'error')
-        return redirect(url_for('admin_login'))
-    
-    # Statistics
-    stats = {
-        'total_jobs': len(job_posts),
-        'total_intros': len(intro_posts),
-        'total_notices': len(notice_posts),
-        'total_forums': len(forum_posts)
-    }
-    
-    # Recent posts
-    recent_jobs = sorted(job_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)[:5]
-    recent_intros = sorted(intro_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)[:5]
-    recent_notices = sorted(notice_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)[:5]
-    recent_forums = sorted(forum_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)[:5]
-    
-    return render_template('admin_dashboard.html', 
-                         stats=stats,
-                         recent_jobs=recent_jobs,
-                         recent_intros=recent_intros,
-                         recent_notices=recent_notices,
-                         recent_forums=recent_forums)
 
-@app.route('/admin/jobs')
-def admin_jobs():
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Re-index every job posting and self-introduction for /search"""
+    db = get_db()
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, title, company, contact, description, created_at, company_id
-            FROM jobs 
-            ORDER BY created_at DESC
-        """)
-        
-        jobs = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        # Convert to format expected by admin template
-        job_posts_data = []
-        for job in jobs:
-            job_data = {
-                'id': job['id'],
-                'title': job['title'],
-                'company': job['company'],
-                'contact': job['contact'],
-                'description': job['description'],
-                'created_at': job['created_at'],
-                'timestamp': job['created_at'],
-                'company_id': job['company_id']
-            }
-            job_posts_data.append((job['id'], job_data))
-        
-        return render_template('admin_jobs.html', job_posts=job_posts_data)
-        
-    except Exception as e:
-        logging.error(f"Error fetching jobs for admin: {e}")
-        return render_template('admin_jobs.html', job_posts=[])
+        indexed = search.rebuild_search_index(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    print(f"Indexed {indexed} posts")
 
-@app.route('/admin/jobs/<int:job_id>/delete', methods=['POST'])
-@csrf.exempt
-def admin_delete_job(job_id):
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Check if job exists
-        cur.execute("SELECT id FROM jobs WHERE id = %s", (job_id,))
-        if not cur.fetchone():
-            flash('존재하지 않는 채용공고입니다.', 'error')
-            cur.close()
-            conn.close()
-            return redirect(url_for('admin_jobs'))
-        
-        # Delete the job
-        cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
-        conn.commit()
-        cur.close()
-        conn.close()
-        
-        flash('채용공고가 삭제되었습니다.', 'success')
-        
-    except Exception as e:
-        logging.error(f"Error deleting job {job_id}: {e}")
-        flash('채용공고 삭제 중 오류가 발생했습니다.', 'error')
-    
-    return redirect(url_for('admin_jobs'))
-
-@app.route('/admin/intros')
-def admin_intros():
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT id, name, nationality, languages, introduction, created_at, 
-                   gender, korean_fluent, preferred_jobs, preferred_location, 
-                   availability, youtube_link, video_link
-            FROM introductions 
-            ORDER BY created_at DESC
-        """)
-        
-        introductions = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        # Convert to format expected by admin template
-        intro_posts_data = []
-        for intro in introductions:
-            intro_data = {
-                'id': intro['id'],
-                'name': intro['name'],
-                'nationality': intro['nationality'],
-                'languages': intro['languages'],
-                'introduction': intro['introduction'],
-                'created_at': intro['created_at'],
-                'timestamp': intro['created_at'],
-                'gender': intro['gender'],
-                'korean_fluent': intro['korean_fluent'],
-                'preferred_jobs': intro['preferred_jobs'],
-                'preferred_location': intro['preferred_location'],
-                'availability': intro['availability'],
-                'youtube_link': intro['youtube_link'] or intro['video_link']
-            }
-            intro_posts_data.append((intro['id'], intro_data))
-        
-        return render_template('admin_intros.html', intro_posts=intro_posts_data)
-        
-    except Exception as e:
-        logging.error(f"Error fetching introductions for admin: {e}")
-        return render_template('admin_intros.html', intro_posts=[])
-
-@app.route('/admin/intros/<int:intro_id>/delete', methods=['POST'])
-@csrf.exempt
-def admin_delete_intro(intro_id):
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Check if introduction exists
-        cur.execute("SELECT id FROM introductions WHERE id = %s", (intro_id,))
-        if not cur.fetchone():
-            flash('존재하지 않는 자기소개입니다.', 'error')
-            cur.close()
-            conn.close()
-            return redirect(url_for('admin_intros'))
-        
-        # Delete the introduction
-        cur.execute("DELETE FROM introductions WHERE id = %s", (intro_id,))
-        conn.commit()
-        cur.close()
-        conn.close()
-        
-        flash('자기소개가 삭제되었습니다.', 'success')
-        
-    except Exception as e:
-        logging.error(f"Error deleting introduction {intro_id}: {e}")
-        flash('자기소개 삭제 중 오류가 발생했습니다.', 'error')
-    
-    return redirect(url_for('admin_intros'))
-
-@app.route('/admin/notices')
-def admin_notices():
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    sorted_notices = sorted(notice_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-    return render_template('admin_notices.html', notice_posts=sorted_notices)
-
-@app.route('/admin/notices/<int:notice_id>/delete', methods=['POST'])
-@csrf.exempt
-def admin_delete_notice(notice_id):
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    if notice_id in notice_posts:
-        del notice_posts[notice_id]
-        flash('공지사항이 삭제되었습니다.', 'success')
-    else:
-        flash('존재하지 않는 공지사항입니다.', 'error')
-    
-    return redirect(url_for('admin_notices'))
-
-@app.route('/admin/forums')
-def admin_forums():
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    sorted_forums = sorted(forum_posts.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-    return render_template('admin_forums.html', forum_posts=sorted_forums)
 
-@app.route('/admin/forums/<int:forum_id>/delete', methods=['POST'])
-@csrf.exempt
-def admin_delete_forum(forum_id):
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    if forum_id in forum_posts:
-        del forum_posts[forum_id]
-        flash('포럼 게시글이 삭제되었습니다.', 'success')
-    else:
-        flash('존재하지 않는 게시글입니다.', 'error')
-    
-    return redirect(url_for('admin_forums'))
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """Apply pending schema migrations to the configured database"""
+    db = get_db()
+    applied = migrate(db)
+    print(f"Applied migrations: {applied or 'none'}")
 
-@app.template_filter('datetime')
-def datetime_filter(dt):
-    """Format datetime for display"""
-    return dt.strftime('%Y년 %m월 %d일 %H:%M')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
-
-# Reaction routes
-@app.route('/react/<string:post_type>/<int:post_id>', methods=['GET', 'POST'])
-def add_reaction(post_type, post_id):
-    if request.method == 'GET':
-        # Return current reaction data for the post
-        reactions = get_post_reactions(post_type, post_id)
-        return jsonify({'success': True, 'reactions': reactions})
-    
-    if not is_logged_in():
-        return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
-    
-    data = request.get_json()
-    emoji = data.get('emoji') if data else None
-    user_id = session['user_id']
-    
-    if not emoji:
-        return jsonify({'success': False, 'message': '이모지를 선택해주세요.'}), 400
-    
-    conn = get_db_connection()
-    
-    try:
-        if post_type == 'job':
-            # Check if job exists
-            job = conn.execute('SELECT id FROM jobs WHERE id = ?', (post_id,)).fetchone()
-            if not job:
-                return jsonify({'success': False, 'message': '존재하지 않는 게시글입니다.'}), 404
-            
-            # Remove existing reaction from this user for this job and emoji
-            conn.execute('DELETE FROM job_reactions WHERE job_id = ? AND user_id = ? AND emoji = ?', 
-                        (post_id, user_id, emoji))
-            
-            # Add new reaction
-            conn.execute('INSERT INTO job_reactions (job_id, user_id, emoji) VALUES (?, ?, ?)', 
-                        (post_id, user_id, emoji))
-            
-        elif post_type == 'intro':
-            # Check if intro exists
-            intro = conn.execute('SELECT id FROM introductions WHERE id = ?', (post_id,)).fetchone()
-            if not intro:
-                return jsonify({'success': False, 'message': '존재하지 않는 게시글입니다.'}), 404
-            
-            # Remove existing reaction from this user for this intro and emoji
-            conn.execute('DELETE FROM intro_reactions WHERE intro_id = ? AND user_id = ? AND emoji = ?', 
-                        (post_id, user_id, emoji))
-            
-            # Add new reaction
-            conn.execute('INSERT INTO intro_reactions (intro_id, user_id, emoji) VALUES (?, ?, ?)', 
-                        (post_id, user_id, emoji))
-        else:
-            return jsonify({'success': False, 'message': '잘못된 게시글 유형입니다.'}), 400
-        
-        conn.commit()
-        
-        # Get updated reaction counts
-        reactions = get_post_reactions(post_type, post_id)
-        
-        return jsonify({'success': True, 'reactions': reactions})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': '반응 추가 중 오류가 발생했습니다.'}), 500
-    finally:
-        conn.close()
-
-@app.route('/unreact/<string:post_type>/<int:post_id>', methods=['POST'])
-def remove_reaction(post_type, post_id):
-    if not is_logged_in():
-        return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
-    
-    data = request.get_json()
-    emoji = data.get('emoji') if data else None
-    user_id = session['user_id']
-    
-    if not emoji:
-        return jsonify({'success': False, 'message': '이모지를 선택해주세요.'}), 400
-    
-    conn = get_db_connection()
-    
-    try:
-        if post_type == 'job':
-            conn.execute('DELETE FROM job_reactions WHERE job_id = ? AND user_id = ? AND emoji = ?', 
-                        (post_id, user_id, emoji))
-        elif post_type == 'intro':
-            conn.execute('DELETE FROM intro_reactions WHERE intro_id = ? AND user_id = ? AND emoji = ?', 
-                        (post_id, user_id, emoji))
-        else:
-            return jsonify({'success': False, 'message': '잘못된 게시글 유형입니다.'}), 400
-        
-        conn.commit()
-        
-        # Get updated reaction counts
-        reactions = get_post_reactions(post_type, post_id)
-        
-        return jsonify({'success': True, 'reactions': reactions})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': '반응 제거 중 오류가 발생했습니다.'}), 500
-    finally:
-        conn.close()
-
-def get_post_reactions(post_type, post_id):
-    """Get reaction counts and user reactions for a post"""
-    conn = get_db_connection()
-    
-    # Whitelist allowed table and field combinations to prevent SQL injection
-    ALLOWED_REACTIONS = {
-        'job': {'table': 'job_reactions', 'id_field': 'job_id'},
-        'intro': {'table': 'intro_reactions', 'id_field': 'intro_id'}
-    }
-    
-    if post_type not in ALLOWED_REACTIONS:
-        return {}
-    
-    table = ALLOWED_REACTIONS[post_type]['table']
-    id_field = ALLOWED_REACTIONS[post_type]['id_field']
-    
-    # Get reaction counts grouped by emoji
-    reaction_counts = conn.execute(f'''
-        SELECT emoji, COUNT(*) as count 
-        FROM {table} 
-        WHERE {id_field} = ? 
-        GROUP BY emoji
-    ''', (post_id,)).fetchall()
-    
-    # Get current user's reactions if logged in
-    user_reactions = []
-    if is_logged_in():
-        user_reactions_result = conn.execute(f'''
-            SELECT emoji 
-            FROM {table} 
-            WHERE {id_field} = ? AND user_id = ?
-        ''', (post_id, session['user_id'])).fetchall()
-        user_reactions = [row['emoji'] for row in user_reactions_result]
-    
-    conn.close()
-    
-    reactions = {}
-    for row in reaction_counts:
-        reactions[row['emoji']] = {
-            'count': row['count'],
-            'user_reacted': row['emoji'] in user_reactions
-        }
-    
-    return reactions
-
-@app.template_filter('get_reactions')
-def get_reactions_filter(post_type, post_id):
-    """Template filter to get reactions for a post"""
-    return get_post_reactions(post_type, post_id)
-
-def get_db_connection():
-    """Get database connection based on environment"""
-    database_url = app.config.get('SQLALCHEMY_DATABASE_URI')
-    
-    if database_url and database_url.startswith('postgresql'):
-        # Production: Use PostgreSQL
-        try:
-            conn = psycopg2.connect(database_url, cursor_factory=psycopg2.extras.RealDictCursor)
-            return conn
-        except Exception as e:
-            logging.error(f"PostgreSQL connection error: {e}")
-            raise
-    else:
-        # Development/Testing: Use SQLite
-        if database_url == 'sqlite:///:memory:':
-            # For testing
-            conn = sqlite3.connect(':memory:')
-        else:
-            # For development
-            db_file = database_url.replace('sqlite:///', '') if database_url else 'movingbridge_dev.db'
-            conn = sqlite3.connect(db_file)
-        conn.row_factory = sqlite3.Row
-        return conn
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,548 @@
+"""
+Accounts: registration of workers and companies, login, logout and password reset
+"""
+import logging
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, make_response
+
+import facets
+import search
+from accounts import resolve_identity, update_password_hash
+from extensions import content_changed, get_account_availability, get_db, get_password_hasher
+from forms import (CompanyRegisterForm, LoginForm, NewPasswordForm, PasswordResetForm,
+                   Step1RegisterForm, Step2RegisterForm, TAKEN_MESSAGES)
+from http_cache import bump_content_version
+from passwords import HasherBusy
+
+bp = Blueprint('auth', __name__)
+
+# User authentication helpers
+def is_logged_in():
+    return 'user_id' in session
+
+def get_current_user():
+    if not is_logged_in():
+        return None
+    
+    try:
+        return get_db().fetchone('SELECT * FROM users WHERE id = %s', (session['user_id'],))
+    except Exception as e:
+        logging.error(f"Error getting current user: {e}")
+        return None
+
+def require_login():
+    if not is_logged_in():
+        flash('로그인이 필요합니다.', 'error')
+        return redirect(url_for('auth.login'))
+    return None
+
+def is_company_logged_in():
+    """Check if company is logged in"""
+    return session.get('user_type') == 'company' and 'user_id' in session
+
+def is_worker_logged_in():
+    """Check if worker is logged in"""
+    return session.get('user_type') == 'worker' and 'user_id' in session
+
+def require_login_new():
+    """Check if user is logged in (either as company or worker)"""
+    company_status = is_company_logged_in()
+    worker_status = is_worker_logged_in()
+    
+    logging.debug(f"Login check - Company: {company_status}, Worker: {worker_status}")
+    
+    if not (company_status or worker_status):
+        flash('로그인이 필요합니다.', 'error')
+        return redirect(url_for('auth.login'))
+    return None
+
+@bp.app_errorhandler(HasherBusy)
+def password_hasher_busy(e):
+    """Shed logins and registrations while the hashing queue is full"""
+    logging.warning(f"Rejected password hashing request: {e}")
+    response = make_response('요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요.', 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+# Registration choice route
+@bp.route('/register')
+def register_choice():
+    return render_template('register_choice.html')
+
+# Company registration route
+@bp.route('/register/company', methods=['GET', 'POST'])
+def register_company():
+    form = CompanyRegisterForm()
+    valid = form.validate_on_submit()
+    
+    # 폼이 제출되었지만 검증에 실패했을 때 상세한 오류 메시지 제공
+    if request.method == 'POST' and not valid:
+        error_messages = []
+        
+        if form.company_name.errors:
+            error_messages.append('회사명을 입력해주세요.')
+        
+        if form.username.errors:
+            error_messages.append(TAKEN_MESSAGES['username'] if 'username' in form.taken
+                                  else '사용자명을 올바르게 입력해주세요.')
+        
+        if form.password.errors or form.confirm_password.errors:
+            error_messages.append('비밀번호를 올바르게 입력하고 확인해주세요.')
+        
+        if form.business_number.errors:
+            error_messages.append(TAKEN_MESSAGES['business_number'] if 'business_number' in form.taken
+                                  else '사업자등록번호를 올바르게 입력해주세요.')
+        
+        if form.ceo_name.errors:
+            error_messages.append('대표자명을 입력해주세요.')
+        
+        if form.contact_number.errors:
+            error_messages.append('연락처를 올바르게 입력해주세요.')
+        
+        if form.email.errors:
+            error_messages.append(TAKEN_MESSAGES['email'] if 'email' in form.taken
+                                  else '이메일 주소를 올바르게 입력해주세요.')
+        
+        if form.address.errors:
+            error_messages.append('주소를 입력해주세요.')
+        
+        if form.company_description.errors:
+            error_messages.append('회사 설명을 입력해주세요.')
+        
+        if form.privacy_agreement.errors or form.terms_agreement.errors:
+            error_messages.append('개인정보 수집 및 이용에 동의해주세요.')
+        
+        if 'csrf_token' in form and form.csrf_token.errors:
+            error_messages.append('페이지를 새로고침하고 다시 시도해주세요.')
+        
+        # 오류 메시지가 있으면 표시
+        if error_messages:
+            for msg in error_messages:
+                flash(msg, 'error')
+    
+    if valid:
+        # Password confirmation check
+        if form.password.data != form.confirm_password.data:
+            flash('비밀번호가 일치하지 않습니다.', 'error')
+            return render_template('register_company.html', form=form)
+        
+        try:
+            db = get_db()
+            # Hash password and create company
+            password_hash = get_password_hasher().hash(form.password.data)
+            db.execute('''
+                INSERT INTO companies (
+                    company_name, username, business_number, ceo_name, contact_number,
+                    email, password_hash, address, company_description, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ''', (
+                form.company_name.data,
+                form.username.data,
+                form.business_number.data,
+                form.ceo_name.data,
+                form.contact_number.data,
+                form.email.data,
+                password_hash,
+                form.address.data,
+                form.company_description.data
+            ))
+            db.commit()
+            
+            get_account_availability().remember(username=form.username.data, email=form.email.data)
+            flash('업체 회원가입이 완료되었습니다! 로그인해주세요.', 'success')
+            return redirect(url_for('auth.login'))
+                
+        except HasherBusy:
+            raise
+        except Exception as e:
+            logging.error(f"Error creating company: {e}")
+            get_db().rollback()
+            flash('회원가입 중 오류가 발생했습니다.', 'error')
+            return render_template('register_company.html', form=form)
+    
+    return render_template('register_company.html', form=form)
+
+# Worker Registration route (Step 1) - Keep original /register for workers
+@bp.route('/register/worker', methods=['GET', 'POST'])
+@bp.route('/register-worker', methods=['GET', 'POST'])
+def register():
+    form = Step1RegisterForm()
+    valid = form.validate_on_submit()
+    
+    # 폼이 제출되었지만 검증에 실패했을 때 상세한 오류 메시지 제공
+    if request.method == 'POST' and not valid:
+        # 각 필드별 오류 메시지를 사용자 친화적으로 변환
+        error_messages = []
+        
+        if form.username.errors:
+            if 'username' in form.taken:
+                error_messages.append(TAKEN_MESSAGES['username'])
+            else:
+                error_messages.append('사용자명을 올바르게 입력해주세요.')
+        
+        if form.email.errors:
+            if 'email' in form.taken:
+                error_messages.append(TAKEN_MESSAGES['email'])
+            else:
+                error_messages.append('이메일 주소를 올바르게 입력해주세요.')
+        
+        if form.password.errors or form.confirm_password.errors:
+            error_messages.append('비밀번호를 올바르게 입력하고 확인해주세요.')
+        
+        if form.name.errors:
+            error_messages.append('이름을 입력해주세요.')
+        
+        if form.nationality.errors:
+            error_messages.append('국적을 선택해주세요.')
+        
+        if form.gender.errors:
+            error_messages.append('성별을 선택해주세요.')
+        
+        if form.korean_fluent.errors:
+            error_messages.append('한국어 구사 수준을 선택해주세요.')
+        
+        if form.languages.errors:
+            error_messages.append('구사 가능한 언어를 최소 1개 이상 선택해주세요.')
+        
+        if form.preferred_jobs.errors:
+            error_messages.append('희망 직종을 입력해주세요.')
+        
+        if form.preferred_location.errors:
+            error_messages.append('희망 근무지역을 입력해주세요.')
+        
+        if form.availability.errors:
+            error_messages.append('근무 가능 시기를 선택해주세요.')
+        
+        if form.self_intro.errors:
+            error_messages.append('자기소개를 입력해주세요.')
+        
+        if form.privacy_agreement.errors or form.terms_agreement.errors:
+            error_messages.append('개인정보 수집 및 이용에 동의해주세요.')
+        
+        if 'csrf_token' in form and form.csrf_token.errors:
+            error_messages.append('페이지를 새로고침하고 다시 시도해주세요.')
+        
+        # 오류 메시지가 있으면 표시
+        if error_messages:
+            for msg in error_messages:
+                flash(msg, 'error')
+    
+    if valid:
+        db = get_db()
+        try:
+            # First, create user account in users table
+            password_hash = get_password_hasher().hash(form.password.data)
+            user_id = db.fetchval('''
+                INSERT INTO users (username, email, password, password_hash, name) 
+                VALUES (%s, %s, %s, %s, %s) RETURNING id
+            ''', (
+                form.username.data,
+                form.email.data.lower(),
+                password_hash,  # password 필드에도 해시 저장 (호환성)
+                password_hash,  # password_hash 필드에 해시 저장
+                form.name.data
+            ))
+            logging.debug(f"Created user with ID: {user_id}")
+            
+            if user_id is None:
+                raise Exception("Failed to create user account")
+            
+            # Then, insert into introductions table with step 1 data
+            created_at = datetime.now()
+            intro_id = db.fetchval('''
+                INSERT INTO introductions (
+                    user_id, name, nationality, gender, korean_fluent, languages,
+                    preferred_jobs, preferred_location, availability, 
+                    introduction, step_completed, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            ''', (
+                user_id,
+                form.name.data,
+                form.nationality.data,
+                form.gender.data,
+                form.korean_fluent.data == 'yes',
+                ','.join(form.languages.data) if form.languages.data else '',
+                form.preferred_jobs.data,
+                form.preferred_location.data,
+                form.availability.data,
+                form.self_intro.data,
+                1,  # Step 1 completed
+                created_at
+            ))
+            
+            # Get the introduction ID
+            logging.debug(f"Got intro_id from RETURNING: {intro_id}")
+            
+            if intro_id is None or intro_id == 0:
+                # Fallback method
+                intro_id = db.fetchval('SELECT MAX(id) FROM introductions WHERE user_id = %s', (user_id,))
+                logging.debug(f"Got intro_id from MAX fallback: {intro_id}")
+            
+            if intro_id:
+                facets.store_values(db, 'language', intro_id, form.languages.data)
+                search.index_intro(db, {
+                    'id': intro_id, 'name': form.name.data, 'introduction': form.self_intro.data,
+                    'preferred_jobs': form.preferred_jobs.data,
+                    'preferred_location': form.preferred_location.data, 'created_at': created_at,
+                })
+            bump_content_version(db, 'introductions', intro_id)
+            db.commit()
+            get_account_availability().remember(username=form.username.data, email=form.email.data)
+            content_changed('introductions', intro_id)
+            
+            if intro_id is None or intro_id == 0:
+                raise Exception(f"Could not get introduction ID, got: {intro_id}")
+            
+            # Store intro_id in session for step 2
+            session['intro_id'] = intro_id
+            flash('1단계 등록이 완료되었습니다!', 'success')
+            return redirect(url_for('auth.success'))
+                
+        except HasherBusy:
+            raise
+        except Exception as e:
+            logging.error(f"Error creating introduction: {e}")
+            
+            # Rollback the transaction
+            try:
+                db.rollback()
+            except:
+                pass
+            
+            error_msg = str(e)
+            if ('duplicate key value violates unique constraint "users_username_key"' in error_msg
+                    or 'UNIQUE constraint failed: users.username' in error_msg
+                    or 'users_username_lower_key' in error_msg):
+                flash(TAKEN_MESSAGES['username'], 'error')
+            elif ('duplicate key value violates unique constraint "users_email_key"' in error_msg
+                    or 'UNIQUE constraint failed: users.email' in error_msg
+                    or 'users_email_lower_key' in error_msg):
+                flash(TAKEN_MESSAGES['email'], 'error')
+            else:
+                flash('등록 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.', 'error')
+            
+            return render_template('register.html', form=form)
+    
+    return render_template('register.html', form=form)
+
+@bp.route('/check_username', methods=['POST'])
+def check_username():
+    """API endpoint to check if username is available"""
+    try:
+        data = request.get_json()
+        username = data.get('username', '').strip() if data else ''
+    except:
+        return jsonify({'available': False, 'message': '잘못된 요청입니다.'})
+    
+    if not username:
+        return jsonify({'available': False, 'message': '사용자명을 입력해주세요.'})
+    
+    if len(username) < 3:
+        return jsonify({'available': False, 'message': '사용자명은 3자 이상이어야 합니다.'})
+    
+    try:
+        # Usernames are unique across users and companies, ignoring case
+        if get_account_availability().username_available(get_db(), username):
+            return jsonify({'available': True, 'message': '사용 가능한 사용자명입니다.'})
+        else:
+            return jsonify({'available': False, 'message': '이미 사용 중인 사용자명입니다.'})
+    
+    except Exception as e:
+        logging.error(f"Error checking username: {e}")
+        return jsonify({'available': False, 'message': '확인 중 오류가 발생했습니다.'})
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    form = LoginForm()
+    
+    if form.validate_on_submit():
+        login_id = form.email.data.strip()  # Can be email or username
+        password = form.password.data
+        
+        try:
+            # A login id may name a company or a worker; companies are tried first
+            db = get_db()
+            for account in resolve_identity(db, login_id):
+                if not account['password_hash']:
+                    continue
+                matches, new_hash = get_password_hasher().verify_and_update(account['password_hash'], password)
+                if not matches:
+                    continue
+                if new_hash:
+                    # Stored with outdated hashing parameters: upgrade while the password is at hand
+                    update_password_hash(db, account['account_type'], account['id'], new_hash)
+                    db.commit()
+                
+                session.clear()
+                session.permanent = True
+                session['user_id'] = account['id']
+                session['email'] = account['email']
+                if account['account_type'] == 'company':
+                    session['company_id'] = account['id']  # 호환성을 위해 company_id도 저장
+                    session['username'] = account['username'] or account['name']
+                    session['role'] = 'company'
+                    session['user_type'] = 'company'
+                    flash(f'{account["name"]} 업체 관리자님 환영합니다!', 'success')
+                else:
+                    session['username'] = account['username']
+                    session['role'] = 'user'
+                    session['user_type'] = 'worker'
+                    flash(f'{account["username"]}님 환영합니다!', 'success')
+                return redirect(url_for('posts.index'))
+            
+            flash('아이디/이메일 또는 비밀번호가 올바르지 않습니다.', 'error')
+        except HasherBusy:
+            raise
+        except Exception as e:
+            logging.error(f"Error during login: {e}")
+            logging.error(f"Login attempt with: {login_id}")
+            flash('로그인 중 오류가 발생했습니다.', 'error')
+    
+    return render_template('login.html', form=form)
+
+@bp.route('/password-reset', methods=['GET', 'POST'])
+def password_reset():
+    """비밀번호 재설정 요청 페이지"""
+    form = PasswordResetForm()
+    
+    if form.validate_on_submit():
+        email = form.email.data.strip().lower()
+        
+        try:
+            db = get_db()
+            
+            # Check if email exists in users or companies table
+            user = db.fetchone('SELECT id, username FROM users WHERE email = %s', (email,))
+            company = db.fetchone('SELECT id, company_name FROM companies WHERE email = %s', (email,))
+            
+            if user or company:
+                # In a real application, you would send an email here
+                # For now, we'll just redirect to a success page
+                session['reset_email'] = email
+                flash('비밀번호 재설정 링크가 이메일로 전송되었습니다. (개발 모드에서는 아래 링크를 사용하세요)', 'info')
+                return redirect(url_for('auth.password_reset_confirm', email=email))
+            else:
+                flash('등록되지 않은 이메일입니다.', 'error')
+                
+        except Exception as e:
+            logging.error(f"Error during password reset: {e}")
+            flash('비밀번호 재설정 요청 중 오류가 발생했습니다.', 'error')
+    
+    return render_template('password_reset.html', form=form)
+
+@bp.route('/password-reset/confirm/<email>')
+def password_reset_confirm(email):
+    """비밀번호 재설정 확인 페이지 (개발 모드용)"""
+    if session.get('reset_email') != email:
+        flash('유효하지 않은 접근입니다.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('password_reset_confirm.html', email=email)
+
+@bp.route('/password-reset/new/<email>', methods=['GET', 'POST'])
+def password_reset_new(email):
+    """새 비밀번호 설정 페이지"""
+    if session.get('reset_email') != email:
+        flash('유효하지 않은 접근입니다.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    form = NewPasswordForm()
+    
+    if form.validate_on_submit():
+        new_password = form.password.data
+        password_hash = get_password_hasher().hash(new_password)
+        
+        try:
+            db = get_db()
+            
+            # Update password in users table
+            db.execute('UPDATE users SET password_hash = %s WHERE email = %s', 
+                       (password_hash, email))
+            
+            # Update password in companies table
+            db.execute('UPDATE companies SET password_hash = %s WHERE email = %s', 
+                       (password_hash, email))
+            
+            db.commit()
+            
+            # Clear reset session
+            session.pop('reset_email', None)
+            
+            flash('비밀번호가 성공적으로 변경되었습니다. 새 비밀번호로 로그인해주세요.', 'success')
+            return redirect(url_for('auth.login'))
+            
+        except Exception as e:
+            logging.error(f"Error updating password: {e}")
+            get_db().rollback()
+            flash('비밀번호 변경 중 오류가 발생했습니다.', 'error')
+    
+    return render_template('password_reset_new.html', form=form, email=email)
+
+@bp.route('/logout')
+def logout():
+    username = session.get('username', '')
+    session.pop('user_id', None)
+    session.pop('username', None)
+    session.pop('email', None)
+    session.pop('role', None)
+    if username:
+        flash(f'{username}님 로그아웃되었습니다.', 'success')
+    return redirect(url_for('posts.index'))
+
+# Success page route
+@bp.route('/success')
+def success():
+    return render_template('success.html')
+
+# Step 2 Registration route
+@bp.route('/more-info', methods=['GET', 'POST'])
+def more_info():
+    form = Step2RegisterForm()
+    
+    if form.validate_on_submit():
+        intro_id = session.get('intro_id')
+        if not intro_id:
+            flash('등록 정보를 찾을 수 없습니다. 다시 등록해주세요.', 'error')
+            return redirect(url_for('auth.register'))
+        
+        try:
+            db = get_db()
+            # Update the existing record with step 2 data
+            db.execute('''
+                UPDATE introductions SET
+                    visa_type = %s, visa_expiry = %s, past_jobs = %s,
+                    expected_salary = %s, housing_preference = %s,
+                    licenses = %s, religion = %s, work_hours = %s,
+                    step_completed = %s
+                WHERE id = %s
+            ''', (
+                form.visa_type.data or None,
+                form.visa_expiry.data,
+                form.past_jobs.data or None,
+                form.expected_salary.data or None,
+                form.housing_preference.data or None,
+                ','.join(form.licenses.data) if form.licenses.data else None,
+                form.religion.data or None,
+                form.work_hours.data or None,
+                2,  # Step 2 completed
+                intro_id
+            ))
+            facets.store_values(db, 'license', intro_id, form.licenses.data)
+            bump_content_version(db, 'introductions', intro_id)
+            db.commit()
+            content_changed('introductions', intro_id)
+            
+            # Clear session
+            session.pop('intro_id', None)
+            flash('추가 정보가 성공적으로 등록되었습니다!', 'success')
+            return redirect(url_for('posts.intro_list'))
+                
+        except Exception as e:
+            logging.error(f"Error updating introduction: {e}")
+            get_db().rollback()
+            flash('정보 업데이트 중 오류가 발생했습니다.', 'error')
+            return render_template('more_info.html', form=form)
+    
+    return render_template('more_info.html', form=form)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the hot in-process code paths
+Row-to-dict conversion for the list pages, rendering of every list template
+at 10/100/1000 rows, the datetime filter, reaction lookups, input
+sanitizing and registration form validation. Each benchmark is timed in
+batches long enough to be stable and reports ops/sec plus the memory one
+call allocates (tracemalloc peak) and keeps (retained). The database is a
+small generated SQLite file, so runs are isolated and take seconds
+
+    python bench_micro.py --output bench_baseline.json
+    python bench_micro.py --baseline bench_baseline.json
+    python bench_micro.py --filter render.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault('SESSION_SECRET', 'bench')
+
+import generate_data
+from config import TestConfig
+
+# Rows rendered per template benchmark
+RENDER_SIZES = (10, 100, 1000)
+
+# Small enough to generate in a second, large enough for 1000-row pages
+COUNTS = {'companies': 50, 'users': 500, 'jobs': 1000, 'introductions': 1000,
+          'notices': 1000, 'forum_posts': 1000, 'reactions': 3000}
+
+# Fixed so that runs compare the same rows
+UNTIL = datetime(2026, 1, 1)
+
+# Allocation changes smaller than this are noise, whatever the percentage
+ALLOC_NOISE_BYTES = 1024
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register `setup(fixture) -> callable`; the callable is one operation"""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class Fixture:
+    """The app, its request contexts and rows read once from the generated database"""
+
+    def __init__(self, path):
+        import app as app_module
+
+        class BenchConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+            SLOW_QUERY_MS = 0
+
+        db = generate_data.open_database(BenchConfig.SQLALCHEMY_DATABASE_URI)
+        try:
+            generate_data.generate(db, COUNTS, seed=1, until=UNTIL,
+                                   password_method=BenchConfig.PASSWORD_HASH_METHOD, log=lambda line: None)
+        finally:
+            db.conn.close()
+
+        self.app = app_module.create_app(BenchConfig)
+        self._contexts = []
+
+    def request(self, *args, **kwargs):
+        """Push a request context that stays open for the rest of the run"""
+        ctx = self.app.test_request_context(*args, **kwargs)
+        ctx.push()
+        self._contexts.append(ctx)
+        return ctx
+
+    def rows(self, table, columns, count):
+        from extensions import get_db
+        with self.app.test_request_context():
+            return get_db().fetchall(f'SELECT {columns} FROM {table} ORDER BY created_at DESC, id DESC LIMIT ?',
+                                     (count,))
+
+    def close(self):
+        while self._contexts:
+            self._contexts.pop().pop()
+
+
+# --- row conversion ---------------------------------------------------------
+
+@benchmark('rows.job_list_item[1000]')
+def bench_job_rows(fixture):
+    from posts import JOB_LIST_COLUMNS, job_list_item
+    rows = fixture.rows('jobs', JOB_LIST_COLUMNS, 1000)
+    return lambda: [job_list_item(row) for row in rows]
+
+
+@benchmark('rows.intro_list_item[1000]')
+def bench_intro_rows(fixture):
+    from posts import INTRO_LIST_COLUMNS, intro_list_item
+    rows = fixture.rows('introductions', INTRO_LIST_COLUMNS, 1000)
+    return lambda: [intro_list_item(row) for row in rows]
+
+
+# --- templates --------------------------------------------------------------
+
+def _render(fixture, template, **context):
+    from flask import render_template
+    fixture.request('/')
+    return lambda: render_template(template, **context)
+
+
+def _page(items):
+    from pagination import Page
+    return Page(items, next_cursor='next', prev_cursor='prev')
+
+
+def _job_context(fixture, size):
+    from posts import JOB_LIST_COLUMNS, job_list_item
+    rows = fixture.rows('jobs', JOB_LIST_COLUMNS, size)
+    return {'job_posts': [job_list_item(row) for row in rows], 'page': _page(rows)}
+
+
+def _intro_context(fixture, size):
+    import facets
+    from extensions import get_db
+    from forms import INTRO_FACET_CHOICES
+    from posts import INTRO_LIST_COLUMNS, intro_list_item
+    rows = fixture.rows('introductions', INTRO_LIST_COLUMNS, size)
+    with fixture.app.test_request_context():
+        counts = facets.facet_counts(get_db(), {})
+    return {'intro_posts': [intro_list_item(row) for row in rows], 'page': _page(rows),
+            'filters': {}, 'facet_counts': counts, 'facet_choices': INTRO_FACET_CHOICES}
+
+
+def _notice_context(fixture, size):
+    rows = fixture.rows('notices', '*', size)
+    return {'notice_posts': [(row['id'], row) for row in rows], 'page': _page(rows)}
+
+
+def _forum_context(fixture, size):
+    from posts import FORUM_LIST_COLUMNS
+    rows = fixture.rows('forum_posts', FORUM_LIST_COLUMNS, size)
+    return {'forum_posts': [(row['id'], row) for row in rows], 'page': _page(rows)}
+
+
+def _admin_forum_context(fixture, size):
+    rows = fixture.rows('forum_posts', '*', size)
+    return {'forum_posts': [(row['id'], row) for row in rows], 'page': _page(rows)}
+
+
+TEMPLATES = (
+    ('job_list.html', _job_context),
+    ('intro_list.html', _intro_context),
+    ('notice_list.html', _notice_context),
+    ('forum_list.html', _forum_context),
+    ('admin_jobs.html', _job_context),
+    ('admin_intros.html', _intro_context),
+    ('admin_notices.html', _notice_context),
+    ('admin_forums.html', _admin_forum_context),
+)
+
+
+def _register_render(template, build_context, size):
+    @benchmark(f"render.{template.rsplit('.', 1)[0]}[{size}]")
+    def bench_render(fixture):
+        return _render(fixture, template, **build_context(fixture, size))
+
+
+for _template, _build_context in TEMPLATES:
+    for _size in RENDER_SIZES:
+        _register_render(_template, _build_context, _size)
+
+
+# --- helpers ----------------------------------------------------------------
+
+@benchmark('filter.datetime')
+def bench_datetime_filter(fixture):
+    from posts import datetime_filter
+    value = datetime(2025, 12, 31, 23, 59)
+    return lambda: datetime_filter(value)
+
+
+@benchmark('get_post_reactions')
+def bench_get_post_reactions(fixture):
+    from flask import session
+    from posts import get_post_reactions
+    fixture.request('/')
+    session['user_id'] = 1
+    return lambda: get_post_reactions('job', 1)
+
+
+@benchmark('sanitize_input')
+def bench_sanitize_input(fixture):
+    from posts import sanitize_input
+    text = '  이사 경험 3년, 성실하게 일하겠습니다. <b>잘 부탁드립니다</b>  ' * 20
+    return lambda: sanitize_input(text)
+
+
+# --- forms ------------------------------------------------------------------
+
+def _validate(fixture, form_class, data):
+    fixture.request('/', method='POST', data=data)
+
+    def validate():
+        form = form_class()
+        if not form.validate():
+            raise AssertionError(f'{form_class.__name__} rejected the benchmark data: {form.errors}')
+    return validate
+
+
+@benchmark('form.Step1RegisterForm')
+def bench_step1_form(fixture):
+    from forms import Step1RegisterForm
+    return _validate(fixture, Step1RegisterForm, {
+        'name': 'Nguyen Anh', 'username': 'benchuser', 'email': 'bench.user@example.com',
+        'password': 'password123', 'confirm_password': 'password123', 'nationality': 'vietnam',
+        'gender': 'male', 'korean_fluent': 'yes', 'languages': ['Korean', 'Vietnamese'],
+        'preferred_jobs': 'moving', 'preferred_location': 'seoul', 'availability': 'immediate',
+        'self_intro': '이사 경험 3년, 성실하게 일하겠습니다.', 'privacy_agreement': 'y', 'terms_agreement': 'y',
+    })
+
+
+@benchmark('form.CompanyRegisterForm')
+def bench_company_form(fixture):
+    from forms import CompanyRegisterForm
+    return _validate(fixture, CompanyRegisterForm, {
+        'company_name': '벤치 이사', 'username': 'benchcompany', 'business_number': '123-45-67890',
+        'ceo_name': '김대표', 'contact_number': '010-1234-5678', 'email': 'bench.company@example.com',
+        'password': 'password123', 'confirm_password': 'password123', 'address': '서울 강남구 테헤란로 1',
+        'privacy_agreement': 'y', 'terms_agreement': 'y',
+    })
+
+
+# --- measuring --------------------------------------------------------------
+
+def _time_batch(operation, number):
+    # Like timeit: the collector would charge one benchmark for another's garbage
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            operation()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure(operation, min_time, repeat):
+    """ops/sec (median and best of `repeat` batches) and bytes allocated per call"""
+    operation()
+    number = 1
+    while _time_batch(operation, number) < min_time:
+        number *= 2
+    rates = [number / _time_batch(operation, number) for _ in range(repeat)]
+
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        operation()
+        for _ in range(repeat):
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            operation()
+            peak = tracemalloc.get_traced_memory()[1]
+            # Reference cycles the call left behind are garbage, not kept memory
+            gc.collect()
+            peaks.append(peak - before)
+            retained.append(tracemalloc.get_traced_memory()[0] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ops_per_sec': statistics.median(rates),
+        'best_ops_per_sec': max(rates),
+        'alloc_peak_bytes': int(statistics.median(peaks)),
+        'alloc_retained_bytes': int(statistics.median(retained)),
+        'loops': number,
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Regression messages: slower or allocating more than max_regression percent"""
+    problems = []
+    limit = max_regression / 100
+    for name, result in results.items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if before is None:
+            continue
+        if result['ops_per_sec'] < before['ops_per_sec'] * (1 - limit):
+            problems.append(f"{name}: {result['ops_per_sec']:,.0f} ops/s, was {before['ops_per_sec']:,.0f}")
+        grown = result['alloc_peak_bytes'] - before['alloc_peak_bytes']
+        if grown > ALLOC_NOISE_BYTES and grown > before['alloc_peak_bytes'] * limit:
+            problems.append(f"{name}: allocates {result['alloc_peak_bytes']:,} bytes, "
+                            f"was {before['alloc_peak_bytes']:,}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', action='append', default=[],
+                        help='only run benchmarks whose name contains this text (repeatable)')
+    parser.add_argument('--list', action='store_true', help='print the benchmark names and exit')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timed batch (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed batches per benchmark (default: 5)')
+    parser.add_argument('--output', help='write the results as JSON (e.g. a new baseline)')
+    parser.add_argument('--baseline', help='JSON written by an earlier --output run to compare against')
+    parser.add_argument('--max-regression', type=float, default=20,
+                        help='percent slower or more allocation that fails the run (default: 20)')
+    args = parser.parse_args()
+
+    selected = [(name, setup) for name, setup in BENCHMARKS
+                if not args.filter or any(text in name for text in args.filter)]
+    if args.list:
+        for name, _ in selected:
+            print(name)
+        return 0
+    if not selected:
+        print("❌ No benchmark matches --filter")
+        return 1
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='movingbridge-bench-') as tmp:
+        fixture = Fixture(os.path.join(tmp, 'bench.db'))
+        try:
+            print(f"{'benchmark':<34} {'ops/sec':>12} {'best':>12} {'peak KiB':>9} {'kept B':>8}")
+            for name, setup in selected:
+                result = results[name] = measure(setup(fixture), args.min_time, args.repeat)
+                print(f"{name:<34} {result['ops_per_sec']:>12,.0f} {result['best_ops_per_sec']:>12,.0f} "
+                      f"{result['alloc_peak_bytes'] / 1024:>9.1f} {result['alloc_retained_bytes']:>8,}")
+        finally:
+            fixture.close()
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'benchmarks': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print(f"✅ No benchmark regressed by more than {args.max_regression:g}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
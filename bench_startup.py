@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long a fresh worker takes to import the app, build it
+with create_app() and answer its first requests
+Every run is a new interpreter, so nothing is cached between runs. Pass
+--max-import-ms / --max-first-request-ms to fail (exit 1) on a regression
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Runs in the child interpreter; prints one JSON line of timings in milliseconds
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+client = application.test_client()
+health = client.get('/health')
+first = time.perf_counter()
+home = client.get('/')
+page = time.perf_counter()
+print(json.dumps({
+    'import': (imported - start) * 1000,
+    'create_app': (created - imported) * 1000,
+    'first_request': (first - created) * 1000,
+    'first_page': (page - first) * 1000,
+    'status': [health.status_code, home.status_code],
+}))
+'''
+
+PHASES = ('import', 'create_app', 'first_request', 'first_page')
+
+
+def run_once():
+    """Timings of one cold start"""
+    env = dict(os.environ, SESSION_SECRET=os.environ.get('SESSION_SECRET', 'bench'))
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='cold starts to measure (default: 5)')
+    parser.add_argument('--max-import-ms', type=float, help='fail if the median import time is higher')
+    parser.add_argument('--max-first-request-ms', type=float,
+                        help='fail if the median time from import to the first response is higher')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    for run in runs:
+        if run['status'][0] != 200:
+            print(f"❌ /health answered {run['status'][0]}")
+            return 1
+
+    medians = {}
+    print(f"Cold starts: {args.runs}  (median / max, ms)")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        medians[phase] = statistics.median(values)
+        print(f"  {phase:<14} {medians[phase]:8.1f} / {max(values):8.1f}")
+    boot = medians['create_app'] + medians['first_request']
+
+    failed = False
+    if args.max_import_ms is not None and medians['import'] > args.max_import_ms:
+        print(f"❌ import took {medians['import']:.1f} ms (limit {args.max_import_ms} ms)")
+        failed = True
+    if args.max_first_request_ms is not None and boot > args.max_first_request_ms:
+        print(f"❌ create_app + first request took {boot:.1f} ms (limit {args.max_first_request_ms} ms)")
+        failed = True
+    if failed:
+        return 1
+    if args.max_import_ms is not None or args.max_first_request_ms is not None:
+        print("✅ Startup within limits")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,7 +8,62 @@ class Config:
     SECRET_KEY = os.environ.get('SESSION_SECRET')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     WTF_CSRF_ENABLED = True
-    
+
+    # Logging: root level (DEBUG, INFO, WARNING, ...), 'text' or 'json' lines,
+    # records buffered before new ones are dropped, and DEBUG records let
+    # through per call site per second
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    LOG_SAMPLE_PER_SECOND = float(os.environ.get('LOG_SAMPLE_PER_SECOND', 10))
+
+    # /metrics: reachable with an admin session or "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Optional per-process JSON dumps ({pid} is filled in); /metrics merges them, metrics.py reads them offline
+    METRICS_DUMP_PATH = os.environ.get('METRICS_DUMP_PATH')
+    METRICS_DUMP_INTERVAL = float(os.environ.get('METRICS_DUMP_INTERVAL', 60))
+
+    # Slow-query log: statements at or over SLOW_QUERY_MS are logged with their EXPLAIN plan
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '1').lower() in ('1', 'true', 'yes')
+    # EXPLAIN ANALYZE runs the SELECT a second time (PostgreSQL only)
+    SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', '').lower() in ('1', 'true', 'yes')
+    # Log requests running one statement this many times (likely N+1); 0 turns it off
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 0))
+
+    # Rows per page on list pages
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 20))
+
+    # Seconds a cached home page section may be served before it is rebuilt
+    HOME_FEED_TTL = int(os.environ.get('HOME_FEED_TTL', 30))
+
+    # Conditional GET: how long a front cache may keep anonymous pages (raise
+    # once purging is configured), and
+    # where to send surrogate-key purges after writes (optional)
+    HTTP_CACHE_S_MAXAGE = int(os.environ.get('HTTP_CACHE_S_MAXAGE', 0))
+    HTTP_CACHE_PURGE_URL = os.environ.get('HTTP_CACHE_PURGE_URL')
+    HTTP_CACHE_PURGE_TOKEN = os.environ.get('HTTP_CACHE_PURGE_TOKEN')
+
+    # Seconds before the in-process filter of taken usernames/emails is rebuilt
+    ACCOUNT_FILTER_TTL = int(os.environ.get('ACCOUNT_FILTER_TTL', 300))
+
+    # Password hashing: werkzeug method string, threads per worker process,
+    # waiting requests beyond which logins get 503, and seconds a hash may take
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Job/worker matching: results per page, and how often a worker reloads
+    # profiles written by other workers (seconds)
+    MATCH_RESULTS = int(os.environ.get('MATCH_RESULTS', 20))
+    MATCH_REFRESH_INTERVAL = int(os.environ.get('MATCH_REFRESH_INTERVAL', 60))
+
+    # Write-behind reaction buffering (off by default)
+    REACTION_WRITE_BEHIND = os.environ.get('REACTION_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+    REACTION_FLUSH_INTERVAL_MS = int(os.environ.get('REACTION_FLUSH_INTERVAL_MS', 200))
+    REACTION_BUFFER_MAX = int(os.environ.get('REACTION_BUFFER_MAX', 10000))
+
     # Security headers
     TALISMAN_CONFIG = {
         'force_https': False,
@@ -30,6 +85,15 @@ class DevelopmentConfig(Config):
     # Use SQLite for development
     SQLALCHEMY_DATABASE_URI = 'sqlite:///movingbridge_dev.db'
     
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
+
+    # Flag N+1 patterns and moderately slow statements while developing
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 50))
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 10))
+    
+    # Cheaper hashes keep local logins fast; production upgrades them on login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:100000')
+    
     # Disable HTTPS enforcement for development
     WTF_CSRF_SSL_STRICT = False
     SESSION_COOKIE_SECURE = False
@@ -54,6 +118,14 @@ class ProductionConfig(Config):
         'pool_pre_ping': True,
     }
     
+    # One JSON object per log line for the log collector
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    
+    # Connection pool sizing (per gunicorn worker process)
+    DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+    
     # Enable security features for production
     WTF_CSRF_SSL_STRICT = True
     SESSION_COOKIE_SECURE = True
@@ -82,6 +154,8 @@ class TestConfig(Config):
     
     # Use in-memory SQLite for testing
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    LOG_LEVEL = 'WARNING'
     
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
@@ -8,106 +8,24 @@ import os
 import psycopg2
 import psycopg2.extras
 from dotenv import load_dotenv
+from db import Database, POSTGRESQL
+from migrations import migrate
 
 load_dotenv()
 
 def create_tables():
-    """Create all necessary database tables"""
+    """Create all necessary database tables by applying pending migrations"""
     database_url = os.environ.get('DATABASE_URL')
     if not database_url:
         print("DATABASE_URL environment variable not set")
         return False
     
     try:
-        conn = psycopg2.connect(database_url)
-        cur = conn.cursor()
-        
-        # Users table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Jobs table 
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(200) NOT NULL,
-                company VARCHAR(100) NOT NULL,
-                contact VARCHAR(100) NOT NULL,
-                description TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Introductions table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS introductions (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                nationality VARCHAR(50) NOT NULL,
-                languages VARCHAR(200) NOT NULL,
-                youtube_link VARCHAR(500),
-                introduction TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Notices table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS notices (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(200) NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Forum posts table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS forum_posts (
-                id SERIAL PRIMARY KEY,
-                author VARCHAR(100) NOT NULL,
-                title VARCHAR(200) NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Job reactions table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS job_reactions (
-                id SERIAL PRIMARY KEY,
-                job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                emoji VARCHAR(10) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(job_id, user_id, emoji)
-            )
-        ''')
-        
-        # Introduction reactions table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS intro_reactions (
-                id SERIAL PRIMARY KEY,
-                intro_id INTEGER REFERENCES introductions(id) ON DELETE CASCADE,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                emoji VARCHAR(10) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(intro_id, user_id, emoji)
-            )
-        ''')
-        
-        conn.commit()
-        cur.close()
+        conn = psycopg2.connect(database_url, cursor_factory=psycopg2.extras.RealDictCursor)
+        applied = migrate(Database(conn, POSTGRESQL))
         conn.close()
         
-        print("Database tables created successfully")
+        print(f"Database tables created successfully (applied migrations: {applied or 'none'})")
         return True
         
     except Exception as e:
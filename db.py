@@ -0,0 +1,203 @@
+"""
+Dialect-neutral data access layer
+Statements are written once with %s placeholders and rewritten per dialect;
+rows come back as plain dicts from both PostgreSQL and SQLite
+"""
+import time
+import sqlite3
+import datetime
+from functools import lru_cache
+
+POSTGRESQL = 'postgresql'
+SQLITE = 'sqlite'
+
+
+def get_dialect(database_url):
+    """Map a database URL to the dialect name used by this module"""
+    if database_url and database_url.startswith(('postgresql', 'postgres://')):
+        return POSTGRESQL
+    return SQLITE
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql, dialect):
+    """Rewrite a %s-style statement for the target dialect
+
+    Whitespace outside string literals is collapsed so the same statement
+    always maps to the same text. Results are cached per (statement, dialect),
+    so hot queries are only scanned once per process.
+    """
+    out = []
+    in_literal = False
+    pending_space = False
+    i = 0
+    length = len(sql)
+    while i < length:
+        ch = sql[i]
+        if in_literal:
+            # psycopg2 treats %% as an escaped % even inside literals
+            if ch == '%' and dialect == SQLITE and sql[i + 1:i + 2] == '%':
+                i += 1
+            out.append(ch)
+            if ch == "'":
+                in_literal = False
+            i += 1
+            continue
+        if ch.isspace():
+            pending_space = bool(out)
+            i += 1
+            continue
+        if pending_space:
+            out.append(' ')
+            pending_space = False
+        if ch == "'":
+            in_literal = True
+            out.append(ch)
+        elif ch == '%' and i + 1 < length and sql[i + 1] in 's%':
+            if dialect == SQLITE:
+                out.append('?' if sql[i + 1] == 's' else '%')
+            else:
+                out.append(sql[i:i + 2])
+            i += 1
+        else:
+            out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+def _dict_row_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _convert_timestamp(value):
+    return datetime.datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value):
+    return datetime.date.fromisoformat(value.decode())
+
+
+def _convert_boolean(value):
+    return value not in (b'0', b'', b'false', b'FALSE')
+
+
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+sqlite3.register_converter('DATETIME', _convert_timestamp)
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('BOOLEAN', _convert_boolean)
+
+
+def connect_sqlite(path):
+    """Open a SQLite connection that returns dict rows and typed timestamps"""
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.row_factory = _dict_row_factory
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+
+class Cursor:
+    """DB-API cursor wrapper that normalizes statements before executing"""
+
+    def __init__(self, raw, dialect):
+        self._raw = raw
+        self.dialect = dialect
+
+    def execute(self, sql, params=()):
+        self._raw.execute(normalize_sql(sql, self.dialect), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._raw.executemany(normalize_sql(sql, self.dialect), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._raw.fetchone()
+
+    def fetchall(self):
+        return self._raw.fetchall()
+
+    def fetchmany(self, size):
+        return self._raw.fetchmany(size)
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    def close(self):
+        self._raw.close()
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class Database:
+    """Thin handle over one DB-API connection for a single dialect
+
+    `observer`, if given, is called as observer(db, sql, params, seconds, rows)
+    after every statement that succeeds, with the time spent executing it and
+    fetching its rows and the number of rows returned (or affected).
+    """
+
+    def __init__(self, conn, dialect, observer=None):
+        self.conn = conn
+        self.dialect = dialect
+        self.observer = observer
+
+    def cursor(self):
+        return Cursor(self.conn.cursor(), self.dialect)
+
+    def _observe(self, sql, params, started, rows):
+        if self.observer is not None:
+            self.observer(self, sql, params, time.perf_counter() - started, rows)
+
+    def execute(self, sql, params=()):
+        """Execute a statement that returns no rows and report the row count"""
+        started = time.perf_counter()
+        with self.cursor() as cur:
+            rowcount = cur.execute(sql, params).rowcount
+        self._observe(sql, params, started, rowcount)
+        return rowcount
+
+    def executemany(self, sql, seq_of_params):
+        started = time.perf_counter()
+        with self.cursor() as cur:
+            rowcount = cur.executemany(sql, seq_of_params).rowcount
+        self._observe(sql, None, started, rowcount)
+        return rowcount
+
+    def fetchone(self, sql, params=()):
+        """Execute a query and return the first row as a dict, or None"""
+        started = time.perf_counter()
+        with self.cursor() as cur:
+            row = cur.execute(sql, params).fetchone()
+        self._observe(sql, params, started, 0 if row is None else 1)
+        return row
+
+    def fetchall(self, sql, params=()):
+        """Execute a query and return every row as a dict"""
+        started = time.perf_counter()
+        with self.cursor() as cur:
+            rows = cur.execute(sql, params).fetchall()
+        self._observe(sql, params, started, len(rows))
+        return rows
+
+    def fetchval(self, sql, params=()):
+        """Execute a query and return the first column of the first row"""
+        row = self.fetchone(sql, params)
+        if row is None:
+            return None
+        return next(iter(row.values()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
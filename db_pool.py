@@ -0,0 +1,214 @@
+"""
+PostgreSQL connection pool for the production database path
+Hands out one connection per request and health-checks idle connections
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections with pre-ping and recycling"""
+
+    def __init__(self, dsn, min_size=1, max_size=10, timeout=5.0,
+                 recycle=300, pre_ping=True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.pid = os.getpid()
+
+        self._lock = threading.Condition(threading.Lock())
+        # Idle connections as (conn, returned_at), most recently used last
+        self._idle = deque()
+        self._created_at = {}
+        self._in_use = 0
+        self._closed = False
+        self._counters = {
+            'checkouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'failed_pings': 0,
+            'recycled': 0,
+            'waits': 0,
+            'timeouts': 0,
+        }
+
+        for _ in range(min_size):
+            conn = self._connect()
+            self._idle.append((conn, time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, cursor_factory=psycopg2.extras.RealDictCursor)
+        with self._lock:
+            self._created_at[id(conn)] = time.monotonic()
+            self._counters['created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._counters['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn):
+        """Check an idle connection before handing it out"""
+        if conn.closed:
+            return False
+
+        age = time.monotonic() - self._created_at.get(id(conn), 0)
+        if self.recycle and self.recycle > 0 and age > self.recycle:
+            with self._lock:
+                self._counters['recycled'] += 1
+            return False
+
+        if self.pre_ping:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except Exception as e:
+                logging.warning(f"Discarding pooled connection that failed ping: {e}")
+                with self._lock:
+                    self._counters['failed_pings'] += 1
+                return False
+        return True
+
+    def getconn(self):
+        """Check out a connection, waiting up to the pool timeout"""
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f"No connection available within {self.timeout}s")
+                self._counters['waits'] += 1
+                self._lock.wait(remaining)
+
+        # Network work happens outside the lock so other checkouts are not blocked
+        try:
+            if conn is not None and not self._is_usable(conn):
+                with self._lock:
+                    self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._counters['checkouts'] += 1
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, resetting any open transaction"""
+        if not discard and not conn.closed:
+            try:
+                status = conn.get_transaction_status()
+                if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._lock:
+            self._in_use -= 1
+            if discard or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._lock.notify_all()
+
+    def stats(self):
+        """Snapshot of pool occupancy and lifetime counters"""
+        with self._lock:
+            return {
+                'pid': self.pid,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'size': len(self._idle) + self._in_use,
+                **self._counters,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(dsn, **options):
+    """Return the pool for this process, creating it on first use
+
+    Pools are never shared across fork(): a child that inherits the parent's
+    pool drops it and opens its own connections.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(dsn, **options)
+            logging.info(f"Created PostgreSQL connection pool for pid {_pool.pid} "
+                         f"(min={_pool.min_size}, max={_pool.max_size})")
+        return _pool
+
+
+def pool_stats():
+    """Stats for the current process pool, or None if it was never created"""
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        return None
+    return pool.stats()
+
+
+def _reset_after_fork():
+    # Inherited sockets belong to the parent; closing them here would
+    # terminate the parent's sessions, so only drop the references.
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
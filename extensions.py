@@ -0,0 +1,198 @@
+"""
+Flask extensions and the per-app services the views share
+Everything that costs something to build (the PostgreSQL pool, the password
+hashing pool, the match index, the reaction buffer) is created on first use
+and kept in app.extensions, so importing the app and booting a worker only
+defines things
+"""
+import logging
+import threading
+from functools import partial
+
+from flask import current_app, g
+from flask_wtf.csrf import CSRFProtect
+
+from accounts import AccountAvailability
+from db import Database, POSTGRESQL, connect_sqlite, get_dialect
+from home_feed import FeedCache
+from http_cache import purge_surrogate_keys
+from metrics import observe_query
+from passwords import PasswordHasher
+
+csrf = CSRFProtect()
+
+_services_lock = threading.Lock()
+
+
+def _service(name, build):
+    """The current app's `name` service, built with `build(app)` on first use"""
+    services = current_app.extensions.setdefault('movingbridge', {})
+    service = services.get(name)
+    if service is None:
+        with _services_lock:
+            service = services.get(name)
+            if service is None:
+                service = services[name] = build(current_app._get_current_object())
+    return service
+
+
+def get_home_feed_cache():
+    """Latest posts per home page section, rebuilt on expiry or after a write"""
+    return _service('home_feed_cache', lambda app: FeedCache(ttl=app.config.get('HOME_FEED_TTL', 30)))
+
+
+def get_password_hasher():
+    """Bounded pool the password hashes run on"""
+    return _service('password_hasher', lambda app: PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_queue=app.config.get('PASSWORD_HASH_QUEUE', 32),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10),
+    ))
+
+
+def get_account_availability():
+    """Username/email availability with the per-process filter of names in use"""
+    return _service('account_availability',
+                    lambda app: AccountAvailability(ttl=app.config.get('ACCOUNT_FILTER_TTL', 300)))
+
+
+def _build_match_engine(app):
+    # NumPy (when installed) is only imported once matching is first used
+    from forms import JOB_PROFILE_CHOICES
+    from matching import MatchEngine
+    return MatchEngine({
+        'job': [value for value, _ in JOB_PROFILE_CHOICES['job_type']],
+        'location': [value for value, _ in JOB_PROFILE_CHOICES['location']],
+        'language': [value for value, _ in JOB_PROFILE_CHOICES['languages']],
+        'start': [value for value, _ in JOB_PROFILE_CHOICES['availability']],
+        'hours': [value for value, _ in JOB_PROFILE_CHOICES['work_hours'] if value != 'flexible'],
+    }, refresh_interval=app.config.get('MATCH_REFRESH_INTERVAL', 60))
+
+
+def get_match_engine():
+    """In-memory job/worker match index"""
+    return _service('match_engine', _build_match_engine)
+
+
+def get_reaction_buffer():
+    """Write-behind reaction buffer, or None unless REACTION_WRITE_BEHIND is enabled"""
+    if not current_app.config.get('REACTION_WRITE_BEHIND'):
+        return None
+
+    def build(app):
+        from reaction_buffer import create_reaction_buffer
+        # The flusher runs outside any app context, so it gets the app passed in
+        return create_reaction_buffer(
+            partial(open_db, app), partial(close_db, app=app),
+            max_pending=app.config.get('REACTION_BUFFER_MAX', 10000),
+            flush_interval_ms=app.config.get('REACTION_FLUSH_INTERVAL_MS', 200),
+        )
+    return _service('reaction_buffer', build)
+
+
+# Matching side of each table whose rows are matched
+MATCHED_TABLES = {'jobs': 'job', 'introductions': 'intro'}
+
+# Home feed section for each content table
+FEED_SECTIONS_BY_TABLE = {
+    'jobs': 'jobs',
+    'introductions': 'intros',
+    'notices': 'notices',
+    'forum_posts': 'forums',
+}
+
+
+def content_changed(table, post_id=None):
+    """Drop cached copies of a table's pages after its write has committed"""
+    get_home_feed_cache().invalidate(FEED_SECTIONS_BY_TABLE[table])
+    keys = [table] if post_id is None else [table, f'{table}-{post_id}']
+    purge_surrogate_keys(current_app.config.get('HTTP_CACHE_PURGE_URL'), keys,
+                         current_app.config.get('HTTP_CACHE_PURGE_TOKEN'))
+    if table in MATCHED_TABLES and post_id is not None:
+        try:
+            get_match_engine().refresh(get_db(), MATCHED_TABLES[table], post_id)
+        except Exception as e:
+            logging.error(f"Error refreshing match profile {table} {post_id}: {e}")
+
+
+def get_db_pool(app=None):
+    """Get the PostgreSQL connection pool for this worker process"""
+    # psycopg2 is only imported by deployments that use PostgreSQL
+    from db_pool import get_pool
+    config = (app or current_app).config
+    engine_options = config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    return get_pool(
+        config['SQLALCHEMY_DATABASE_URI'],
+        min_size=config.get('DB_POOL_MIN_SIZE', 1),
+        max_size=config.get('DB_POOL_MAX_SIZE', 10),
+        timeout=config.get('DB_POOL_TIMEOUT', 5),
+        recycle=engine_options.get('pool_recycle', 300),
+        pre_ping=engine_options.get('pool_pre_ping', True),
+    )
+
+
+def get_db_connection(app=None):
+    """Get database connection based on environment"""
+    database_url = (app or current_app).config.get('SQLALCHEMY_DATABASE_URI')
+
+    if get_dialect(database_url) == POSTGRESQL:
+        # Production: Use PostgreSQL through the per-process pool
+        try:
+            return get_db_pool(app).getconn()
+        except Exception as e:
+            logging.error(f"PostgreSQL connection error: {e}")
+            raise
+    else:
+        # Development/Testing: Use SQLite
+        if database_url == 'sqlite:///:memory:':
+            # For testing
+            return connect_sqlite(':memory:')
+        else:
+            # For development
+            db_file = database_url.replace('sqlite:///', '') if database_url else 'movingbridge_dev.db'
+            return connect_sqlite(db_file)
+
+
+def _observe_statement(profiler, db, sql, params, seconds, rows):
+    # Request metrics, then the slow-query log and N+1 counts
+    observe_query(sql, seconds)
+    if profiler is not None:
+        profiler.observe(db, sql, params, seconds, rows)
+
+
+def open_db(app=None):
+    """Open a data-access handle outside of any request"""
+    app = app or current_app._get_current_object()
+    dialect = get_dialect(app.config.get('SQLALCHEMY_DATABASE_URI'))
+    observer = partial(_observe_statement, app.extensions.get('query_profiler'))
+    return Database(get_db_connection(app), dialect, observer=observer)
+
+
+def close_db(db, discard=False, app=None):
+    """Return a handle's connection to the pool (or close it for SQLite)"""
+    if db.dialect == POSTGRESQL:
+        get_db_pool(app).putconn(db.conn, discard=discard)
+    else:
+        db.conn.close()
+
+
+def get_db():
+    """Get the request's data-access handle, opening it on first use"""
+    db = g.get('_db')
+    if db is None:
+        db = open_db()
+        g._db = db
+    return db
+
+
+def release_db_connection(exception=None):
+    """Release the request's connection at the end of the app context"""
+    db = g.pop('_db', None)
+    if db is None:
+        return
+    discard = False
+    if db.dialect == POSTGRESQL:
+        import psycopg2
+        discard = isinstance(exception, (psycopg2.OperationalError, psycopg2.InterfaceError))
+    close_db(db, discard=discard)
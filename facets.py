@@ -0,0 +1,118 @@
+"""
+Faceted filtering of self-introductions
+Multi-select answers (languages, licenses) are mirrored into junction tables
+so every facet is an indexed lookup, and the counts for all facets come back
+from one grouped query over the filtered rows
+"""
+
+# Single-valued facets: query-string name -> introductions column
+COLUMN_FACETS = {
+    'nationality': 'nationality',
+    'location': 'preferred_location',
+    'availability': 'availability',
+}
+
+# Multi-valued facets: query-string name -> (junction table, value column)
+JUNCTION_FACETS = {
+    'language': ('introduction_languages', 'language'),
+    'license': ('introduction_licenses', 'license'),
+}
+
+# Korean fluency is a boolean column, filtered as ?korean=yes / ?korean=no
+FLUENCY_VALUES = {'yes': True, 'no': False}
+
+FACETS = ('nationality', 'korean', 'language', 'location', 'availability', 'license')
+
+# Upper bound on the values accepted per facet
+MAX_FACET_VALUES = 20
+
+
+def store_values(db, facet, intro_id, values):
+    """Replace an introduction's rows for a multi-valued facet; the caller commits"""
+    table, column = JUNCTION_FACETS[facet]
+    db.execute(f'DELETE FROM {table} WHERE intro_id = %s', (intro_id,))
+    values = list(dict.fromkeys(values or []))
+    if values:
+        db.executemany(f'INSERT INTO {table} (intro_id, {column}) VALUES (%s, %s)',
+                       [(intro_id, value) for value in values])
+
+
+def parse_filters(args):
+    """{facet: [values]} for the facets present in a request's query string
+
+    Single-valued facets match any of their values; multi-valued facets
+    require every value (e.g. both languages), and facets combine with AND.
+    """
+    filters = {}
+    for facet in FACETS:
+        values = [value for value in dict.fromkeys(args.getlist(facet)) if value]
+        if facet == 'korean':
+            values = [value for value in values if value in FLUENCY_VALUES]
+        if values:
+            filters[facet] = values[:MAX_FACET_VALUES]
+    return filters
+
+
+def filter_clause(filters):
+    """SQL condition on introductions (or None) and its parameters"""
+    conditions = []
+    params = []
+    for facet, values in filters.items():
+        placeholders = ', '.join(['%s'] * len(values))
+        if facet in COLUMN_FACETS:
+            conditions.append(f'{COLUMN_FACETS[facet]} IN ({placeholders})')
+            params.extend(values)
+        elif facet == 'korean':
+            conditions.append(f'korean_fluent IN ({placeholders})')
+            params.extend(FLUENCY_VALUES[value] for value in values)
+        else:
+            table, column = JUNCTION_FACETS[facet]
+            # Served by the (value, intro_id) index of the junction table
+            conditions.append(f'''id IN (
+                SELECT intro_id FROM {table} WHERE {column} IN ({placeholders})
+                GROUP BY intro_id HAVING COUNT(*) = {len(values)}
+            )''')
+            params.extend(values)
+    if not conditions:
+        return None, ()
+    return ' AND '.join(conditions), tuple(params)
+
+
+def facet_counts(db, filters):
+    """Per-value counts of every facet over the introductions matching `filters`
+
+    Returns {'total': n, facet: {value: n}} from a single query: the matching
+    rows are selected once and every facet is grouped from that set.
+    """
+    where, params = filter_clause(filters)
+    where = f'WHERE {where}' if where else ''
+    branches = ["SELECT 'total' AS facet, NULL AS value, COUNT(*) AS hits FROM matched"]
+    for facet, column in COLUMN_FACETS.items():
+        branches.append(f'''
+            SELECT '{facet}', {column}, COUNT(*) FROM matched
+            WHERE {column} IS NOT NULL GROUP BY {column}
+        ''')
+    branches.append('''
+        SELECT 'korean', CASE WHEN korean_fluent THEN 'yes' ELSE 'no' END, COUNT(*) FROM matched
+        WHERE korean_fluent IS NOT NULL GROUP BY korean_fluent
+    ''')
+    for facet, (table, column) in JUNCTION_FACETS.items():
+        branches.append(f'''
+            SELECT '{facet}', j.{column}, COUNT(*) FROM {table} j
+            JOIN matched m ON m.id = j.intro_id GROUP BY j.{column}
+        ''')
+
+    counts = {facet: {} for facet in FACETS}
+    counts['total'] = 0
+    for row in db.fetchall(f'''
+        WITH matched AS (
+            SELECT id, nationality, korean_fluent, preferred_location, availability
+            FROM introductions {where}
+        )
+        {' UNION ALL '.join(branches)}
+    ''', params):
+        if row['facet'] == 'total':
+            counts['total'] = row['hits']
+        else:
+            counts[row['facet']][row['value']] = row['hits']
+    return counts
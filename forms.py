@@ -0,0 +1,321 @@
+"""
+WTForms forms for registration, login and the admin
+Choice lists the filters and the job matching profile reuse are derived from
+the registration forms here, so the three always offer the same values
+"""
+import re
+
+from flask_wtf import FlaskForm
+from wtforms import StringField, PasswordField, SubmitField, TextAreaField, SelectField, SelectMultipleField, DateField, BooleanField, widgets
+from wtforms.validators import DataRequired, Length, Optional, URL, ValidationError
+
+from extensions import get_account_availability, get_db
+
+# Validate email format
+def is_valid_email(email):
+    """Validate email format"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+# Admin Login Form
+class AdminLoginForm(FlaskForm):
+    username = StringField('관리자 아이디', validators=[DataRequired()])
+    password = PasswordField('비밀번호', validators=[DataRequired()])
+    submit = SubmitField('로그인')
+
+class Step1RegisterForm(FlaskForm):
+    name = StringField('이름', validators=[DataRequired(), Length(min=1, max=50)])
+    username = StringField('아이디', validators=[DataRequired(), Length(min=4, max=20)])
+    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
+    password = PasswordField('비밀번호', validators=[DataRequired(), Length(min=6, max=128)])
+    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
+    nationality = SelectField('국적', choices=[
+        ('', '선택해주세요'),
+        # 아시아
+        ('vietnam', '베트남 (Vietnam)'),
+        ('philippines', '필리핀 (Philippines)'),
+        ('thailand', '태국 (Thailand)'),
+        ('cambodia', '캄보디아 (Cambodia)'),
+        ('myanmar', '미얀마 (Myanmar)'),
+        ('laos', '라오스 (Laos)'),
+        ('indonesia', '인도네시아 (Indonesia)'),
+        ('china', '중국 (China)'),
+        ('mongolia', '몽골 (Mongolia)'),
+        ('uzbekistan', '우즈베키스탄 (Uzbekistan)'),
+        ('kyrgyzstan', '키르기스스탄 (Kyrgyzstan)'),
+        ('kazakhstan', '카자흐스탄 (Kazakhstan)'),
+        ('nepal', '네팔 (Nepal)'),
+        ('sri_lanka', '스리랑카 (Sri Lanka)'),
+        ('pakistan', '파키스탄 (Pakistan)'),
+        ('bangladesh', '방글라데시 (Bangladesh)'),
+        ('india', '인도 (India)'),
+        ('japan', '일본 (Japan)'),
+        ('malaysia', '말레이시아 (Malaysia)'),
+        ('singapore', '싱가포르 (Singapore)'),
+        # 북미
+        ('usa', '미국 (United States)'),
+        ('canada', '캐나다 (Canada)'),
+        ('mexico', '멕시코 (Mexico)'),
+        # 유럽
+        ('uk', '영국 (United Kingdom)'),
+        ('germany', '독일 (Germany)'),
+        ('france', '프랑스 (France)'),
+        ('italy', '이탈리아 (Italy)'),
+        ('spain', '스페인 (Spain)'),
+        ('poland', '폴란드 (Poland)'),
+        ('romania', '루마니아 (Romania)'),
+        ('ukraine', '우크라이나 (Ukraine)'),
+        ('russia', '러시아 (Russia)'),
+        ('netherlands', '네덜란드 (Netherlands)'),
+        ('belgium', '벨기에 (Belgium)'),
+        ('sweden', '스웨덴 (Sweden)'),
+        ('norway', '노르웨이 (Norway)'),
+        ('finland', '핀란드 (Finland)'),
+        # 남미
+        ('brazil', '브라질 (Brazil)'),
+        ('argentina', '아르헨티나 (Argentina)'),
+        ('colombia', '콜롬비아 (Colombia)'),
+        ('peru', '페루 (Peru)'),
+        ('chile', '칠레 (Chile)'),
+        ('venezuela', '베네수엘라 (Venezuela)'),
+        # 기타
+        ('other', '기타 (Other)')
+    ], validators=[DataRequired()])
+    gender = SelectField('성별', choices=[('', '선택해주세요'), ('male', '남성'), ('female', '여성')], validators=[DataRequired()])
+    korean_fluent = SelectField('한국어 가능 여부', choices=[('', '선택해주세요'), ('yes', '예'), ('no', '아니오')], validators=[DataRequired()])
+    languages = SelectMultipleField('구사 언어 (복수선택 가능)', choices=[
+        ('Korean', '한국어 (Korean)'),
+        ('English', '영어 (English)'),
+        ('Chinese', '중국어 (Chinese)'),
+        ('Japanese', '일본어 (Japanese)'),
+        ('Vietnamese', '베트남어 (Vietnamese)'),
+        ('Thai', '태국어 (Thai)'),
+        ('Filipino', '필리핀어 (Filipino)'),
+        ('Khmer', '캄보디아어 (Khmer)'),
+        ('Myanmar', '미얀마어 (Myanmar)'),
+        ('Lao', '라오어 (Lao)'),
+        ('Indonesian', '인도네시아어 (Indonesian)'),
+        ('Malay', '말레이어 (Malay)'),
+        ('Mongolian', '몽골어 (Mongolian)'),
+        ('Uzbek', '우즈벡어 (Uzbek)'),
+        ('Kyrgyz', '키르기스어 (Kyrgyz)'),
+        ('Kazakh', '카자흐어 (Kazakh)'),
+        ('Nepali', '네팔어 (Nepali)'),
+        ('Sinhala', '싱할라어 (Sinhala)'),
+        ('Urdu', '우르두어 (Urdu)'),
+        ('Bengali', '벵골어 (Bengali)'),
+        ('Hindi', '힌디어 (Hindi)'),
+        ('Russian', '러시아어 (Russian)'),
+        ('Arabic', '아랍어 (Arabic)'),
+        ('Spanish', '스페인어 (Spanish)'),
+        ('Portuguese', '포르투갈어 (Portuguese)'),
+        ('French', '프랑스어 (French)'),
+        ('German', '독일어 (German)'),
+        ('Italian', '이탈리아어 (Italian)'),
+        ('Dutch', '네덜란드어 (Dutch)'),
+        ('Polish', '폴란드어 (Polish)'),
+        ('Romanian', '루마니아어 (Romanian)'),
+        ('Ukrainian', '우크라이나어 (Ukrainian)'),
+        ('Swedish', '스웨덴어 (Swedish)'),
+        ('Norwegian', '노르웨이어 (Norwegian)'),
+        ('Finnish', '핀란드어 (Finnish)'),
+        ('Other', '기타 (Other)')
+    ], widget=widgets.ListWidget(prefix_label=False), option_widget=widgets.CheckboxInput())
+    
+    def validate_confirm_password(self, field):
+        if field.data != self.password.data:
+            raise ValidationError('비밀번호가 일치하지 않습니다.')
+    
+    def validate_email(self, field):
+        if not is_valid_email(field.data):
+            raise ValidationError('올바른 이메일 주소를 입력해주세요.')
+    
+    def validate_languages(self, field):
+        if not field.data or len(field.data) == 0:
+            raise ValidationError('최소 1개 이상의 언어를 선택해주세요.')
+    preferred_jobs = SelectField('희망 직무', choices=[
+        ('', '선택해주세요'),
+        ('moving', '이사 작업'),
+        ('construction', '건설업'),
+        ('manufacturing', '제조업'),
+        ('delivery', '배송업'),
+        ('cleaning', '청소업'),
+        ('restaurant', '음식점'),
+        ('other', '기타')
+    ], validators=[DataRequired()])
+    preferred_location = SelectField('희망 지역', choices=[
+        ('', '선택해주세요'),
+        ('anywhere', '무관'),
+        ('seoul', '서울'),
+        ('busan', '부산'),
+        ('incheon', '인천'),
+        ('daegu', '대구'),
+        ('daejeon', '대전'),
+        ('gwangju', '광주'),
+        ('ulsan', '울산'),
+        ('gyeonggi', '경기도'),
+        ('gangwon', '강원도'),
+        ('chungbuk', '충청북도'),
+        ('chungnam', '충청남도'),
+        ('jeonbuk', '전라북도'),
+        ('jeonnam', '전라남도'),
+        ('gyeongbuk', '경상북도'),
+        ('gyeongnam', '경상남도'),
+        ('jeju', '제주도')
+    ], validators=[DataRequired()])
+    availability = SelectField('근무 가능 여부', choices=[
+        ('', '선택해주세요'),
+        ('immediate', '즉시 가능'),
+        ('negotiable', '조율 필요')
+    ], validators=[DataRequired()])
+    self_intro = TextAreaField('자기소개', validators=[DataRequired(), Length(min=10, max=1000)])
+    video_link = StringField('자기소개 영상 링크 (선택)', validators=[Optional(), URL()])
+    privacy_agreement = BooleanField('개인정보 수집·이용에 동의합니다', validators=[DataRequired()])
+    terms_agreement = BooleanField('이용약관에 동의합니다', validators=[DataRequired()])
+    submit = SubmitField('등록하기')
+    
+    def validate(self, extra_validators=None):
+        valid = super().validate(extra_validators)
+        return reject_taken_accounts(self, username=self.username.data, email=self.email.data) and valid
+
+class Step2RegisterForm(FlaskForm):
+    visa_type = SelectField('체류 자격', choices=[
+        ('', '선택해주세요'),
+        ('E-9', 'E-9 (비전문취업)'),
+        ('H-2', 'H-2 (방문취업)'),
+        ('F-4', 'F-4 (재외동포)'),
+        ('F-5', 'F-5 (영주)'),
+        ('F-6', 'F-6 (결혼이민)'),
+        ('other', '기타')
+    ])
+    visa_expiry = DateField('체류 만료일')
+    past_jobs = TextAreaField('이전 근무 경험')
+    expected_salary = SelectField('희망 급여 수준', choices=[
+        ('', '선택해주세요'),
+        ('2000000-2500000', '200만원 - 250만원'),
+        ('2500000-3000000', '250만원 - 300만원'),
+        ('3000000-3500000', '300만원 - 350만원'),
+        ('3500000-4000000', '350만원 - 400만원'),
+        ('4000000+', '400만원 이상'),
+        ('negotiable', '협의 가능')
+    ])
+    housing_preference = SelectField('숙소 제공 선호', choices=[
+        ('', '선택해주세요'),
+        ('required', '필수'),
+        ('preferred', '선호'),
+        ('not_needed', '필요 없음')
+    ])
+    licenses = SelectMultipleField('자격증 보유 여부', choices=[
+        ('forklift', '지게차 운전'),
+        ('crane', '크레인 운전'),
+        ('welding', '용접'),
+        ('electrical', '전기'),
+        ('cooking', '조리'),
+        ('driving', '운전면허'),
+        ('other', '기타')
+    ], widget=widgets.ListWidget(prefix_label=False), option_widget=widgets.CheckboxInput())
+    religion = SelectField('종교', choices=[
+        ('', '선택해주세요'),
+        ('none', '무교'),
+        ('christian', '기독교'),
+        ('buddhist', '불교'),
+        ('catholic', '천주교'),
+        ('islam', '이슬람교'),
+        ('other', '기타')
+    ])
+    work_hours = SelectField('근무 가능 시간', choices=[
+        ('', '선택해주세요'),
+        ('day', '주간근무'),
+        ('night', '야간근무'),
+        ('shift', '교대근무'),
+        ('flexible', '유연근무')
+    ])
+    submit = SubmitField('정보 업데이트')
+
+class CompanyRegisterForm(FlaskForm):
+    company_name = StringField('회사명', validators=[DataRequired(), Length(min=2, max=100)])
+    username = StringField('아이디', validators=[DataRequired(), Length(min=4, max=20)])
+    business_number = StringField('사업자등록번호', validators=[DataRequired(), Length(min=10, max=20)])
+    ceo_name = StringField('대표자명', validators=[DataRequired(), Length(min=2, max=50)])
+    contact_number = StringField('연락처', validators=[DataRequired(), Length(min=10, max=20)])
+    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
+    password = PasswordField('비밀번호', validators=[DataRequired(), Length(min=8, max=128)])
+    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
+    address = StringField('회사 주소', validators=[DataRequired(), Length(min=5, max=200)])
+    company_description = TextAreaField('회사 소개', validators=[Optional(), Length(max=500)])
+    privacy_agreement = BooleanField('개인정보 수집·이용에 동의합니다', validators=[DataRequired()])
+    terms_agreement = BooleanField('이용약관에 동의합니다', validators=[DataRequired()])
+    submit = SubmitField('회원가입')
+    
+    def validate_confirm_password(self, field):
+        if field.data != self.password.data:
+            raise ValidationError('비밀번호가 일치하지 않습니다.')
+    
+    def validate_email(self, field):
+        if not is_valid_email(field.data):
+            raise ValidationError('올바른 이메일 주소를 입력해주세요.')
+    
+    def validate(self, extra_validators=None):
+        valid = super().validate(extra_validators)
+        return reject_taken_accounts(self, username=self.username.data, email=self.email.data,
+                                     business_number=self.business_number.data) and valid
+
+# Error shown on a registration field whose value already belongs to an account
+TAKEN_MESSAGES = {
+    'username': '이미 사용 중인 사용자명입니다. 다른 사용자명을 선택해주세요.',
+    'email': '이미 가입된 이메일입니다. 다른 이메일을 사용하거나 로그인해주세요.',
+    'business_number': '이미 등록된 사업자등록번호입니다.',
+}
+
+def reject_taken_accounts(form, **values):
+    """Flag form fields whose value is already registered, in one lookup; True if none are
+
+    Fields that already failed validation are not looked up.
+    """
+    values = {name: value for name, value in values.items() if value and not getattr(form, name).errors}
+    form.taken = get_account_availability().taken(get_db(), **values)
+    for name in form.taken:
+        getattr(form, name).errors.append(TAKEN_MESSAGES[name])
+    return not form.taken
+
+class LoginForm(FlaskForm):
+    email = StringField('이메일 또는 아이디', validators=[DataRequired(), Length(min=3, max=120)])
+    password = PasswordField('비밀번호', validators=[DataRequired()])
+    submit = SubmitField('로그인')
+
+class PasswordResetForm(FlaskForm):
+    email = StringField('이메일', validators=[DataRequired(), Length(min=5, max=120)])
+    submit = SubmitField('비밀번호 재설정 요청')
+
+class NewPasswordForm(FlaskForm):
+    password = PasswordField('새 비밀번호', validators=[DataRequired(), Length(min=6, max=128)])
+    confirm_password = PasswordField('비밀번호 확인', validators=[DataRequired()])
+    submit = SubmitField('비밀번호 변경')
+    
+    def validate_confirm_password(self, field):
+        if field.data != self.password.data:
+            raise ValidationError('비밀번호가 일치하지 않습니다.')
+
+def _facet_choices(field):
+    return [choice for choice in field.kwargs['choices'] if choice[0]]
+
+# Choices of the optional job profile, matching the worker's registration answers
+JOB_PROFILE_CHOICES = {
+    'job_type': _facet_choices(Step1RegisterForm.preferred_jobs),
+    'location': [choice for choice in _facet_choices(Step1RegisterForm.preferred_location)
+                 if choice[0] != 'anywhere'],
+    'languages': _facet_choices(Step1RegisterForm.languages),
+    'availability': _facet_choices(Step1RegisterForm.availability),
+    'work_hours': _facet_choices(Step2RegisterForm.work_hours),
+}
+
+# Labels of the introduction filter values, taken from the registration forms
+INTRO_FACET_CHOICES = {
+    'nationality': _facet_choices(Step1RegisterForm.nationality),
+    'korean': _facet_choices(Step1RegisterForm.korean_fluent),
+    'language': _facet_choices(Step1RegisterForm.languages),
+    'location': _facet_choices(Step1RegisterForm.preferred_location),
+    'availability': _facet_choices(Step1RegisterForm.availability),
+    'license': _facet_choices(Step2RegisterForm.licenses),
+}
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Synthetic data for benchmarks: companies, workers, job postings,
+self-introductions, notices, forum posts and reactions
+Rows are generated lazily from a seed, so the same arguments (with --until)
+always give the same data, and are bulk loaded (COPY on PostgreSQL, batched executemany in one
+transaction per table on SQLite) without ever holding a table in memory.
+Multi-select and Step 1/Step 2 answers follow the registration form choices,
+with earlier choices more common. Every account's password is PASSWORD
+
+    python generate_data.py --database sqlite:///movingbridge_dev.db
+    python generate_data.py --database postgresql://user@localhost/movingbridge_bench --scale 5
+"""
+
+import io
+import csv
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from itertools import islice
+
+from werkzeug.security import generate_password_hash
+
+import reactions
+from db import Database, POSTGRESQL, connect_sqlite, get_dialect
+from forms import Step1RegisterForm, Step2RegisterForm, JOB_PROFILE_CHOICES
+from http_cache import bump_content_version
+from migrations import migrate
+
+PASSWORD = 'password123'
+
+# Rows per table at --scale 1 (about 1.1M rows with the facet and reaction rows)
+DEFAULT_COUNTS = {
+    'companies': 5000,
+    'users': 200000,
+    'jobs': 200000,
+    'introductions': 150000,
+    'notices': 500,
+    'forum_posts': 100000,
+    'reactions': 300000,
+}
+
+# SQLite rows per executemany call
+BATCH_SIZE = 10000
+
+# Posts are spread over this many days before now, oldest first
+HISTORY_DAYS = 365
+
+EMOJIS = ('👍', '❤️', '😊', '👏', '🎉', '😮')
+
+SURNAMES = ('Nguyen', 'Tran', 'Santos', 'Reyes', 'Somchai', 'Sok', 'Aung', 'Wang', 'Li', 'Bat', 'Karimov',
+            'Sharma', 'Perera', 'Khan', 'Rahman', 'Garcia', 'Silva', 'Ivanov', 'Kim', 'Park')
+GIVEN_NAMES = ('Anh', 'Minh', 'Maria', 'Jose', 'Niran', 'Dara', 'Thiha', 'Wei', 'Ming', 'Bold', 'Aziz',
+               'Ravi', 'Nimal', 'Ali', 'Karim', 'Ana', 'Lucas', 'Olga', 'Jun', 'Hana')
+COMPANY_WORDS = ('한빛', '대한', '새솔', '미래', '한결', '동해', '푸른', '든든', '바른', '성실', '으뜸', '나래')
+COMPANY_KINDS = ('이사', '익스프레스', '물류', '건설', '산업', '유통', '청소', '푸드')
+CITIES = ('서울 강남구', '서울 마포구', '부산 해운대구', '인천 남동구', '대구 달서구', '대전 유성구',
+          '광주 북구', '경기 수원시', '경기 화성시', '충남 천안시', '경남 창원시', '제주 제주시')
+JOB_SENTENCES = (
+    '성실하고 책임감 있는 분을 모집합니다.', '초보자도 친절하게 가르쳐 드립니다.', '주 5일 근무, 주말 휴무입니다.',
+    '숙소와 식사를 제공합니다.', '4대 보험 가입, 퇴직금 지급.', '한국어 기본 의사소통이 가능하면 좋습니다.',
+    '장기 근무자 우대합니다.', '오전 8시 출근, 오후 6시 퇴근입니다.', '경력자는 급여를 협의합니다.',
+    '통근 버스를 운행합니다.', '야간 근무 시 수당을 지급합니다.', '안전 장비를 지급합니다.',
+)
+INTRO_SENTENCES = (
+    '안녕하세요. 성실하게 일하겠습니다.', '한국에서 3년 동안 일한 경험이 있습니다.', '힘든 일도 잘할 수 있습니다.',
+    '한국어를 열심히 공부하고 있습니다.', '이사 작업과 포장 경험이 있습니다.', '공장에서 2년 일했습니다.',
+    '빨리 배우고 시간 약속을 잘 지킵니다.', '장기간 일할 수 있는 곳을 찾고 있습니다.', '운전면허가 있습니다.',
+    '팀으로 일하는 것을 좋아합니다.', '야간 근무도 가능합니다.', '기숙사가 있으면 좋겠습니다.',
+)
+FORUM_TITLES = ('비자 연장 질문', '숙소 추천 부탁드려요', '이사 일 처음인데 팁 있나요?', '월급 계산 질문',
+                '한국어 공부 방법', '좋은 회사 소개합니다', '외국인 등록증 재발급', '주말 모임 하실 분')
+
+
+def _choices(field):
+    return [value for value, _ in field.kwargs['choices'] if value]
+
+
+def _weights(values):
+    # Zipf-like: the form lists the common answers first
+    return [1 / (rank + 1) for rank in range(len(values))]
+
+
+class Picker:
+    """Weighted draws from one form field's choices"""
+
+    def __init__(self, values):
+        self.values = values
+        self.cum_weights = []
+        total = 0
+        for weight in _weights(values):
+            total += weight
+            self.cum_weights.append(total)
+
+    def one(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+    def some(self, rng, low, high):
+        picked = []
+        for _ in range(rng.randint(low, high)):
+            value = self.one(rng)
+            if value not in picked:
+                picked.append(value)
+        return picked
+
+
+PICKERS = {
+    'nationality': Picker(_choices(Step1RegisterForm.nationality)),
+    'language': Picker([value for value in _choices(Step1RegisterForm.languages) if value != 'Korean']),
+    'preferred_jobs': Picker(_choices(Step1RegisterForm.preferred_jobs)),
+    'preferred_location': Picker(_choices(Step1RegisterForm.preferred_location)),
+    'availability': Picker(_choices(Step1RegisterForm.availability)),
+    'visa_type': Picker(_choices(Step2RegisterForm.visa_type)),
+    'expected_salary': Picker(_choices(Step2RegisterForm.expected_salary)),
+    'housing_preference': Picker(_choices(Step2RegisterForm.housing_preference)),
+    'license': Picker(_choices(Step2RegisterForm.licenses)),
+    'religion': Picker(_choices(Step2RegisterForm.religion)),
+    'work_hours': Picker(_choices(Step2RegisterForm.work_hours)),
+    'job_type': Picker([value for value, _ in JOB_PROFILE_CHOICES['job_type']]),
+    'job_location': Picker([value for value, _ in JOB_PROFILE_CHOICES['location']]),
+}
+JOB_TYPE_LABELS = dict(JOB_PROFILE_CHOICES['job_type'])
+
+
+def _timestamps(rng, count, now):
+    """`count` increasing timestamps over the last HISTORY_DAYS days"""
+    step = HISTORY_DAYS * 86400 / max(count, 1)
+    start = now - timedelta(days=HISTORY_DAYS)
+    for i in range(count):
+        yield start + timedelta(seconds=i * step + rng.random() * step)
+
+
+def _phone(rng):
+    return f'010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}'
+
+
+def _text(rng, sentences, low, high):
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(low, high)))
+
+
+def company_rows(plan):
+    rng = random.Random(f"{plan['seed']}-companies")
+    first = plan['ids']['companies']
+    for i, created_at in enumerate(_timestamps(rng, plan['counts']['companies'], plan['now'])):
+        company_id = first + i
+        yield (company_id, f'{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_KINDS)} {company_id}',
+               f"c{company_id}_s{plan['seed']}", f"G{plan['seed']:03d}-{company_id:010d}",
+               f'{rng.choice(SURNAMES)} {rng.choice(GIVEN_NAMES)}', _phone(rng),
+               f"company{company_id}_s{plan['seed']}@example.com", plan['password_hash'], rng.choice(CITIES),
+               _text(rng, JOB_SENTENCES, 1, 3), created_at)
+
+
+def user_rows(plan):
+    rng = random.Random(f"{plan['seed']}-users")
+    first = plan['ids']['users']
+    for i, created_at in enumerate(_timestamps(rng, plan['counts']['users'], plan['now'])):
+        user_id = first + i
+        yield (user_id, f"u{user_id}_s{plan['seed']}", f"user{user_id}_s{plan['seed']}@example.com",
+               plan['password_hash'], f'{rng.choice(GIVEN_NAMES)} {rng.choice(SURNAMES)}', created_at)
+
+
+def job_rows(plan):
+    rng = random.Random(f"{plan['seed']}-jobs")
+    first = plan['ids']['jobs']
+    companies = plan['counts']['companies']
+    for i, created_at in enumerate(_timestamps(rng, plan['counts']['jobs'], plan['now'])):
+        company_id = plan['ids']['companies'] + rng.randrange(companies) if companies else None
+        job_type = PICKERS['job_type'].one(rng)
+        # Most postings fill in the optional matching profile
+        profiled = rng.random() < 0.7
+        yield (first + i, f'{JOB_TYPE_LABELS[job_type]} 직원 모집 ({rng.choice(CITIES)})',
+               f'{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_KINDS)}', _phone(rng),
+               _text(rng, JOB_SENTENCES, 3, 12), company_id, created_at,
+               job_type if profiled else None,
+               PICKERS['job_location'].one(rng) if profiled else None,
+               (','.join(PICKERS['language'].some(rng, 0, 2)) or None) if profiled else None,
+               rng.random() < 0.4 if profiled else None,
+               PICKERS['availability'].one(rng) if profiled else None,
+               PICKERS['work_hours'].one(rng) if profiled else None,
+               rng.random() < 0.5 if profiled else None)
+
+
+def _intro(rng):
+    """Step 1 answers and, for about 60% of workers, Step 2 answers"""
+    korean_fluent = rng.random() < 0.35
+    languages = (['Korean'] if korean_fluent else []) + PICKERS['language'].some(rng, 1, 2)
+    answers = {
+        'nationality': PICKERS['nationality'].one(rng),
+        'gender': 'male' if rng.random() < 0.7 else 'female',
+        'korean_fluent': korean_fluent,
+        'languages': languages,
+        'preferred_jobs': PICKERS['preferred_jobs'].one(rng),
+        'preferred_location': PICKERS['preferred_location'].one(rng),
+        'availability': PICKERS['availability'].one(rng),
+        'introduction': _text(rng, INTRO_SENTENCES, 2, 8),
+        'licenses': [],
+        'step_completed': 1,
+    }
+    if rng.random() < 0.6:
+        answers.update(
+            step_completed=2,
+            visa_type=PICKERS['visa_type'].one(rng),
+            visa_expiry=(datetime(2026, 1, 1) + timedelta(days=rng.randrange(3 * 365))).date(),
+            expected_salary=PICKERS['expected_salary'].one(rng),
+            housing_preference=PICKERS['housing_preference'].one(rng),
+            licenses=PICKERS['license'].some(rng, 0, 2),
+            religion=PICKERS['religion'].one(rng),
+            work_hours=PICKERS['work_hours'].one(rng),
+        )
+    return answers
+
+
+def _intros(plan):
+    rng = random.Random(f"{plan['seed']}-introductions")
+    first = plan['ids']['introductions']
+    users = plan['counts']['users']
+    for i, created_at in enumerate(_timestamps(rng, plan['counts']['introductions'], plan['now'])):
+        user_id = plan['ids']['users'] + rng.randrange(users) if users else None
+        yield first + i, user_id, f'{rng.choice(GIVEN_NAMES)} {rng.choice(SURNAMES)}', created_at, _intro(rng)
+
+
+def introduction_rows(plan):
+    for intro_id, user_id, name, created_at, a in _intros(plan):
+        yield (intro_id, user_id, name, a['nationality'], a['gender'], a['korean_fluent'], ','.join(a['languages']),
+               a['preferred_jobs'], a['preferred_location'], a['availability'], a['introduction'],
+               a['step_completed'], a.get('visa_type'), a.get('visa_expiry'), a.get('expected_salary'),
+               a.get('housing_preference'), ','.join(a['licenses']) or None, a.get('religion'),
+               a.get('work_hours'), created_at)
+
+
+def introduction_language_rows(plan):
+    # Generated again from the same seed rather than kept from the introductions pass
+    for intro_id, _, _, _, answers in _intros(plan):
+        for language in answers['languages']:
+            yield intro_id, language
+
+
+def introduction_license_rows(plan):
+    for intro_id, _, _, _, answers in _intros(plan):
+        for license in answers['licenses']:
+            yield intro_id, license
+
+
+def notice_rows(plan):
+    rng = random.Random(f"{plan['seed']}-notices")
+    for i, created_at in enumerate(_timestamps(rng, plan['counts']['notices'], plan['now'])):
+        yield f'공지사항 {i + 1}', _text(rng, JOB_SENTENCES, 2, 6), created_at
+
+
+def forum_rows(plan):
+    rng = random.Random(f"{plan['seed']}-forum_posts")
+    for created_at in _timestamps(rng, plan['counts']['forum_posts'], plan['now']):
+        yield (f'{rng.choice(GIVEN_NAMES)} {rng.choice(SURNAMES)}', rng.choice(FORUM_TITLES),
+               _text(rng, INTRO_SENTENCES, 1, 6), created_at)
+
+
+def _reaction_rows(plan, post_type):
+    rng = random.Random(f"{plan['seed']}-{post_type}-reactions")
+    table = 'jobs' if post_type == 'job' else 'introductions'
+    posts = plan['counts'][table]
+    users = plan['counts']['users']
+    total_posts = plan['counts']['jobs'] + plan['counts']['introductions']
+    if not posts or not users or not total_posts:
+        return
+    # Exponential per-post counts: most posts get a few reactions, a few get many
+    mean = plan['counts']['reactions'] / total_posts
+    for i in range(posts):
+        reactors = min(users, int(rng.expovariate(1 / mean) + 0.5)) if mean else 0
+        for offset in rng.sample(range(users), reactors):
+            yield plan['ids'][table] + i, plan['ids']['users'] + offset, rng.choice(EMOJIS)
+
+
+def job_reaction_rows(plan):
+    return _reaction_rows(plan, 'job')
+
+
+def intro_reaction_rows(plan):
+    return _reaction_rows(plan, 'intro')
+
+
+# (table, columns, row generator), in load order
+TABLES = [
+    ('companies', ('id', 'company_name', 'username', 'business_number', 'ceo_name', 'contact_number', 'email',
+                   'password_hash', 'address', 'company_description', 'created_at'), company_rows),
+    ('users', ('id', 'username', 'email', 'password_hash', 'name', 'created_at'), user_rows),
+    ('jobs', ('id', 'title', 'company', 'contact', 'description', 'company_id', 'created_at', 'job_type',
+              'location', 'languages', 'korean_required', 'availability', 'work_hours', 'housing_provided'),
+     job_rows),
+    ('introductions', ('id', 'user_id', 'name', 'nationality', 'gender', 'korean_fluent', 'languages',
+                       'preferred_jobs', 'preferred_location', 'availability', 'introduction', 'step_completed',
+                       'visa_type', 'visa_expiry', 'expected_salary', 'housing_preference', 'licenses',
+                       'religion', 'work_hours', 'created_at'), introduction_rows),
+    ('introduction_languages', ('intro_id', 'language'), introduction_language_rows),
+    ('introduction_licenses', ('intro_id', 'license'), introduction_license_rows),
+    ('notices', ('title', 'content', 'created_at'), notice_rows),
+    ('forum_posts', ('author', 'title', 'content', 'created_at'), forum_rows),
+    ('job_reactions', ('job_id', 'user_id', 'emoji'), job_reaction_rows),
+    ('intro_reactions', ('intro_id', 'user_id', 'emoji'), intro_reaction_rows),
+]
+
+# Tables whose ids are assigned here, so other rows can point at them
+ID_TABLES = ('companies', 'users', 'jobs', 'introductions')
+
+
+class CopyStream:
+    """Read-only file over CSV lines, rendered from a row iterator as COPY asks for them"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            batch = list(islice(self._rows, 1000))
+            if not batch:
+                break
+            self._writer.writerows(batch)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    readline = read
+
+
+def load_table(db, table, columns, rows):
+    """Bulk insert `rows` into `table`; returns the number of rows loaded"""
+    loaded = 0
+
+    def counted():
+        nonlocal loaded
+        for row in rows:
+            loaded += 1
+            yield row
+
+    if db.dialect == POSTGRESQL:
+        # Unquoted empty CSV fields are NULL; the generators never produce empty strings
+        with db.conn.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                            CopyStream(counted()))
+    else:
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        stream = counted()
+        while True:
+            batch = list(islice(stream, BATCH_SIZE))
+            if not batch:
+                break
+            db.executemany(sql, batch)
+    db.commit()
+    return loaded
+
+
+def generate(db, counts, seed=1, until=None, password=PASSWORD, password_method='scrypt', log=print):
+    """Generate and load every table; returns {table: rows loaded}
+
+    Timestamps end at `until` (default: now); pass it too for identical rows
+    across runs. New rows are added after the existing ones, so running again
+    with another seed adds more data. Reaction counters are rebuilt and every
+    content version bumped afterwards, so caches and ETags see the new rows.
+    """
+    migrate(db)
+    plan = {
+        'seed': seed,
+        'counts': counts,
+        'now': until or datetime.now().replace(microsecond=0),
+        # One hash for every account: hashing each password would dominate the run
+        'password_hash': generate_password_hash(password, password_method),
+        'ids': {table: db.fetchval(f'SELECT COALESCE(MAX(id), 0) FROM {table}') + 1 for table in ID_TABLES},
+    }
+    if db.dialect != POSTGRESQL:
+        # Losing the file on a crash is fine for generated data
+        db.conn.execute('PRAGMA synchronous = OFF')
+
+    loaded = {}
+    for table, columns, rows in TABLES:
+        started = time.perf_counter()
+        loaded[table] = load_table(db, table, columns, rows(plan))
+        elapsed = time.perf_counter() - started
+        log(f"  {table:<24} {loaded[table]:>9} rows  {elapsed:6.1f}s  "
+            f"({loaded[table] / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    if db.dialect == POSTGRESQL:
+        # Ids were given explicitly, so move the sequences past them
+        for table in ID_TABLES:
+            db.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                       f"(SELECT COALESCE(MAX(id), 1) FROM {table}))")
+    reactions.rebuild_reaction_counts(db)
+    for table in ('jobs', 'introductions', 'notices', 'forum_posts'):
+        bump_content_version(db, table)
+    db.commit()
+    db.execute('ANALYZE')
+    db.commit()
+    return loaded
+
+
+def open_database(url):
+    if get_dialect(url) == POSTGRESQL:
+        import psycopg2
+        import psycopg2.extras
+        return Database(psycopg2.connect(url, cursor_factory=psycopg2.extras.RealDictCursor), POSTGRESQL)
+    return Database(connect_sqlite(url.replace('sqlite:///', '')), get_dialect(url))
+
+
+def main():
+    from config import ProductionConfig
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', default='sqlite:///movingbridge_dev.db',
+                        help='sqlite:///PATH or postgresql:// URL (default: the development database)')
+    parser.add_argument('--seed', type=int, default=1, help='same seed, same data (default: 1)')
+    parser.add_argument('--until', type=datetime.fromisoformat,
+                        help='newest timestamp, e.g. 2026-01-01 (default: now); fix it for identical runs')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every default row count')
+    for table, count in DEFAULT_COUNTS.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, help=f'rows (default: {count} x scale)')
+    parser.add_argument('--password-method', default=ProductionConfig.PASSWORD_HASH_METHOD,
+                        help='werkzeug hash method of the shared password (default: the production one)')
+    parser.add_argument('--search-index', action='store_true',
+                        help='also rebuild the search index (slow, and reads every post into memory)')
+    args = parser.parse_args()
+
+    counts = {table: getattr(args, table) if getattr(args, table) is not None else int(count * args.scale)
+              for table, count in DEFAULT_COUNTS.items()}
+    db = open_database(args.database)
+    try:
+        print(f"Generating seed {args.seed} into {args.database}")
+        started = time.perf_counter()
+        loaded = generate(db, counts, seed=args.seed, until=args.until, password_method=args.password_method)
+        if args.search_index:
+            import search
+            indexed = search.rebuild_search_index(db)
+            db.commit()
+            print(f"  search_index {indexed:>21} posts")
+        elapsed = time.perf_counter() - started
+        total = sum(loaded.values())
+        print(f"✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s); password: {PASSWORD}")
+    finally:
+        db.conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
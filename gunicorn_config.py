@@ -0,0 +1,88 @@
+"""
+gunicorn settings for production (used by `python start_app.py --production`)
+Workers and threads are sized from the CPUs this process may run on and can
+be overridden with GUNICORN_* environment variables. The app is imported
+once in the master (preload_app) and forked into the workers: the
+connection pool, log listener, metrics and background threads already reset
+themselves after fork, and post_fork drops any service the master built.
+SIGHUP re-reads this file and replaces the workers one generation at a time
+without dropping connections; with preload_app the code itself is only
+reloaded by a full restart
+"""
+import os
+
+# gevent comes with the optional 'gevent' extra in pyproject.toml (gevent, psycogreen)
+WORKER_CLASSES = ('gthread', 'gevent')
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def available_cpus():
+    """CPUs this process may run on (the container's share, not the host's)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = available_cpus()
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {worker_class!r}")
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+if worker_class == 'gthread':
+    # Processes for the CPU-bound part (templates, hashing), threads to overlap DB waits
+    workers = _env_int('GUNICORN_WORKERS', max(2, cpus + 1))
+    threads = _env_int('GUNICORN_THREADS', 4)
+else:
+    # One event loop per CPU; concurrent DB work is still capped by DB_POOL_MAX_SIZE
+    workers = _env_int('GUNICORN_WORKERS', max(2, cpus))
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+
+preload_app = True
+
+# Behind a proxy that reuses upstream connections; requests that take longer are killed
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Recycle workers so slow leaks cannot grow forever; jitter keeps them from restarting together
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# The heartbeat file is touched every second; keep it off a possibly slow disk
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    concurrency = f"{threads} threads" if worker_class == 'gthread' else f"{worker_connections} connections"
+    server.log.info(f"Serving on {bind} with {workers} {worker_class} workers x {concurrency} "
+                    f"({cpus} CPUs), max_requests {max_requests}+{max_requests_jitter}")
+
+
+def post_fork(server, worker):
+    # Services are per process; one the master built would share its locks and threads
+    import main
+    main.app.extensions.pop('movingbridge', None)
+
+
+def post_worker_init(worker):
+    if worker_class == 'gevent':
+        # Let psycopg2 yield to other greenlets while it waits on PostgreSQL
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            worker.log.warning("psycogreen is not installed; database calls block the gevent worker")
+        else:
+            patch_psycopg()
+
+
+def on_reload(server):
+    server.log.info("SIGHUP: reloading settings and replacing workers")
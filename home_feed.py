@@ -0,0 +1,97 @@
+"""
+Home page feed: the latest posts of each section, cached per process
+A miss rebuilds only the stale sections, all of them in one UNION ALL query
+"""
+import time
+import threading
+
+# Section name -> (table, {template field: column})
+FEED_SECTIONS = {
+    'jobs': ('jobs', {'title': 'title', 'company': 'company', 'description': 'description'}),
+    'intros': ('introductions', {'name': 'name', 'nationality': 'nationality',
+                                 'languages': 'languages', 'introduction': 'introduction'}),
+    'notices': ('notices', {'title': 'title', 'content': 'content'}),
+    'forums': ('forum_posts', {'title': 'title', 'author': 'author', 'content': 'content'}),
+}
+
+# Generic slots every section is projected onto so the branches line up
+_SLOTS = ('c1', 'c2', 'c3', 'c4')
+
+
+def load_feed_sections(db, sections, limit):
+    """Latest `limit` rows of each requested section in a single round trip
+
+    Returns {section: [row, ...]} with rows newest first and keyed by the
+    section's own column names.
+    """
+    if not sections:
+        return {}
+
+    selects = []
+    for section in sections:
+        table, columns = FEED_SECTIONS[section]
+        names = list(columns.values()) + ['NULL'] * (len(_SLOTS) - len(columns))
+        slots = ', '.join(f'{name} AS {slot}' for name, slot in zip(names, _SLOTS))
+        selects.append(f'''
+            SELECT * FROM (
+                SELECT '{section}' AS section, id, created_at, {slots}
+                FROM {table}
+                ORDER BY created_at DESC, id DESC
+                LIMIT {int(limit)}
+            ) AS {section}_feed
+        ''')
+
+    feed = {section: [] for section in sections}
+    for row in db.fetchall(' UNION ALL '.join(selects)):
+        section = row['section']
+        post = {'id': row['id'], 'created_at': row['created_at']}
+        for key, slot in zip(FEED_SECTIONS[section][1], _SLOTS):
+            post[key] = row[slot]
+        feed[section].append(post)
+    for rows in feed.values():
+        rows.sort(key=lambda post: (post['created_at'], post['id']), reverse=True)
+    return feed
+
+
+class FeedCache:
+    """TTL cache of feed sections with explicit per-section invalidation
+
+    Invalidation only reaches the current process; the TTL bounds how long
+    other workers can serve a section that changed elsewhere.
+    """
+
+    def __init__(self, ttl=30, limit=5):
+        self.ttl = ttl
+        self.limit = limit
+        self._lock = threading.Lock()
+        # section -> (expires_at, rows)
+        self._sections = {}
+        # Bumped on invalidation so a rebuild that raced a write is not stored
+        self._generations = {}
+
+    def get(self, db):
+        """Return {section: rows} for every section, rebuilding stale ones"""
+        now = time.monotonic()
+        with self._lock:
+            cached = {
+                section: rows for section, (expires_at, rows) in self._sections.items()
+                if expires_at > now
+            }
+            stale = [section for section in FEED_SECTIONS if section not in cached]
+            generations = {section: self._generations.get(section, 0) for section in stale}
+        if stale:
+            fresh = load_feed_sections(db, stale, self.limit)
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                for section, rows in fresh.items():
+                    if self._generations.get(section, 0) == generations[section]:
+                        self._sections[section] = (expires_at, rows)
+            cached.update(fresh)
+        return cached
+
+    def invalidate(self, *sections):
+        """Drop the given sections (all of them if none are named)"""
+        with self._lock:
+            for section in sections or list(FEED_SECTIONS):
+                self._sections.pop(section, None)
+                self._generations[section] = self._generations.get(section, 0) + 1
@@ -0,0 +1,156 @@
+"""
+Conditional GET support for content pages
+Writes bump a per-table counter in content_versions inside their own
+transaction; pages derive ETag/Last-Modified from those counters (or from the
+rows they render) and answer revalidations with 304 before rendering
+"""
+import os
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+
+from flask import request, session, make_response
+
+# Tables whose changes are tracked in content_versions
+CONTENT_TABLES = ('jobs', 'introductions', 'notices', 'forum_posts')
+
+# Versions of per-row change history kept in content_changes for each table
+CHANGE_LOG_SIZE = 1000
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump_content_version(db, table, post_id=None):
+    """Mark a table as changed; call inside the writing transaction
+
+    Pass the written row's id for tables that processes cache row by row
+    (jobs and introductions, see matching.py); it is logged in
+    content_changes under the new version.
+    """
+    version = db.fetchval('''
+        UPDATE content_versions SET version = version + 1, updated_at = %s
+        WHERE name = %s
+        RETURNING version
+    ''', (_utcnow(), table))
+    if post_id is None or version is None:
+        return
+    db.execute('INSERT INTO content_changes (name, version, post_id) VALUES (%s, %s, %s)',
+               (table, version, post_id))
+    if version % CHANGE_LOG_SIZE == 0:
+        db.execute('DELETE FROM content_changes WHERE name = %s AND version <= %s',
+                   (table, version - CHANGE_LOG_SIZE))
+
+
+def get_content_version(db, table):
+    """{'version': n, 'updated_at': naive UTC datetime} for a table"""
+    row = db.fetchone('SELECT version, updated_at FROM content_versions WHERE name = %s', (table,))
+    return row or {'version': 0, 'updated_at': None}
+
+
+def get_changed_ids(db, table, since, until):
+    """Ids of the rows written after version `since` up to `until`
+
+    None when content_changes does not cover every version in between
+    (writes that logged no id, or entries already pruned).
+    """
+    rows = db.fetchall('''
+        SELECT post_id FROM content_changes
+        WHERE name = %s AND version > %s AND version <= %s
+    ''', (table, since, until))
+    if len(rows) != until - since:
+        return None
+    return {row['post_id'] for row in rows}
+
+
+def template_fingerprint(folder):
+    """Digest of the template files, so a deploy that changes markup changes every ETag"""
+    digest = hashlib.sha1()
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _viewer():
+    """The session state a page varies by (who is logged in, and as what)"""
+    return tuple(session.get(key) for key in ('user_id', 'user_type', 'role', 'username', 'admin_logged_in'))
+
+
+class Validators:
+    """ETag, Last-Modified and surrogate keys for one response
+
+    The ETag always covers the viewer, so a logged-in page is never
+    revalidated against an anonymous one. Anonymous responses may be stored
+    by shared caches for `shared_max_age` seconds; logged-in ones are private.
+    """
+
+    fingerprint = ''
+    shared_max_age = 0
+
+    def __init__(self, *parts, last_modified=None, keys=()):
+        raw = repr((self.fingerprint, _viewer()) + parts).encode()
+        self.etag = hashlib.sha1(raw).hexdigest()[:20]
+        self.last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc) if last_modified else None
+        self.keys = list(keys)
+
+    @property
+    def cacheable(self):
+        # Pending flash messages belong to this response only
+        return '_flashes' not in session
+
+    def matches(self):
+        """True if the client already holds this version"""
+        if not self.cacheable:
+            return False
+        if request.if_none_match:
+            return request.if_none_match.contains(self.etag)
+        if self.last_modified and request.if_modified_since:
+            return self.last_modified <= request.if_modified_since
+        return False
+
+    def not_modified(self):
+        return self.apply(make_response('', 304))
+
+    def apply(self, response):
+        """Attach validators and cache headers to a response"""
+        if not self.cacheable:
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        response.set_etag(self.etag)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        if session.get('user_id') or session.get('admin_logged_in'):
+            response.headers['Cache-Control'] = 'private, no-cache'
+        else:
+            response.headers['Cache-Control'] = f'public, max-age=0, s-maxage={self.shared_max_age}'
+        response.vary.add('Cookie')
+        if self.keys:
+            response.headers['Surrogate-Key'] = ' '.join(self.keys)
+        return response
+
+
+def purge_surrogate_keys(purge_url, keys, token=None):
+    """Ask the front cache to drop responses tagged with `keys`
+
+    Sent from a background thread so a slow cache never delays the write;
+    failures are logged and left to the s-maxage expiry.
+    """
+    if not purge_url or not keys:
+        return
+
+    def send():
+        headers = {'Surrogate-Key': ' '.join(keys)}
+        if token:
+            headers['Fastly-Key'] = token
+        try:
+            # Imported here: most deployments never purge, and requests is slow to import
+            import requests
+            requests.post(purge_url, headers=headers, timeout=5).raise_for_status()
+        except Exception as e:
+            logging.error(f"Error purging surrogate keys {keys}: {e}")
+
+    threading.Thread(target=send, name='surrogate-purge', daemon=True).start()
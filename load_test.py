@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Load test: seed a database, start the app against it and drive traffic
+Each scenario runs a fixed mix of page views, logins and reactions from a
+fixed number of concurrent clients for a fixed time, and the run is reported
+as JSON: throughput, p50/p95/p99 latency and database queries per request.
+With --baseline the report is compared to an earlier one and the run fails
+(exit 1) when a scenario regresses by more than --max-regression percent
+
+    python load_test.py --output baseline.json
+    python load_test.py --baseline baseline.json
+    python load_test.py --database postgresql://user@localhost/movingbridge_load --scenarios mixed
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+import generate_data
+
+# name -> [(action, weight)]
+SCENARIOS = {
+    'browse': [('index', 3), ('job_list', 3), ('intro_list', 2), ('job_view', 2)],
+    'login': [('login', 1)],
+    'react': [('react', 1)],
+    'mixed': [('index', 20), ('job_list', 20), ('intro_list', 15), ('job_view', 25), ('react', 15), ('login', 5)],
+}
+
+_CSRF_INPUT = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+# --- seeding ----------------------------------------------------------------
+
+def prepare_database(url, args):
+    """Generate data unless the database already has accounts
+
+    Returns the ids of every job and introduction and up to --concurrency
+    usernames, which log in with generate_data.PASSWORD.
+    """
+    from migrations import migrate
+    db = generate_data.open_database(url)
+    try:
+        migrate(db)
+        seeded = not db.fetchval('SELECT COUNT(*) FROM users')
+        if seeded:
+            counts = {'companies': args.companies, 'users': args.users, 'jobs': args.jobs,
+                      'introductions': args.intros, 'notices': 50, 'forum_posts': 0,
+                      'reactions': args.jobs + args.intros}
+            generate_data.generate(db, counts, seed=args.seed, log=lambda line: print(line, file=sys.stderr))
+        job_ids = [row['id'] for row in db.fetchall('SELECT id FROM jobs')]
+        intro_ids = [row['id'] for row in db.fetchall('SELECT id FROM introductions')]
+        usernames = [row['username'] for row in db.fetchall('SELECT username FROM users ORDER BY id LIMIT %s',
+                                                            (args.concurrency,))]
+    finally:
+        db.conn.close()
+    print(f"{'Seeded' if seeded else 'Reusing'} database {url}", file=sys.stderr)
+    return job_ids, intro_ids, usernames
+
+
+# --- server -----------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, database_url, metrics_dir, port):
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        DATABASE_URL=database_url,
+        SESSION_SECRET=os.environ.get('SESSION_SECRET', 'load-test'),
+        LOG_LEVEL=os.environ.get('LOG_LEVEL', 'WARNING'),
+        METRICS_DUMP_PATH=os.path.join(metrics_dir, 'metrics-{pid}.json'),
+        METRICS_DUMP_INTERVAL='1',
+    )
+    if args.server == 'gunicorn':
+        cmd = ['gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+               '--threads', str(args.threads), 'app:create_app()']
+    else:
+        cmd = [sys.executable, '-c',
+               f"from app import create_app; create_app().run(host='127.0.0.1', port={port}, threaded=True)"]
+    server = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'server exited with {server.returncode}')
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+                return server
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('server did not answer /health within 30s')
+
+
+def read_query_counts(metrics_dir):
+    """(queries, requests) per endpoint over every worker's latest metrics dump"""
+    from metrics import Registry
+    merged = Registry()
+    for name in os.listdir(metrics_dir):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(metrics_dir, name)) as f:
+                    merged.merge(json.load(f))
+            except (OSError, ValueError):
+                # Being replaced right now; the next dump has the same data
+                continue
+    return {labels[0]: (histogram.total, histogram.count) for name, labels, histogram in merged.series()
+            if name == 'movingbridge_db_queries_per_request'}
+
+
+# --- clients ----------------------------------------------------------------
+
+class Client:
+    """One simulated visitor with its own cookie session"""
+
+    def __init__(self, base_url, rng, job_ids, intro_ids, username):
+        self.base_url = base_url
+        self.rng = rng
+        self.job_ids = job_ids
+        self.intro_ids = intro_ids
+        self.username = username
+        self.session = requests.Session()
+        self.csrf_token = None
+        self.samples = []
+        self.recording = False
+
+    def request(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, allow_redirects=False, timeout=30,
+                                            **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 0
+        if self.recording:
+            self.samples.append((name, time.perf_counter() - started, status))
+        return response
+
+    def fetch_csrf_token(self):
+        response = self.request('login_form', 'GET', '/login')
+        match = _CSRF_INPUT.search(response.text) if response is not None else None
+        self.csrf_token = match.group(1) if match else ''
+
+    def login(self):
+        self.fetch_csrf_token()
+        self.request('login', 'POST', '/login',
+                     data={'email': self.username, 'password': generate_data.PASSWORD, 'csrf_token': self.csrf_token})
+        # Logging in starts a new session, so the old token is gone with it
+        self.csrf_token = None
+
+    def index(self):
+        self.request('index', 'GET', '/')
+
+    def job_list(self):
+        self.request('job_list', 'GET', '/job')
+
+    def intro_list(self):
+        self.request('intro_list', 'GET', '/intro')
+
+    def job_view(self):
+        self.request('job_view', 'GET', f'/job/{self.rng.choice(self.job_ids)}')
+
+    def react(self):
+        if self.csrf_token is None:
+            self.fetch_csrf_token()
+        post_type, post_id = (('job', self.rng.choice(self.job_ids)) if self.rng.random() < 0.7
+                              else ('intro', self.rng.choice(self.intro_ids)))
+        path = f"/{'react' if self.rng.random() < 0.6 else 'unreact'}/{post_type}/{post_id}"
+        self.request('react', 'POST', path, json={'emoji': self.rng.choice(generate_data.EMOJIS)},
+                     headers={'X-CSRFToken': self.csrf_token})
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+
+def _latency(samples):
+    ordered = sorted(seconds for _, seconds, _ in samples)
+    return {
+        'p50': _percentile(ordered, 0.5),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+        'max': round(ordered[-1] * 1000, 2) if ordered else None,
+    }
+
+
+def run_scenario(name, args, base_url, job_ids, intro_ids, usernames, metrics_dir):
+    actions, weights = zip(*SCENARIOS[name])
+    clients = [Client(base_url, random.Random(args.seed * 1000 + i), job_ids, intro_ids,
+                      usernames[i % len(usernames)]) for i in range(args.concurrency)]
+    if 'react' in actions:
+        for client in clients:
+            client.login()
+
+    start_barrier = threading.Barrier(args.concurrency + 1)
+    stop = threading.Event()
+
+    def drive(client):
+        start_barrier.wait()
+        while not stop.is_set():
+            getattr(client, client.rng.choices(actions, weights)[0])()
+
+    threads = [threading.Thread(target=drive, args=(client,), daemon=True) for client in clients]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    time.sleep(args.warmup)
+
+    # Metrics dumps are written every second; wait for one that covers the warmup
+    time.sleep(1.5)
+    before = read_query_counts(metrics_dir)
+    for client in clients:
+        client.recording = True
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    for client in clients:
+        client.recording = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+    time.sleep(1.5)
+    after = read_query_counts(metrics_dir)
+
+    # Queries of requests made during the 1.5s waits are counted too; they use the same mix
+    queries = sum(total - before.get(endpoint, (0, 0))[0] for endpoint, (total, _) in after.items())
+    served = sum(count - before.get(endpoint, (0, 0))[1] for endpoint, (_, count) in after.items())
+
+    samples = [sample for client in clients for sample in client.samples]
+    by_request = {}
+    for request_name in sorted({sample[0] for sample in samples}):
+        subset = [sample for sample in samples if sample[0] == request_name]
+        by_request[request_name] = {
+            'requests': len(subset),
+            'errors': sum(1 for _, _, status in subset if not 0 < status < 400),
+            'latency_ms': _latency(subset),
+        }
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status in samples if not 0 < status < 400),
+        'duration_s': round(elapsed, 2),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'latency_ms': _latency(samples),
+        'queries_per_request': round(queries / served, 2) if served else None,
+        'by_request': by_request,
+    }
+
+
+# --- baseline ---------------------------------------------------------------
+
+def compare(report, baseline, max_regression):
+    """Messages for every scenario that regressed by more than max_regression percent"""
+    limit = 1 + max_regression / 100
+    failures = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if current['throughput_rps'] * limit < previous['throughput_rps']:
+            failures.append(f"{name}: throughput {current['throughput_rps']} req/s "
+                            f"(baseline {previous['throughput_rps']})")
+        for key in ('p95', 'p99'):
+            if previous['latency_ms'][key] and current['latency_ms'][key] > previous['latency_ms'][key] * limit:
+                failures.append(f"{name}: {key} {current['latency_ms'][key]} ms "
+                                f"(baseline {previous['latency_ms'][key]} ms)")
+        if previous.get('queries_per_request') and current.get('queries_per_request') \
+                and current['queries_per_request'] > previous['queries_per_request'] * limit:
+            failures.append(f"{name}: {current['queries_per_request']} queries/request "
+                            f"(baseline {previous['queries_per_request']})")
+        if current['errors'] > previous['errors']:
+            failures.append(f"{name}: {current['errors']} errors (baseline {previous['errors']})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', default='sqlite',
+                        help="'sqlite' for a fresh temporary file, sqlite:///PATH, or a postgresql:// URL of a "
+                             "dedicated database (default: sqlite)")
+    parser.add_argument('--server', choices=('gunicorn', 'werkzeug'),
+                        default='gunicorn' if shutil.which('gunicorn') else 'werkzeug')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes (default: 2)')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker (default: 4)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma-separated, from {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients (default: 8)')
+    parser.add_argument('--duration', type=float, default=10, help='measured seconds per scenario (default: 10)')
+    parser.add_argument('--warmup', type=float, default=2, help='unmeasured seconds per scenario (default: 2)')
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--intros', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--companies', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1, help='seed for the data and the request mix')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    parser.add_argument('--baseline', help='earlier report to compare against')
+    parser.add_argument('--max-regression', type=float, default=20,
+                        help='allowed regression in percent against the baseline (default: 20)')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='movingbridge-load-')
+    metrics_dir = os.path.join(workdir, 'metrics')
+    os.mkdir(metrics_dir)
+    database_url = f"sqlite:///{os.path.join(workdir, 'load.db')}" if args.database == 'sqlite' else args.database
+    server = None
+    try:
+        job_ids, intro_ids, usernames = prepare_database(database_url, args)
+
+        port = _free_port()
+        server = start_server(args, database_url, metrics_dir, port)
+        report = {
+            'config': {key: getattr(args, key) for key in
+                       ('server', 'workers', 'threads', 'concurrency', 'duration', 'jobs', 'intros', 'seed')},
+            'database': database_url.split('://', 1)[0],
+            'scenarios': {},
+        }
+        for name in scenarios:
+            print(f"Running {name} ...", file=sys.stderr)
+            report['scenarios'][name] = run_scenario(name, args, f'http://127.0.0.1:{port}', job_ids, intro_ids,
+                                                     usernames, metrics_dir)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(report, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print(f"✅ No scenario regressed by more than {args.max_regression}%", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
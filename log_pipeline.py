@@ -0,0 +1,226 @@
+"""
+Logging off the request threads
+Request threads only put records on a bounded queue; a listener thread
+formats and writes them. When the queue is full, records are dropped and
+counted, so logging never blocks a request. Each record carries the id of
+the request that logged it, and DEBUG lines are rate-limited per call site
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+
+# Request ids accepted from X-Request-ID (e.g. set by the proxy)
+MAX_REQUEST_ID_LENGTH = 64
+
+
+def _valid_request_id(value):
+    return value and len(value) <= MAX_REQUEST_ID_LENGTH and all(c.isalnum() or c in '-_.' for c in value)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id ('-' outside requests)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let through at most `per_second` records per call site at or below `level`
+
+    Dropped records are counted, and the next record let through from the same
+    site reports how many were skipped as `sampled_out`.
+    """
+
+    def __init__(self, per_second=10, level=logging.DEBUG):
+        super().__init__()
+        self.per_second = per_second
+        self.level = level
+        self.sampled_out = 0
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def filter(self, record):
+        if record.levelno > self.level or self.per_second <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            # Token bucket per site, holding at most one second of records
+            tokens, skipped, updated = self._sites.get(site, (self.per_second, 0, now))
+            tokens = min(self.per_second, tokens + (now - updated) * self.per_second)
+            if tokens < 1:
+                self._sites[site] = (tokens, skipped + 1, now)
+                self.sampled_out += 1
+                return False
+            self._sites[site] = (tokens - 1, 0, now)
+        if skipped:
+            record.sampled_out = skipped
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """TEXT_FORMAT lines, noting how many records sampling skipped before this one"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, 'sampled_out', 0):
+            line += f' ({record.sampled_out} similar records skipped)'
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'pid': record.process,
+        }
+        if getattr(record, 'sampled_out', 0):
+            entry['sampled_out'] = record.sampled_out
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of waiting for queue space"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render what depends on the caller (arguments, traceback) here and
+        # leave the layout to the listener's formatter
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Root handler, queue and listener of one process"""
+
+    def __init__(self, stream_handler, queue_size, sample_per_second):
+        self.stream_handler = stream_handler
+        self.queue_size = queue_size
+        self.sampler = SamplingFilter(sample_per_second)
+        self.handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        self.handler.addFilter(RequestIdFilter())
+        self.handler.addFilter(self.sampler)
+        self.listener = None
+        self.pid = None
+
+    def start(self):
+        self.listener = QueueListener(self.handler.queue, self.stream_handler, respect_handler_level=True)
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def restart_after_fork(self):
+        # The listener thread did not survive fork(); records queued by the
+        # parent belong to the parent
+        self.handler.queue = queue.Queue(self.queue_size)
+        self.start()
+
+    def stop(self):
+        if self.listener is not None and self.pid == os.getpid():
+            try:
+                self.listener.stop()
+            except queue.Full:
+                # No room for the stop sentinel; the listener is a daemon thread
+                pass
+            self.listener = None
+
+    def stats(self):
+        return {
+            'queued': self.handler.queue.qsize(),
+            'queue_size': self.queue_size,
+            'dropped': self.handler.dropped,
+            'sampled_out': self.sampler.sampled_out,
+        }
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging(app):
+    """Send the root logger through the queue and tag records with request ids
+
+    Safe to call once per app; the pipeline itself is shared by the process.
+    """
+    global _pipeline
+    config = app.config
+    formatter = JsonFormatter() if config.get('LOG_FORMAT', 'text') == 'json' else TextFormatter()
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline(logging.StreamHandler(),
+                                    queue_size=config.get('LOG_QUEUE_SIZE', 10000),
+                                    sample_per_second=config.get('LOG_SAMPLE_PER_SECOND', 10))
+            _pipeline.start()
+            atexit.register(_pipeline.stop)
+        root = logging.getLogger()
+        if _pipeline.handler not in root.handlers:
+            root.addHandler(_pipeline.handler)
+        _pipeline.stream_handler.setFormatter(formatter)
+        _pipeline.sampler.per_second = config.get('LOG_SAMPLE_PER_SECOND', 10)
+        root.setLevel(config.get('LOG_LEVEL', 'INFO'))
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming if _valid_request_id(incoming) else uuid.uuid4().hex
+
+    @app.after_request
+    def expose_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+
+def pipeline_stats():
+    """Queue depth and dropped/sampled record counts, or None before configure_logging"""
+    pipeline = _pipeline
+    return pipeline.stats() if pipeline is not None else None
+
+
+def _restart_after_fork():
+    if _pipeline is not None and _pipeline.listener is not None:
+        _pipeline.restart_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,332 @@
+"""
+Job-to-worker matching
+Jobs and introductions are encoded into one feature space (job type,
+location, languages, Korean, start, hours, housing) and kept per process as
+dense float32 matrices, so ranking every profile against one query is a
+single matrix-vector product followed by a partial sort. NumPy is a declared
+dependency; if an install lacks it the same scores are computed row by row,
+which is logged once when the engine is built.
+"""
+import heapq
+import logging
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from http_cache import get_changed_ids, get_content_version
+
+# Importance of agreeing on each kind of feature
+WEIGHTS = {
+    'job': 3.0,
+    'location': 2.0,
+    'korean': 2.0,
+    'language': 1.0,
+    'start': 1.0,
+    'hours': 1.0,
+    'housing': 1.0,
+}
+
+INTRO_COLUMNS = '''id, preferred_jobs, preferred_location, languages, korean_fluent,
+    availability, work_hours, housing_preference'''
+JOB_COLUMNS = '''id, job_type, location, languages, korean_required,
+    availability, work_hours, housing_provided'''
+
+# Kinds a profile can match on only one value of, however many it accepts
+SINGLE_VALUED = ('job', 'location', 'start', 'hours')
+
+# A worker who needs housing counts a job that provides it twice as much
+HOUSING_NEED = {'required': 2.0, 'preferred': 1.0}
+
+# Ids per query when catching up on rows written by other processes
+CATCH_UP_CHUNK_SIZE = 500
+
+
+def _split(joined):
+    return [value.strip() for value in (joined or '').split(',') if value.strip()]
+
+
+def intro_features(row):
+    """{(kind, value): strength} for an introduction row"""
+    features = {('job', row['preferred_jobs']): 1.0, ('start', row['availability']): 1.0}
+    # 'anywhere' and 'flexible' agree with every location / every shift
+    features[('location', '*' if row['preferred_location'] == 'anywhere' else row['preferred_location'])] = 1.0
+    features[('hours', '*' if row['work_hours'] == 'flexible' else row['work_hours'])] = 1.0
+    for language in _split(row['languages']):
+        features[('language', language)] = 1.0
+    if row['korean_fluent']:
+        features[('korean', None)] = 1.0
+    if row['housing_preference'] in HOUSING_NEED:
+        features[('housing', None)] = HOUSING_NEED[row['housing_preference']]
+    return features
+
+
+def job_features(row):
+    """{(kind, value): strength} for a job row"""
+    features = {('job', row['job_type']): 1.0, ('start', row['availability']): 1.0,
+                ('location', row['location']): 1.0}
+    features[('hours', '*' if row['work_hours'] == 'flexible' else row['work_hours'])] = 1.0
+    for language in _split(row['languages']):
+        features[('language', language)] = 1.0
+    if row['korean_required']:
+        features[('korean', None)] = 1.0
+    if row['housing_provided']:
+        features[('housing', None)] = 1.0
+    return features
+
+
+class _Profiles:
+    """Encoded rows of one table, updatable in place
+
+    With NumPy the ids and vectors live in preallocated arrays whose first
+    `count` rows are in use; without it they are plain lists of sparse dicts.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.count = 0
+        self.positions = {}
+        if np is not None:
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.matrix = np.zeros((0, width), dtype=np.float32)
+        else:
+            self.ids = []
+            self.matrix = []
+
+    def upsert(self, post_id, vector):
+        position = self.positions.get(post_id)
+        if position is None:
+            position = self.count
+            self.positions[post_id] = position
+            self.count += 1
+            if np is None:
+                self.ids.append(post_id)
+                self.matrix.append(None)
+            elif position == len(self.ids):
+                # Grow by doubling so a run of inserts stays amortised O(1)
+                capacity = max(16, 2 * len(self.ids))
+                self.ids = np.resize(self.ids, capacity)
+                grown = np.zeros((capacity, self.width), dtype=np.float32)
+                grown[:position] = self.matrix[:position]
+                self.matrix = grown
+            self.ids[position] = post_id
+        self.matrix[position] = vector
+
+    def remove(self, post_id):
+        position = self.positions.pop(post_id, None)
+        if position is None:
+            return
+        # Move the last row into the hole
+        last = self.count - 1
+        if position != last:
+            moved = int(self.ids[last])
+            self.ids[position] = moved
+            self.positions[moved] = position
+            self.matrix[position] = self.matrix[last]
+        self.count -= 1
+        if np is None:
+            self.ids.pop()
+            self.matrix.pop()
+
+    def top(self, query, k):
+        """[(post_id, score)] of the k best rows with a positive score, best first"""
+        count = self.count
+        if not count or k <= 0:
+            return []
+        if np is None:
+            scored = ((sum(query[column] * value for column, value in vector.items()), post_id)
+                      for post_id, vector in zip(self.ids, self.matrix))
+            return [(post_id, score) for score, post_id in heapq.nlargest(k, scored) if score > 0]
+
+        scores = self.matrix[:count] @ query
+        ids = self.ids[:count]
+        if k < count:
+            # Partial sort for the k-th best score; rows tied with it are
+            # cut by id so the result does not depend on the partition order
+            kth = np.partition(scores, count - k)[count - k]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)
+            missing = k - len(above)
+            if missing < len(ties):
+                ties = ties[np.argpartition(-ids[ties], missing - 1)[:missing]]
+            candidates = np.concatenate([above, ties])
+        else:
+            candidates = np.arange(count)
+        # Best score first, newest post first among equals
+        order = candidates[np.lexsort((-ids[candidates], -scores[candidates]))]
+        return [(int(ids[i]), float(scores[i])) for i in order if scores[i] > 0]
+
+
+class _Side:
+    def __init__(self, table, columns, encode):
+        self.table = table
+        self.columns = columns
+        self.encode = encode
+        self.profiles = None
+        self.version = None
+        self.loaded_at = 0.0
+
+
+class MatchEngine:
+    """Ranks introductions for a job and jobs for an introduction
+
+    Each process loads the profiles on first use and updates single rows
+    when it writes them (`refresh`). Writes made by other processes are
+    noticed through content_versions and re-encoded from the ids logged in
+    content_changes. Only when the log does not cover them (bulk loads, or
+    a process that fell too far behind) is the table reloaded, at most
+    every `refresh_interval` seconds.
+    """
+
+    def __init__(self, vocabularies, refresh_interval=60):
+        # (kind, value) -> column; '*' values expand to every column of their kind
+        self.columns = {}
+        for kind, values in vocabularies.items():
+            for value in values:
+                self.columns[(kind, value)] = len(self.columns)
+        for kind in ('korean', 'housing'):
+            self.columns[(kind, None)] = len(self.columns)
+        self.kinds = [kind for kind, _ in self.columns]
+        self.weights = [WEIGHTS[kind] for kind in self.kinds]
+        self._kind_columns = {}
+        for column, kind in enumerate(self.kinds):
+            self._kind_columns.setdefault(kind, []).append(column)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._sides = {
+            'intro': _Side('introductions', INTRO_COLUMNS, intro_features),
+            'job': _Side('jobs', JOB_COLUMNS, job_features),
+        }
+        if np is None:
+            logging.warning("NumPy is not installed; matching falls back to row-by-row scoring")
+
+    def _vector(self, features):
+        vector = {}
+        for (kind, value), strength in features.items():
+            if value == '*':
+                columns = self._kind_columns.get(kind, [])
+            else:
+                column = self.columns.get((kind, value))
+                columns = [] if column is None else [column]
+            for column in columns:
+                vector[column] = strength
+        if np is None:
+            return vector
+        dense = np.zeros(len(self.columns), dtype=np.float32)
+        for column, strength in vector.items():
+            dense[column] = strength
+        return dense
+
+    def _query(self, features):
+        vector = self._vector(features)
+        if np is None:
+            query = [0.0] * len(self.columns)
+            for column, strength in vector.items():
+                query[column] = strength * self.weights[column]
+            return query
+        return vector * np.asarray(self.weights, dtype=np.float32)
+
+    def _best_score(self, query):
+        """Score of a counterpart agreeing on everything, to report matches as a fraction"""
+        best = {}
+        for kind, strength in zip(self.kinds, query):
+            strength = float(strength)
+            if kind in SINGLE_VALUED:
+                best[kind] = max(best.get(kind, 0.0), strength)
+            else:
+                best[kind] = best.get(kind, 0.0) + strength
+        return sum(best.values())
+
+    def _load(self, db, side):
+        profiles = _Profiles(len(self.columns))
+        for row in db.fetchall(f'SELECT {side.columns} FROM {side.table}'):
+            profiles.upsert(row['id'], self._vector(side.encode(row)))
+        return profiles
+
+    def _changes(self, db, side, since, version):
+        """{post_id: vector, or None if deleted} for rows written after `since`
+
+        None when the change log does not cover the gap.
+        """
+        ids = get_changed_ids(db, side.table, since, version)
+        if ids is None:
+            return None
+        changes = dict.fromkeys(ids)
+        ids = sorted(ids)
+        for start in range(0, len(ids), CATCH_UP_CHUNK_SIZE):
+            chunk = ids[start:start + CATCH_UP_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            for row in db.fetchall(f'SELECT {side.columns} FROM {side.table} WHERE id IN ({placeholders})', chunk):
+                changes[row['id']] = self._vector(side.encode(row))
+        return changes
+
+    def _ensure(self, db, kind):
+        side = self._sides[kind]
+        version = get_content_version(db, side.table)['version']
+        with self._lock:
+            profiles, synced, loaded_at = side.profiles, side.version, side.loaded_at
+        if profiles is not None and version <= synced:
+            return profiles
+
+        # Other processes wrote: re-encode just their rows while the log covers them
+        changes = None if profiles is None else self._changes(db, side, synced, version)
+        if changes is not None:
+            with self._lock:
+                # Another thread may have caught up first; it is redone on a later call if behind
+                if side.profiles is profiles and side.version == synced:
+                    for post_id, vector in changes.items():
+                        if vector is None:
+                            profiles.remove(post_id)
+                        else:
+                            profiles.upsert(post_id, vector)
+                    side.version = version
+                return side.profiles
+        if profiles is not None and time.monotonic() - loaded_at < self.refresh_interval:
+            return profiles
+
+        # Read and encode outside the lock so ranking goes on meanwhile, then swap
+        fresh = self._load(db, side)
+        with self._lock:
+            side.profiles = fresh
+            side.version = version
+            side.loaded_at = time.monotonic()
+        return fresh
+
+    def refresh(self, db, kind, post_id):
+        """Re-encode one job or introduction after this process committed a write to it"""
+        side = self._sides[kind]
+        if side.profiles is None:
+            return
+        row = db.fetchone(f'SELECT {side.columns} FROM {side.table} WHERE id = %s', (post_id,))
+        version = get_content_version(db, side.table)['version']
+        with self._lock:
+            if row:
+                side.profiles.upsert(post_id, self._vector(side.encode(row)))
+            else:
+                side.profiles.remove(post_id)
+            # Only our own write happened since the load: the profiles are current
+            if version == side.version + 1:
+                side.version = version
+
+    def _rank(self, db, kind, post_id, target, k):
+        source = self._sides[kind]
+        row = db.fetchone(f'SELECT {source.columns} FROM {source.table} WHERE id = %s', (post_id,))
+        if row is None:
+            return None
+        query = self._query(source.encode(row))
+        best = self._best_score(query) or 1.0
+        profiles = self._ensure(db, target)
+        with self._lock:
+            hits = profiles.top(query, k)
+        return [(match_id, min(score / best, 1.0)) for match_id, score in hits]
+
+    def top_workers(self, db, job_id, k=20):
+        """[(intro_id, match)] best suited to a job, match in (0, 1]; None if the job does not exist"""
+        return self._rank(db, 'job', job_id, 'intro', k)
+
+    def top_jobs(self, db, intro_id, k=20):
+        """[(job_id, match)] best suited to a worker, match in (0, 1]; None if the introduction does not exist"""
+        return self._rank(db, 'intro', intro_id, 'job', k)
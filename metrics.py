@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Request metrics in the Prometheus text format
+Each worker process keeps latency histograms and response counts per
+endpoint, plus how many queries, how much DB time and how much template
+rendering every request took. With METRICS_DUMP_PATH set, every process
+writes snapshots to JSON files; /metrics merges them with the answering
+process's live registry, and they can also be read offline:
+
+    python metrics.py /tmp/movingbridge-metrics-*.json
+    python metrics.py --prometheus /tmp/movingbridge-metrics-*.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import atexit
+import logging
+import argparse
+import threading
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+
+# Seconds; the same layout as the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, labels, buckets, help)
+METRICS = {
+    'movingbridge_http_request_duration_seconds': (
+        'histogram', ('endpoint', 'method'), LATENCY_BUCKETS, 'Time from the start of a request to its response'),
+    'movingbridge_http_responses_total': (
+        'counter', ('endpoint', 'method', 'status'), None, 'Responses sent, by status code'),
+    'movingbridge_db_queries_per_request': (
+        'histogram', ('endpoint',), QUERY_COUNT_BUCKETS, 'Database statements run by one request'),
+    'movingbridge_db_seconds_per_request': (
+        'histogram', ('endpoint',), LATENCY_BUCKETS, 'Time one request spent in database statements'),
+    'movingbridge_template_seconds_per_request': (
+        'histogram', ('endpoint',), LATENCY_BUCKETS, 'Time one request spent rendering templates'),
+}
+
+# Label for requests that matched no route (404s, bad methods)
+UNMATCHED = '<unmatched>'
+
+
+class Histogram:
+    """Cumulative-bucket histogram; counts[i] holds observations <= buckets[i], the last one +Inf"""
+
+    def __init__(self, buckets, counts=None, total=0.0):
+        self.buckets = tuple(buckets)
+        self.counts = list(counts) if counts is not None else [0] * (len(self.buckets) + 1)
+        self.total = total
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the `fraction` quantile (None when empty)"""
+        target = fraction * self.count
+        if not target:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    """Counters and histograms of one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self._lock:
+            histogram = self._series.get((name, labels))
+            if histogram is None:
+                histogram = self._series[(name, labels)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._series[(name, labels)] = self._series.get((name, labels), 0) + amount
+
+    def series(self):
+        """Sorted (name, labels, value) triples; values are copies"""
+        with self._lock:
+            items = [(name, labels, Histogram(value.buckets, value.counts, value.total)
+                      if isinstance(value, Histogram) else value)
+                     for (name, labels), value in self._series.items()]
+        return sorted(items, key=lambda item: (item[0], item[1]))
+
+    def snapshot(self):
+        """JSON-serializable copy of the registry"""
+        series = []
+        for name, labels, value in self.series():
+            entry = {'name': name, 'labels': list(labels)}
+            if isinstance(value, Histogram):
+                entry.update(counts=value.counts, sum=value.total)
+            else:
+                entry['value'] = value
+            series.append(entry)
+        return {'pid': os.getpid(), 'time': time.time(), 'series': series}
+
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. another worker's dump) into this registry"""
+        for entry in snapshot['series']:
+            name, labels = entry['name'], tuple(entry['labels'])
+            if name not in METRICS:
+                continue
+            with self._lock:
+                if 'counts' in entry:
+                    histogram = self._series.get((name, labels))
+                    if histogram is None:
+                        histogram = self._series[(name, labels)] = Histogram(METRICS[name][2])
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, entry['counts'])]
+                    histogram.total += entry['sum']
+                else:
+                    self._series[(name, labels)] = self._series.get((name, labels), 0) + entry['value']
+
+    def render(self):
+        """The registry in the Prometheus text exposition format"""
+        by_name = {}
+        for name, labels, value in self.series():
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, (kind, label_names, _, help_text) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in by_name.get(name, ()):
+                pairs = list(zip(label_names, labels))
+                if kind == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + (float('inf'),), value.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _number(bound)
+                        lines.append(f'{name}_bucket{_labels(pairs + [("le", le)])} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(pairs)} {_number(value.total)}')
+                    lines.append(f'{name}_count{_labels(pairs)} {cumulative}')
+                else:
+                    lines.append(f'{name}{_labels(pairs)} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+registry = Registry()
+
+
+class RequestStats:
+    """What the current request has spent so far"""
+
+    __slots__ = ('started', 'queries', 'db_seconds', 'template_seconds', 'template_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_started = []
+
+
+def observe_query(sql, seconds):
+    """Database observer: charge a statement to the current request, if any"""
+    if has_request_context():
+        stats = g.get('_metrics')
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+
+class Dumper:
+    """Writes this process's registry to `path` (with {pid} filled in) every `interval` seconds"""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_running(self):
+        # Threads do not survive fork(), so every worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name='metrics-dump', daemon=True).start()
+            atexit.register(self.dump)
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.dump()
+
+    def dump(self):
+        path = self.path.format(pid=os.getpid())
+        try:
+            tmp = f'{path}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(registry.snapshot(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.error(f"Error writing metrics dump {path}: {e}")
+
+
+def collect(dump_path=None):
+    """This process's registry merged with the other processes' latest dumps
+
+    Without a dump path only this process's requests are counted. Other
+    workers' values are as old as their last dump, and dumps of workers
+    that have exited stay counted so totals do not drop when gunicorn
+    recycles a worker.
+    """
+    merged = Registry()
+    merged.merge(registry.snapshot())
+    if not dump_path:
+        return merged
+    own = dump_path.format(pid=os.getpid())
+    for path in sorted(glob.glob(dump_path.format(pid='*'))):
+        if path == own:
+            continue
+        try:
+            with open(path) as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Skipping unreadable metrics dump {path}: {e}")
+    return merged
+
+
+def init_metrics(app):
+    """Time every request of `app` and charge its queries and template rendering to it"""
+    dump_path = app.config.get('METRICS_DUMP_PATH')
+    dumper = Dumper(dump_path, app.config.get('METRICS_DUMP_INTERVAL', 60)) if dump_path else None
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics = RequestStats()
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop('_metrics', None)
+        if stats is None:
+            return response
+        endpoint = request.endpoint or UNMATCHED
+        registry.observe('movingbridge_http_request_duration_seconds', (endpoint, request.method),
+                         time.perf_counter() - stats.started)
+        registry.inc('movingbridge_http_responses_total', (endpoint, request.method, str(response.status_code)))
+        registry.observe('movingbridge_db_queries_per_request', (endpoint,), stats.queries)
+        registry.observe('movingbridge_db_seconds_per_request', (endpoint,), stats.db_seconds)
+        registry.observe('movingbridge_template_seconds_per_request', (endpoint,), stats.template_seconds)
+        if dumper is not None:
+            dumper.ensure_running()
+        return response
+
+    def template_started(sender, template, context, **extra):
+        stats = g.get('_metrics')
+        if stats is not None:
+            stats.template_started.append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        stats = g.get('_metrics')
+        if stats is not None and stats.template_started:
+            started = stats.template_started.pop()
+            # Nested renders are already inside the outer one's time
+            if not stats.template_started:
+                stats.template_seconds += time.perf_counter() - started
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    # A forked worker reports its own requests, not the ones its parent served
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+def _print_summary(merged):
+    latency = {}
+    per_request = {}
+    statuses = {}
+    for name, labels, value in merged.series():
+        if name == 'movingbridge_http_request_duration_seconds':
+            latency[labels] = value
+        elif name == 'movingbridge_http_responses_total':
+            key = labels[:2]
+            statuses.setdefault(key, {})[labels[2]] = value
+        elif isinstance(value, Histogram):
+            per_request[(name, labels[0])] = value
+
+    def mean(name, endpoint, scale=1):
+        histogram = per_request.get((name, endpoint))
+        if histogram is None or not histogram.count:
+            return '-'
+        return f'{histogram.total / histogram.count * scale:.1f}'
+
+    def bound_ms(value):
+        return '-' if value is None else ('>10000' if value == float('inf') else f'{value * 1000:g}')
+
+    print(f"{'endpoint':<28} {'method':<6} {'requests':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'mean ms':>8} {'queries':>7} {'db ms':>7} {'tmpl ms':>7}  statuses")
+    for (endpoint, method), histogram in sorted(latency.items(), key=lambda item: -item[1].count):
+        codes = ' '.join(f'{code}:{count}' for code, count in sorted(statuses.get((endpoint, method), {}).items()))
+        print(f"{endpoint:<28} {method:<6} {histogram.count:>8} {bound_ms(histogram.quantile(0.5)):>7} "
+              f"{bound_ms(histogram.quantile(0.95)):>7} {bound_ms(histogram.quantile(0.99)):>7} "
+              f"{histogram.total / histogram.count * 1000:>8.1f} "
+              f"{mean('movingbridge_db_queries_per_request', endpoint):>7} "
+              f"{mean('movingbridge_db_seconds_per_request', endpoint, 1000):>7} "
+              f"{mean('movingbridge_template_seconds_per_request', endpoint, 1000):>7}  {codes}")
+    print("(percentiles are bucket upper bounds; queries/db/tmpl are per-request means over all methods)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge metrics dumps and print a per-endpoint summary')
+    parser.add_argument('dumps', nargs='+', help='JSON files written with METRICS_DUMP_PATH')
+    parser.add_argument('--prometheus', action='store_true', help='print the merged Prometheus text instead')
+    args = parser.parse_args()
+
+    merged = Registry()
+    for path in args.dumps:
+        with open(path) as f:
+            merged.merge(json.load(f))
+    if args.prometheus:
+        sys.stdout.write(merged.render())
+    else:
+        print(f"Merged {len(args.dumps)} dump(s)")
+        _print_summary(merged)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Versioned schema migrations for PostgreSQL and SQLite
+Migrations are applied in order and recorded in schema_migrations, so every
+environment converges on the same schema whichever setup script created it
+"""
+import logging
+
+from db import POSTGRESQL, SQLITE
+
+# Column types that differ between the dialects
+_TYPES = {
+    POSTGRESQL: {'pk': 'SERIAL PRIMARY KEY'},
+    SQLITE: {'pk': 'INTEGER PRIMARY KEY AUTOINCREMENT'},
+}
+
+# Arbitrary key for pg_advisory_lock, shared by every migration run
+MIGRATION_LOCK_ID = 7240318
+
+
+def _split(joined):
+    return list(dict.fromkeys(value.strip() for value in (joined or '').split(',') if value.strip()))
+
+
+def _backfill_intro_facets(db):
+    """Copy existing comma-joined languages/licenses into the junction tables"""
+    for intro in db.fetchall('SELECT id, languages, licenses FROM introductions'):
+        db.executemany('INSERT INTO introduction_languages (intro_id, language) VALUES (%s, %s)',
+                       [(intro['id'], value) for value in _split(intro['languages'])])
+        db.executemany('INSERT INTO introduction_licenses (intro_id, license) VALUES (%s, %s)',
+                       [(intro['id'], value) for value in _split(intro['licenses'])])
+
+
+def _table_columns(db, table):
+    if db.dialect == SQLITE:
+        return {row['name'] for row in db.fetchall(f'PRAGMA table_info({table})')}
+    return {row['column_name'] for row in db.fetchall(
+        '''SELECT column_name FROM information_schema.columns
+           WHERE table_schema = current_schema() AND table_name = %s''', (table,))}
+
+
+def _baseline_columns():
+    """{table: [(column, definition)]} as migration 1 creates them"""
+    tables = {}
+    for statement in MIGRATIONS[0][2]:
+        if not isinstance(statement, str):
+            continue
+        header, _, body = statement.partition('(')
+        columns = tables[header.split()[-1]] = []
+        for line in body.splitlines():
+            name, _, definition = line.strip().rstrip(',').partition(' ')
+            if name.isidentifier() and name not in ('id', 'PRIMARY') and definition:
+                columns.append((name, definition))
+    return tables
+
+
+def _add_columns(table, columns):
+    """Step adding the (column, definition) pairs a table does not have yet"""
+    def add_missing(db):
+        existing = _table_columns(db, table)
+        for column, definition in columns:
+            if column not in existing:
+                db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return add_missing
+
+
+# Old column whose values a column added to a legacy table starts from
+_LEGACY_BACKFILL = {
+    # The app always stored the hash in both columns
+    ('users', 'password_hash'): 'password',
+}
+
+
+def _upgrade_legacy_tables(db):
+    """Add the columns that tables created by the old setup scripts lack
+
+    CREATE TABLE IF NOT EXISTS leaves such tables as they are. Columns that
+    can be added in place are; the run stops with an error naming the rest
+    (required columns without a default, and on SQLite UNIQUE columns or
+    CURRENT_TIMESTAMP defaults) so the table can be converted by hand.
+    """
+    blocked = []
+    for table, columns in _baseline_columns().items():
+        existing = _table_columns(db, table)
+        if not existing:
+            continue
+        for column, definition in columns:
+            if column in existing:
+                continue
+            upper = definition.upper()
+            if ('NOT NULL' in upper and 'DEFAULT' not in upper) or (
+                    db.dialect == SQLITE and ('UNIQUE' in upper or 'CURRENT_TIMESTAMP' in upper)):
+                blocked.append(f'{table}.{column}')
+                continue
+            db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+            source = _LEGACY_BACKFILL.get((table, column))
+            if source in existing:
+                db.execute(f'UPDATE {table} SET {column} = {source} WHERE {column} IS NULL')
+            logging.info(f"Added missing column {table}.{column}")
+    if blocked:
+        raise RuntimeError(
+            f"Tables predate the baseline schema and cannot gain {', '.join(blocked)} in place; "
+            "copy their rows into tables created by migration 1 (development databases can be recreated)")
+
+
+# (version, name, statements); never edit a released migration, add a new one.
+# A statement given as {dialect: sql} only runs on the dialects it names;
+# a callable is run with the db handle, for data that needs Python to move.
+MIGRATIONS = [
+    (1, 'baseline schema', [
+        '''CREATE TABLE IF NOT EXISTS users (
+            id {pk},
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255),
+            password_hash VARCHAR(255),
+            name VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS companies (
+            id {pk},
+            company_name VARCHAR(100) NOT NULL,
+            username VARCHAR(50) UNIQUE,
+            business_number VARCHAR(20) UNIQUE NOT NULL,
+            ceo_name VARCHAR(50) NOT NULL,
+            contact_number VARCHAR(20) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            address VARCHAR(200) NOT NULL,
+            company_description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS jobs (
+            id {pk},
+            title VARCHAR(200) NOT NULL,
+            company VARCHAR(100) NOT NULL,
+            contact VARCHAR(100) NOT NULL,
+            description TEXT NOT NULL,
+            company_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS introductions (
+            id {pk},
+            user_id INTEGER,
+            name VARCHAR(100) NOT NULL,
+            nationality VARCHAR(50) NOT NULL,
+            gender VARCHAR(20),
+            korean_fluent BOOLEAN,
+            languages VARCHAR(200) NOT NULL,
+            preferred_jobs TEXT,
+            preferred_location VARCHAR(100),
+            availability VARCHAR(50),
+            introduction TEXT NOT NULL,
+            youtube_link VARCHAR(500),
+            video_link VARCHAR(500),
+            step_completed INTEGER DEFAULT 1,
+            visa_type VARCHAR(50),
+            visa_expiry DATE,
+            past_jobs TEXT,
+            expected_salary VARCHAR(50),
+            housing_preference VARCHAR(100),
+            licenses TEXT,
+            religion VARCHAR(50),
+            work_hours VARCHAR(50),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS notices (
+            id {pk},
+            title VARCHAR(200) NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS forum_posts (
+            id {pk},
+            author VARCHAR(100) NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        # user_id holds either a user or a company id, so it has no foreign key
+        '''CREATE TABLE IF NOT EXISTS job_reactions (
+            id {pk},
+            job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL,
+            emoji VARCHAR(10) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(job_id, user_id, emoji)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS intro_reactions (
+            id {pk},
+            intro_id INTEGER REFERENCES introductions(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL,
+            emoji VARCHAR(10) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(intro_id, user_id, emoji)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS reaction_counts (
+            post_type VARCHAR(10) NOT NULL,
+            post_id INTEGER NOT NULL,
+            emoji VARCHAR(10) NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (post_type, post_id, emoji)
+        )''',
+        _upgrade_legacy_tables,
+    ]),
+    (2, 'hot path indexes', [
+        # Newest-first lists and keyset pagination on (created_at, id)
+        'CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at DESC, id DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_created_at ON introductions (created_at DESC, id DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_notices_created_at ON notices (created_at DESC, id DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_forum_posts_created_at ON forum_posts (created_at DESC, id DESC)',
+        # Per-post emoji grouping when counters are rebuilt or recounted
+        'CREATE INDEX IF NOT EXISTS idx_job_reactions_job_emoji ON job_reactions (job_id, emoji)',
+        'CREATE INDEX IF NOT EXISTS idx_intro_reactions_intro_emoji ON intro_reactions (intro_id, emoji)',
+        'CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs (company_id)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_user_id ON introductions (user_id)',
+    ]),
+    (3, 'content versions for HTTP validators', [
+        '''CREATE TABLE IF NOT EXISTS content_versions (
+            name VARCHAR(50) PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )''',
+        # updated_at starts empty: Last-Modified is only sent after a tracked write
+        '''INSERT INTO content_versions (name, version)
+           VALUES ('jobs', 0), ('introductions', 0), ('notices', 0), ('forum_posts', 0)''',
+    ]),
+    # Filled by search.index_post on write; run 'flask rebuild-search-index' once for existing posts
+    (4, 'full-text search index', [
+        {
+            POSTGRESQL: '''CREATE TABLE IF NOT EXISTS search_index (
+                post_type VARCHAR(10) NOT NULL,
+                post_id INTEGER NOT NULL,
+                title VARCHAR(200),
+                summary TEXT,
+                created_at TIMESTAMP,
+                document TSVECTOR NOT NULL,
+                PRIMARY KEY (post_type, post_id)
+            )''',
+            SQLITE: '''CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                heading, body,
+                post_type UNINDEXED, post_id UNINDEXED, title UNINDEXED,
+                summary UNINDEXED, created_at UNINDEXED,
+                tokenize = 'unicode61'
+            )''',
+        },
+        {POSTGRESQL: 'CREATE INDEX IF NOT EXISTS idx_search_index_document ON search_index USING GIN (document)'},
+    ]),
+    (5, 'introduction facets', [
+        # Multi-select answers, one row per value, mirrored from the comma-joined columns
+        '''CREATE TABLE IF NOT EXISTS introduction_languages (
+            intro_id INTEGER NOT NULL REFERENCES introductions(id) ON DELETE CASCADE,
+            language VARCHAR(50) NOT NULL,
+            PRIMARY KEY (intro_id, language)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS introduction_licenses (
+            intro_id INTEGER NOT NULL REFERENCES introductions(id) ON DELETE CASCADE,
+            license VARCHAR(50) NOT NULL,
+            PRIMARY KEY (intro_id, license)
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_introduction_languages_language ON introduction_languages (language, intro_id)',
+        'CREATE INDEX IF NOT EXISTS idx_introduction_licenses_license ON introduction_licenses (license, intro_id)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_nationality ON introductions (nationality)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_preferred_location ON introductions (preferred_location)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_availability ON introductions (availability)',
+        'CREATE INDEX IF NOT EXISTS idx_introductions_korean_fluent ON introductions (korean_fluent)',
+        _backfill_intro_facets,
+    ]),
+    # Optional job profile used by matching.py; mirrors the worker's Step1/Step2 answers
+    (6, 'job matching profile', [
+        # The old init_dev_db.py jobs table already has location and job_type
+        _add_columns('jobs', [
+            ('job_type', 'VARCHAR(50)'),
+            ('location', 'VARCHAR(100)'),
+            ('languages', 'VARCHAR(200)'),
+            ('korean_required', 'BOOLEAN'),
+            ('availability', 'VARCHAR(50)'),
+            ('work_hours', 'VARCHAR(50)'),
+            ('housing_provided', 'BOOLEAN'),
+        ]),
+        # Ids written per content version, so match profiles catch up row by row
+        '''CREATE TABLE IF NOT EXISTS content_changes (
+            name VARCHAR(50) NOT NULL,
+            version INTEGER NOT NULL,
+            post_id INTEGER NOT NULL,
+            PRIMARY KEY (name, version)
+        )''',
+    ]),
+    # Case-insensitive uniqueness; fails if existing accounts differ only by case
+    (7, 'case-insensitive account keys', [
+        'CREATE UNIQUE INDEX IF NOT EXISTS users_username_lower_key ON users (lower(username))',
+        'CREATE UNIQUE INDEX IF NOT EXISTS users_email_lower_key ON users (lower(email))',
+        'CREATE UNIQUE INDEX IF NOT EXISTS companies_username_lower_key ON companies (lower(username))',
+        'CREATE UNIQUE INDEX IF NOT EXISTS companies_email_lower_key ON companies (lower(email))',
+    ]),
+]
+
+
+def _ensure_version_table(db):
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.commit()
+
+
+def applied_versions(db):
+    """Versions already recorded in schema_migrations"""
+    _ensure_version_table(db)
+    return {row['version'] for row in db.fetchall('SELECT version FROM schema_migrations')}
+
+
+def migrate(db, target=None):
+    """Apply every pending migration up to `target` (default: latest)
+
+    Each migration runs in its own transaction together with its version
+    row. On PostgreSQL an advisory lock keeps concurrent runs (e.g. several
+    workers starting at once) from applying the same migration twice.
+    sqlite3 only opens a transaction by itself before DML and would commit
+    DDL statement by statement, so there the transaction is begun explicitly.
+    Returns the list of versions applied.
+    """
+    types = _TYPES[db.dialect]
+    applied = []
+    if db.dialect == POSTGRESQL:
+        db.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_ID,))
+    else:
+        db.commit()
+        isolation_level = db.conn.isolation_level
+        db.conn.isolation_level = None
+    try:
+        done = applied_versions(db)
+        for version, name, statements in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            if db.dialect == SQLITE:
+                db.execute('BEGIN')
+            try:
+                for statement in statements:
+                    if callable(statement):
+                        statement(db)
+                        continue
+                    if isinstance(statement, dict):
+                        statement = statement.get(db.dialect)
+                        if statement is None:
+                            continue
+                    db.execute(statement.format(**types))
+                db.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                           (version, name))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logging.error(f"Migration {version} ({name}) failed: {e}")
+                raise
+            logging.info(f"Applied migration {version}: {name}")
+            applied.append(version)
+    finally:
+        if db.dialect == POSTGRESQL:
+            db.execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_ID,))
+            db.commit()
+        else:
+            db.conn.isolation_level = isolation_level
+    return applied
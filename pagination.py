@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination for list pages
+Pages are ordered newest first by (created_at, id) and addressed by the key
+of their boundary rows, so every page costs one index range scan no matter
+how deep it is
+"""
+import base64
+import binascii
+from datetime import datetime
+
+
+class Page:
+    """One page of rows plus the cursors of its neighbours (None at either end)"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(row):
+    """Opaque URL-safe cursor for a row's (created_at, id) key"""
+    raw = f"{row['created_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) for a cursor, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, _, row_id = raw.partition('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def fetch_page(db, table, columns, page_size, after=None, before=None, where=None, params=()):
+    """Fetch the page following cursor `after`, or preceding cursor `before`
+
+    Reads page_size + 1 rows to learn whether another page exists, so no
+    COUNT or OFFSET is ever needed. Rows are returned newest first. `where`
+    (with its `params`) narrows the list, e.g. to the rows matching filters.
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before) if after_key is None else None
+
+    def select(key_condition, key, order):
+        conditions = [condition for condition in (where, key_condition) if condition]
+        clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return db.fetchall(f'''
+            SELECT {columns} FROM {table}
+            {clause}
+            ORDER BY created_at {order}, id {order}
+            LIMIT %s
+        ''', (*params, *key, page_size + 1))
+
+    if before_key is not None:
+        # Walk backwards from the cursor, then flip the rows back into display order
+        rows = select('(created_at, id) > (%s, %s)', before_key, 'ASC')
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        if not rows:
+            return Page([])
+        return Page(
+            rows,
+            next_cursor=encode_cursor(rows[-1]),
+            prev_cursor=encode_cursor(rows[0]) if has_more else None,
+        )
+
+    if after_key is not None:
+        rows = select('(created_at, id) < (%s, %s)', after_key, 'DESC')
+    else:
+        rows = select(None, (), 'DESC')
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if not rows:
+        return Page([])
+    return Page(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if has_more else None,
+        prev_cursor=encode_cursor(rows[0]) if after_key is not None else None,
+    )
@@ -0,0 +1,147 @@
+"""
+Password hashing off the request threads
+Hashes run on a small per-process thread pool behind a bounded queue.
+hashlib's scrypt and PBKDF2 release the GIL, so the pool caps how many cores
+hashing may take; when the queue is full callers get HasherBusy at once and
+the app answers 503 instead of stalling every worker thread
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Recent timings kept for the stats percentiles
+LATENCY_WINDOW = 1000
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash waited too long"""
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+
+
+class PasswordHasher:
+    """Bounded pool for generate/check_password_hash
+
+    `method` is any werkzeug method string ('scrypt', 'scrypt:16384:8:1',
+    'pbkdf2:sha256:600000', ...). Hashes stored with other parameters are
+    reported by `needs_rehash` and replaced at the next successful login.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_queue=32, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._prefix = None
+        self._pending = 0
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self._runs = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0, 'timeouts': 0}
+
+    def _pool(self):
+        # Threads do not survive fork(), so every worker process starts its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters['rejected'] += 1
+            raise HasherBusy('Password hashing queue is full')
+        queued_at = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            try:
+                return func(*args)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self._pending -= 1
+                    self._waits.append(started - queued_at)
+                    self._runs.append(finished - started)
+                self._slots.release()
+
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._pool().submit(job)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The hash still finishes in the background and frees its slot
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise HasherBusy(f'Password hash did not finish within {self.timeout}s')
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        password_hash = self._run(generate_password_hash, password, self.method)
+        with self._lock:
+            self._counters['hashed'] += 1
+        return password_hash
+
+    def verify(self, password_hash, password):
+        """True if `password` matches the stored hash"""
+        matches = self._run(check_password_hash, password_hash, password)
+        with self._lock:
+            self._counters['verified'] += 1
+        return matches
+
+    def needs_rehash(self, password_hash):
+        """True if a stored hash was made with other parameters than the configured ones"""
+        if self._prefix is None:
+            # werkzeug fills in default parameters, so read them off a real hash once
+            self._prefix = self._run(generate_password_hash, '', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def verify_and_update(self, password_hash, password):
+        """Return (matches, new_hash); new_hash is set when the stored hash is outdated"""
+        if not self.verify(password_hash, password):
+            return False, None
+        if not self.needs_rehash(password_hash):
+            return True, None
+        new_hash = self.hash(password)
+        with self._lock:
+            self._counters['rehashed'] += 1
+        return True, new_hash
+
+    def stats(self):
+        """Queue depth, counters and recent latencies (milliseconds) for this process"""
+        with self._lock:
+            waits = list(self._waits)
+            runs = list(self._runs)
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'queued': max(0, self._pending - self.workers),
+                **self._counters,
+                'wait_ms_p50': _percentile(waits, 0.5),
+                'wait_ms_p95': _percentile(waits, 0.95),
+                'hash_ms_p50': _percentile(runs, 0.5),
+                'hash_ms_p95': _percentile(runs, 0.95),
+                'hash_ms_max': round(max(runs) * 1000, 1) if runs else None,
+            }
@@ -0,0 +1,715 @@
+"""
+Public pages: the home feed, job postings, self-introductions, matches,
+notices, the forum, search and emoji reactions
+"""
+import logging
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, jsonify, make_response
+
+import facets
+import reactions
+import search
+from auth import is_logged_in, require_login_new
+from extensions import content_changed, get_db, get_home_feed_cache, get_match_engine, get_reaction_buffer
+from forms import INTRO_FACET_CHOICES, JOB_PROFILE_CHOICES
+from http_cache import Validators, bump_content_version, get_content_version
+from pagination import fetch_page
+from reactions import REACTION_TABLES, load_reactions, parse_post_keys, post_key
+
+bp = Blueprint('posts', __name__)
+
+# Input sanitization function
+def sanitize_input(text):
+    """Sanitize user input to prevent XSS attacks"""
+    if not text:
+        return ""
+    # Remove potentially dangerous HTML tags and scripts
+    text = str(text).strip()
+    # Basic HTML escaping is handled by Jinja2 auto-escaping
+    return text
+
+@bp.route('/')
+def index():
+    """Home page displaying both job postings and self-introductions"""
+    try:
+        # Recent posts of all four sections; stale sections are rebuilt in one query
+        feed = get_home_feed_cache().get(get_db())
+        
+        # Convert to format expected by template (id, data) tuples
+        sorted_jobs = [(post['id'], post) for post in feed['jobs']]
+        sorted_intros = [(post['id'], post) for post in feed['intros']]
+        sorted_notices = [(post['id'], post) for post in feed['notices']]
+        sorted_forums = [(post['id'], post) for post in feed['forums']]
+        
+        return render_template('index.html', 
+                             job_posts=sorted_jobs, 
+                             intro_posts=sorted_intros,
+                             notice_posts=sorted_notices,
+                             forum_posts=sorted_forums)
+    except Exception as e:
+        logging.error(f"Error in index route: {e}")
+        # Render the page without posts if the database fails
+        return render_template('index.html', job_posts=[], intro_posts=[], notice_posts=[], forum_posts=[])
+
+@bp.route('/health')
+def health_check():
+    """Simple health check endpoint for deployment"""
+    return "OK", 200
+
+@bp.route('/job/new', methods=['GET', 'POST'])
+def job_new():
+    """Page for companies to create new job postings"""
+    # Check if user is logged in
+    login_check = require_login_new()
+    if login_check:
+        return login_check
+        
+    if request.method == 'POST':
+        try:
+            title = sanitize_input(request.form.get('title', ''))
+            company = sanitize_input(request.form.get('company', ''))
+            contact = sanitize_input(request.form.get('contact', ''))
+            description = sanitize_input(request.form.get('description', ''))
+            
+            # Basic validation
+            if not all([title, company, contact, description]):
+                flash('모든 필드를 입력해주세요.', 'error')
+                return render_template('job_new.html', choices=JOB_PROFILE_CHOICES)
+            
+            profile = job_profile_from_form(request.form)
+            
+            # Save to database
+            db = get_db()
+            created_at = datetime.now()
+            job_id = db.fetchval("""
+                INSERT INTO jobs (title, company, contact, description, created_at, company_id,
+                                  job_type, location, languages, korean_required,
+                                  availability, work_hours, housing_provided)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            """, (title, company, contact, description, created_at, session.get('company_id'),
+                  profile['job_type'], profile['location'], profile['languages'],
+                  profile['korean_required'], profile['availability'],
+                  profile['work_hours'], profile['housing_provided']))
+            search.index_post(db, 'job', job_id, title, company, description, created_at)
+            bump_content_version(db, 'jobs', job_id)
+            db.commit()
+            content_changed('jobs', job_id)
+            
+            flash('구인공고가 성공적으로 등록되었습니다.', 'success')
+            return redirect(url_for('posts.job_view', job_id=job_id))
+            
+        except Exception as e:
+            logging.error(f"Error creating job post: {e}")
+            flash('구인공고 등록 중 오류가 발생했습니다.', 'error')
+            return render_template('job_new.html', choices=JOB_PROFILE_CHOICES)
+    
+    return render_template('job_new.html', choices=JOB_PROFILE_CHOICES)
+
+def job_profile_from_form(form):
+    """Optional matching fields of a job posting; unknown values are dropped"""
+    def choice(name):
+        value = form.get(name, '')
+        return value if value in dict(JOB_PROFILE_CHOICES[name]) else None
+    
+    languages = [value for value in form.getlist('languages')
+                 if value in dict(JOB_PROFILE_CHOICES['languages'])]
+    yes_no = {'yes': True, 'no': False}
+    return {
+        'job_type': choice('job_type'),
+        'location': choice('location'),
+        'languages': ','.join(languages) or None,
+        'korean_required': yes_no.get(form.get('korean_required')),
+        'availability': choice('availability'),
+        'work_hours': choice('work_hours'),
+        'housing_provided': yes_no.get(form.get('housing_provided')),
+    }
+
+# Columns shown on the list pages
+JOB_LIST_COLUMNS = 'id, title, company, contact, description, created_at, company_id'
+INTRO_LIST_COLUMNS = '''id, name, nationality, languages, introduction, created_at,
+    gender, korean_fluent, preferred_jobs, preferred_location,
+    availability, youtube_link, video_link'''
+FORUM_LIST_COLUMNS = 'id, author, title, created_at'
+
+
+def job_list_item(job):
+    """(id, data) pair the job list templates expect for a JOB_LIST_COLUMNS row"""
+    return job['id'], {
+        'id': job['id'],
+        'title': job['title'],
+        'company': job['company'],
+        'contact': job['contact'],
+        'description': job['description'],
+        'created_at': job['created_at'],
+        'timestamp': job['created_at'],
+        'company_id': job['company_id']
+    }
+
+
+def intro_list_item(intro):
+    """(id, data) pair the introduction list templates expect for an INTRO_LIST_COLUMNS row"""
+    return intro['id'], {
+        'id': intro['id'],
+        'name': intro['name'],
+        'nationality': intro['nationality'],
+        'languages': intro['languages'],
+        'introduction': intro['introduction'],
+        'created_at': intro['created_at'],
+        'timestamp': intro['created_at'],  # Add timestamp for compatibility
+        'gender': intro['gender'],
+        'korean_fluent': intro['korean_fluent'],
+        'preferred_jobs': intro['preferred_jobs'],
+        'preferred_location': intro['preferred_location'],
+        'availability': intro['availability'],
+        'youtube_link': intro['youtube_link'] or intro['video_link']
+    }
+
+
+def get_list_page(table, columns, where=None, params=()):
+    """Fetch the page of a list addressed by the ?after= / ?before= cursors"""
+    return fetch_page(
+        get_db(), table, columns,
+        page_size=current_app.config.get('PAGE_SIZE', 20),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        where=where, params=params,
+    )
+
+def list_validators(table):
+    """Validators for a list page: the table's version counter plus the page cursor"""
+    version = get_content_version(get_db(), table)
+    return Validators(request.full_path, current_app.config.get('PAGE_SIZE', 20), version['version'],
+                      last_modified=version['updated_at'], keys=[table])
+
+@bp.route('/job')
+def job_list():
+    """Page displaying all job postings"""
+    try:
+        validators = list_validators('jobs')
+        if validators.matches():
+            return validators.not_modified()
+        
+        page = get_list_page('jobs', JOB_LIST_COLUMNS)
+        jobs = page.items
+        
+        # Convert to format expected by template
+        job_posts_data = [job_list_item(job) for job in jobs]
+        
+        return validators.apply(make_response(
+            render_template('job_list.html', job_posts=job_posts_data, page=page)))
+        
+    except Exception as e:
+        logging.error(f"Error fetching jobs: {e}")
+        return render_template('job_list.html', job_posts=[])
+
+@bp.route('/job/<int:job_id>')
+def job_view(job_id):
+    """Page to view a specific job posting"""
+    try:
+        job_data = get_db().fetchone("""
+            SELECT id, title, company, contact, description, created_at, company_id
+            FROM jobs 
+            WHERE id = %s
+        """, (job_id,))
+        
+        if not job_data:
+            flash('존재하지 않는 구인공고입니다.', 'error')
+            return redirect(url_for('posts.job_list'))
+        
+        # Convert to format expected by template
+        job = {
+            'id': job_data['id'],
+            'title': job_data['title'],
+            'company': job_data['company'],
+            'contact': job_data['contact'],
+            'description': job_data['description'],
+            'created_at': job_data['created_at'],
+            'timestamp': job_data['created_at'],
+            'company_id': job_data['company_id']
+        }
+        
+        # The page shows the row and its reactions, so that is what the ETag covers
+        reaction_snapshot = get_reaction_snapshot([('job', job['id'])])
+        validators = Validators('job_view', job, reaction_snapshot, keys=['jobs', f'jobs-{job_id}'])
+        if validators.matches():
+            return validators.not_modified()
+        
+        return validators.apply(make_response(
+            render_template('job_view.html', job=job, reaction_snapshot=reaction_snapshot)))
+        
+    except Exception as e:
+        logging.error(f"Error fetching job {job_id}: {e}")
+        flash('구인공고를 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.job_list'))
+
+@bp.route('/intro/new', methods=['GET', 'POST'])
+def intro_new():
+    """Page for foreign workers to create self-introductions"""
+    # Check if user is logged in
+    login_check = require_login_new()
+    if login_check:
+        return login_check
+        
+    if request.method == 'POST':
+        name = sanitize_input(request.form.get('name', ''))
+        nationality = sanitize_input(request.form.get('nationality', ''))
+        languages = [value.strip() for value in sanitize_input(request.form.get('languages', '')).split(',')]
+        languages = list(dict.fromkeys(value for value in languages if value))
+        youtube_link = sanitize_input(request.form.get('youtube_link', '')) or None
+        introduction = sanitize_input(request.form.get('introduction', ''))
+        
+        # Basic validation
+        if not all([name, nationality, languages, introduction]):
+            flash('필수 필드를 모두 입력해주세요.', 'error')
+            return render_template('intro_new.html')
+        
+        try:
+            db = get_db()
+            created_at = datetime.now()
+            intro_id = db.fetchval('''
+                INSERT INTO introductions (user_id, name, nationality, languages, youtube_link,
+                                           introduction, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            ''', (session.get('user_id'), name, nationality, ','.join(languages), youtube_link,
+                  introduction, created_at))
+            facets.store_values(db, 'language', intro_id, languages)
+            search.index_intro(db, {'id': intro_id, 'name': name, 'introduction': introduction,
+                                    'created_at': created_at})
+            bump_content_version(db, 'introductions', intro_id)
+            db.commit()
+            content_changed('introductions', intro_id)
+            
+            flash('자기소개가 성공적으로 등록되었습니다.', 'success')
+            return redirect(url_for('posts.intro_view', intro_id=intro_id))
+            
+        except Exception as e:
+            logging.error(f"Error creating introduction: {e}")
+            flash('자기소개 등록 중 오류가 발생했습니다.', 'error')
+            return render_template('intro_new.html')
+    
+    return render_template('intro_new.html')
+
+@bp.route('/intro')
+def intro_list():
+    """Page displaying all self-introductions"""
+    try:
+        validators = list_validators('introductions')
+        if validators.matches():
+            return validators.not_modified()
+        
+        filters = facets.parse_filters(request.args)
+        where, params = facets.filter_clause(filters)
+        page = get_list_page('introductions', INTRO_LIST_COLUMNS, where, params)
+        introductions = page.items
+        facet_counts = facets.facet_counts(get_db(), filters)
+        
+        # Convert to format similar to original intro_posts structure
+        intro_posts_data = [intro_list_item(intro) for intro in introductions]
+        
+        return validators.apply(make_response(
+            render_template('intro_list.html', intro_posts=intro_posts_data, page=page,
+                            filters=filters, facet_counts=facet_counts,
+                            facet_choices=INTRO_FACET_CHOICES)))
+        
+    except Exception as e:
+        logging.error(f"Error fetching introductions: {e}")
+        return render_template('intro_list.html', intro_posts=[], filters={},
+                               facet_counts=None, facet_choices=INTRO_FACET_CHOICES)
+
+@bp.route('/intro/<int:intro_id>')
+def intro_view(intro_id):
+    """Page to view a specific self-introduction"""
+    try:
+        intro_data = get_db().fetchone("""
+            SELECT id, name, nationality, languages, introduction, created_at, 
+                   gender, korean_fluent, preferred_jobs, preferred_location, 
+                   availability, youtube_link, video_link
+            FROM introductions 
+            WHERE id = %s
+        """, (intro_id,))
+        
+        if not intro_data:
+            flash('존재하지 않는 자기소개입니다.', 'error')
+            return redirect(url_for('posts.intro_list'))
+        
+        # Convert to format expected by template
+        intro = {
+            'id': intro_data['id'],
+            'name': intro_data['name'],
+            'nationality': intro_data['nationality'],
+            'languages': intro_data['languages'],
+            'introduction': intro_data['introduction'],
+            'created_at': intro_data['created_at'],
+            'timestamp': intro_data['created_at'],  # Add timestamp for compatibility
+            'gender': intro_data['gender'],
+            'korean_fluent': intro_data['korean_fluent'],
+            'preferred_jobs': intro_data['preferred_jobs'],
+            'preferred_location': intro_data['preferred_location'],
+            'availability': intro_data['availability'],
+            'youtube_link': intro_data['youtube_link'] or intro_data['video_link']
+        }
+        
+        reaction_snapshot = get_reaction_snapshot([('intro', intro['id'])])
+        validators = Validators('intro_view', intro, reaction_snapshot,
+                                keys=['introductions', f'introductions-{intro_id}'])
+        if validators.matches():
+            return validators.not_modified()
+        
+        return validators.apply(make_response(
+            render_template('intro_view.html', intro=intro, reaction_snapshot=reaction_snapshot)))
+        
+    except Exception as e:
+        logging.error(f"Error fetching introduction {intro_id}: {e}")
+        flash('자기소개를 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.intro_list'))
+
+def fetch_rows_by_id(table, columns, ids):
+    """{id: row} for the given ids of a table"""
+    if not ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(ids))
+    rows = get_db().fetchall(f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})", tuple(ids))
+    return {row['id']: row for row in rows}
+
+@bp.route('/job/<int:job_id>/matches')
+def job_matches(job_id):
+    """Workers whose introductions best fit a job posting"""
+    login_check = require_login_new()
+    if login_check:
+        return login_check
+
+    try:
+        matches = get_match_engine().top_workers(get_db(), job_id, current_app.config.get('MATCH_RESULTS', 20))
+        if matches is None:
+            flash('존재하지 않는 구인공고입니다.', 'error')
+            return redirect(url_for('posts.job_list'))
+
+        job = fetch_rows_by_id('jobs', 'id, title, company', [job_id])[job_id]
+        intros = fetch_rows_by_id('introductions', INTRO_LIST_COLUMNS, [intro_id for intro_id, _ in matches])
+        results = [(intros[intro_id], match) for intro_id, match in matches if intro_id in intros]
+        return render_template('matches.html', kind='job', source=job, results=results)
+
+    except Exception as e:
+        logging.error(f"Error matching workers for job {job_id}: {e}")
+        flash('추천 목록을 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.job_view', job_id=job_id))
+
+@bp.route('/intro/<int:intro_id>/matches')
+def intro_matches(intro_id):
+    """Job postings that best fit a worker's introduction"""
+    login_check = require_login_new()
+    if login_check:
+        return login_check
+
+    try:
+        matches = get_match_engine().top_jobs(get_db(), intro_id, current_app.config.get('MATCH_RESULTS', 20))
+        if matches is None:
+            flash('존재하지 않는 자기소개입니다.', 'error')
+            return redirect(url_for('posts.intro_list'))
+
+        intro = fetch_rows_by_id('introductions', 'id, name, nationality', [intro_id])[intro_id]
+        jobs = fetch_rows_by_id('jobs', JOB_LIST_COLUMNS, [job_id for job_id, _ in matches])
+        results = [(jobs[job_id], match) for job_id, match in matches if job_id in jobs]
+        return render_template('matches.html', kind='intro', source=intro, results=results)
+
+    except Exception as e:
+        logging.error(f"Error matching jobs for introduction {intro_id}: {e}")
+        flash('추천 목록을 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.intro_view', intro_id=intro_id))
+
+# Notice routes
+@bp.route('/notice')
+def notice_list():
+    """Page displaying all notices"""
+    try:
+        validators = list_validators('notices')
+        if validators.matches():
+            return validators.not_modified()
+        
+        page = get_list_page('notices', '*')
+        notices = page.items
+        # Convert to tuple format for template compatibility
+        notice_posts = [(notice['id'], notice) for notice in notices]
+        return validators.apply(make_response(
+            render_template('notice_list.html', notice_posts=notice_posts, page=page)))
+    except Exception as e:
+        logging.error(f"Error fetching notices: {e}")
+        flash('공지사항을 불러오는 중 오류가 발생했습니다.', 'error')
+        return render_template('notice_list.html', notice_posts=[])
+
+@bp.route('/notice/new', methods=['GET', 'POST'])
+def notice_new():
+    """Page to create new notices - requires admin login"""
+    # Check if user is logged in and is admin
+    if not session.get('user_id'):
+        flash('로그인이 필요합니다.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    if session.get('role') != 'admin':
+        flash('공지사항 작성 권한이 없습니다. 관리자만 작성 가능합니다.', 'error')
+        return redirect(url_for('posts.notice_list'))
+    
+    if request.method == 'POST':
+        title = sanitize_input(request.form.get('title', ''))
+        content = sanitize_input(request.form.get('content', ''))
+        
+        if not all([title, content]):
+            flash('모든 필드를 입력해주세요.', 'error')
+            return render_template('notice_new.html')
+        
+        try:
+            db = get_db()
+            notice_id = db.fetchval('INSERT INTO notices (title, content, created_at) VALUES (%s, %s, %s) RETURNING id',
+                                    (title, content, datetime.now()))
+            bump_content_version(db, 'notices')
+            db.commit()
+            content_changed('notices')
+            
+            flash('공지사항이 성공적으로 등록되었습니다.', 'success')
+            return redirect(url_for('posts.notice_view', notice_id=notice_id))
+                
+        except Exception as e:
+            logging.error(f"Error creating notice: {e}")
+            flash('공지사항 등록 중 오류가 발생했습니다.', 'error')
+            return render_template('notice_new.html')
+    
+    return render_template('notice_new.html')
+
+@bp.route('/notice/<int:notice_id>')
+def notice_view(notice_id):
+    """Page to view a specific notice"""
+    try:
+        notice = get_db().fetchone('SELECT * FROM notices WHERE id = %s', (notice_id,))
+        
+        if not notice:
+            flash('존재하지 않는 공지사항입니다.', 'error')
+            return redirect(url_for('posts.notice_list'))
+            
+        validators = Validators('notice_view', notice, keys=['notices', f'notices-{notice_id}'])
+        if validators.matches():
+            return validators.not_modified()
+        
+        return validators.apply(make_response(render_template('notice_view.html', notice=notice)))
+    except Exception as e:
+        logging.error(f"Error fetching notice {notice_id}: {e}")
+        flash('공지사항을 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.notice_list'))
+
+# Forum routes
+@bp.route('/forum')
+def forum_list():
+    """Page displaying all forum posts"""
+    try:
+        validators = list_validators('forum_posts')
+        if validators.matches():
+            return validators.not_modified()
+        
+        page = get_list_page('forum_posts', FORUM_LIST_COLUMNS)
+        # Convert to tuple format for template compatibility
+        forum_posts = [(forum['id'], forum) for forum in page.items]
+        return validators.apply(make_response(
+            render_template('forum_list.html', forum_posts=forum_posts, page=page)))
+    except Exception as e:
+        logging.error(f"Error fetching forum posts: {e}")
+        flash('게시글을 불러오는 중 오류가 발생했습니다.', 'error')
+        return render_template('forum_list.html', forum_posts=[])
+
+@bp.route('/forum/new', methods=['GET', 'POST'])
+def forum_new():
+    """Page to create new forum posts"""
+    if request.method == 'POST':
+        author = sanitize_input(request.form.get('author', ''))
+        title = sanitize_input(request.form.get('title', ''))
+        content = sanitize_input(request.form.get('content', ''))
+        
+        if not all([author, title, content]):
+            flash('모든 필드를 입력해주세요.', 'error')
+            return render_template('forum_new.html')
+        
+        try:
+            db = get_db()
+            forum_id = db.fetchval('''
+                INSERT INTO forum_posts (author, title, content, created_at)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+            ''', (author, title, content, datetime.now()))
+            bump_content_version(db, 'forum_posts')
+            db.commit()
+            content_changed('forum_posts', forum_id)
+            
+            flash('포럼 게시글이 성공적으로 등록되었습니다.', 'success')
+            return redirect(url_for('posts.forum_view', forum_id=forum_id))
+            
+        except Exception as e:
+            logging.error(f"Error creating forum post: {e}")
+            flash('포럼 게시글 등록 중 오류가 발생했습니다.', 'error')
+            return render_template('forum_new.html')
+    
+    return render_template('forum_new.html')
+
+@bp.route('/forum/<int:forum_id>')
+def forum_view(forum_id):
+    """Page to view a specific forum post"""
+    try:
+        forum = get_db().fetchone('SELECT * FROM forum_posts WHERE id = %s', (forum_id,))
+        
+        if not forum:
+            flash('존재하지 않는 게시글입니다.', 'error')
+            return redirect(url_for('posts.forum_list'))
+        
+        validators = Validators('forum_view', forum, keys=['forum_posts', f'forum_posts-{forum_id}'])
+        if validators.matches():
+            return validators.not_modified()
+        
+        return validators.apply(make_response(render_template('forum_view.html', forum=forum)))
+    except Exception as e:
+        logging.error(f"Error fetching forum post {forum_id}: {e}")
+        flash('게시글을 불러오는 중 오류가 발생했습니다.', 'error')
+        return redirect(url_for('posts.forum_list'))
+
+
+# Reaction routes
+@bp.route('/react/<string:post_type>/<int:post_id>', methods=['GET', 'POST'])
+def add_reaction(post_type, post_id):
+    if request.method == 'GET':
+        # Return current reaction data for the post
+        reaction_data = get_post_reactions(post_type, post_id)
+        return jsonify({'success': True, 'reactions': reaction_data})
+    
+    if not is_logged_in():
+        return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+    
+    data = request.get_json()
+    emoji = data.get('emoji') if data else None
+    user_id = session['user_id']
+    
+    if not emoji:
+        return jsonify({'success': False, 'message': '이모지를 선택해주세요.'}), 400
+    
+    if post_type not in REACTION_TABLES:
+        return jsonify({'success': False, 'message': '잘못된 게시글 유형입니다.'}), 400
+    
+    db = get_db()
+    
+    try:
+        buffer = get_reaction_buffer()
+        if buffer is not None:
+            # Written by the background flusher; counts are projected
+            reaction_data = buffer.toggle(db, post_type, post_id, user_id, emoji, add=True)
+            if reaction_data is not None:
+                return jsonify({'success': True, 'reactions': reaction_data})
+        
+        # Existence check, insert, counter bump and updated counts in one statement
+        reaction_data = reactions.react(db, post_type, post_id, user_id, emoji)
+        if reaction_data is None:
+            db.rollback()
+            return jsonify({'success': False, 'message': '존재하지 않는 게시글입니다.'}), 404
+        
+        db.commit()
+        return jsonify({'success': True, 'reactions': reaction_data})
+        
+    except Exception as e:
+        logging.error(f"Error adding reaction to {post_type} {post_id}: {e}")
+        db.rollback()
+        return jsonify({'success': False, 'message': '반응 추가 중 오류가 발생했습니다.'}), 500
+
+@bp.route('/unreact/<string:post_type>/<int:post_id>', methods=['POST'])
+def remove_reaction(post_type, post_id):
+    if not is_logged_in():
+        return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+    
+    data = request.get_json()
+    emoji = data.get('emoji') if data else None
+    user_id = session['user_id']
+    
+    if not emoji:
+        return jsonify({'success': False, 'message': '이모지를 선택해주세요.'}), 400
+    
+    if post_type not in REACTION_TABLES:
+        return jsonify({'success': False, 'message': '잘못된 게시글 유형입니다.'}), 400
+    
+    db = get_db()
+    
+    try:
+        buffer = get_reaction_buffer()
+        if buffer is not None:
+            reaction_data = buffer.toggle(db, post_type, post_id, user_id, emoji, add=False)
+            if reaction_data is not None:
+                return jsonify({'success': True, 'reactions': reaction_data})
+        
+        # Delete, counter decrement and updated counts in one statement
+        reaction_data = reactions.unreact(db, post_type, post_id, user_id, emoji)
+        db.commit()
+        return jsonify({'success': True, 'reactions': reaction_data})
+        
+    except Exception as e:
+        logging.error(f"Error removing reaction from {post_type} {post_id}: {e}")
+        db.rollback()
+        return jsonify({'success': False, 'message': '반응 제거 중 오류가 발생했습니다.'}), 500
+
+def get_post_reactions(post_type, post_id):
+    """Get reaction counts and user reactions for a post"""
+    if post_type not in REACTION_TABLES:
+        return {}
+    
+    reaction_data = load_reactions(get_db(), [(post_type, post_id)], session.get('user_id'))
+    return reaction_data[post_key(post_type, post_id)]
+
+def get_reaction_snapshot(posts):
+    """Reactions for every post rendered on a page, embedded so first paint needs no requests"""
+    try:
+        return load_reactions(get_db(), posts, session.get('user_id'))
+    except Exception as e:
+        logging.error(f"Error loading reaction snapshot: {e}")
+        return {}
+
+@bp.route('/reactions')
+def bulk_reactions():
+    """Reaction data for many posts at once, e.g. /reactions?posts=job:1,intro:2"""
+    posts = parse_post_keys(request.args.get('posts', ''))
+    if not posts:
+        return jsonify({'success': False, 'message': '잘못된 요청입니다.'}), 400
+    
+    try:
+        reaction_data = load_reactions(get_db(), posts, session.get('user_id'))
+        return jsonify({'success': True, 'reactions': reaction_data})
+    except Exception as e:
+        logging.error(f"Error loading bulk reactions: {e}")
+        return jsonify({'success': False, 'message': '반응을 불러오는 중 오류가 발생했습니다.'}), 500
+
+@bp.route('/search')
+def search_posts():
+    """Ranked full-text search over job postings and self-introductions"""
+    query = request.args.get('q', '').strip()[:100]
+    post_type = request.args.get('type')
+    if post_type not in search.POST_TYPES:
+        post_type = None
+    
+    results, next_cursor = [], None
+    if query:
+        try:
+            results, next_cursor = search.search(
+                get_db(), query,
+                page_size=current_app.config.get('PAGE_SIZE', 20),
+                after=request.args.get('after'),
+                post_type=post_type,
+            )
+        except Exception as e:
+            logging.error(f"Error searching for {query!r}: {e}")
+            flash('검색 중 오류가 발생했습니다.', 'error')
+    
+    return render_template('search.html', query=query, post_type=post_type,
+                           results=results, next_cursor=next_cursor)
+
+@bp.app_template_filter('datetime')
+def datetime_filter(dt):
+    """Format datetime for display"""
+    return dt.strftime('%Y년 %m월 %d일 %H:%M')
+
+@bp.app_template_filter('get_reactions')
+def get_reactions_filter(post_type, post_id):
+    """Template filter to get reactions for a post"""
+    return get_post_reactions(post_type, post_id)
@@ -0,0 +1,185 @@
+"""
+Slow-query log and N+1 detection
+Every statement run through a Database handle is reduced to a fingerprint
+(literals and placeholders replaced by ?) and its timing and row count are
+added to per-process stats. Statements slower than SLOW_QUERY_MS are logged
+with their EXPLAIN plan; requests that run one fingerprint
+QUERY_REPEAT_THRESHOLD times or more are logged as a likely N+1
+"""
+import re
+import time
+import logging
+import threading
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+
+from db import POSTGRESQL
+
+# Distinct fingerprints tracked per process; later ones are only counted
+MAX_FINGERPRINTS = 500
+
+# Seconds between two EXPLAINs of the same fingerprint
+EXPLAIN_INTERVAL = 60
+
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """The statement with comments, literals and placeholder lists folded away"""
+    text = _COMMENT.sub(' ', sql)
+    text = _STRING.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _VALUE_LIST.sub('(?+)', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def _statement_kind(sql):
+    return _COMMENT.sub(' ', sql).lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+
+
+def explain(db, sql, params, analyze=False):
+    """The plan of a statement as text
+
+    ANALYZE (PostgreSQL only) runs the statement again, so it is only used for
+    SELECTs. On PostgreSQL the EXPLAIN runs inside a savepoint so that a
+    failure cannot abort the caller's transaction.
+    """
+    cur = db.cursor()
+    try:
+        if db.dialect != POSTGRESQL:
+            rows = cur.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+            return '\n'.join(row['detail'] for row in rows)
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze and _statement_kind(sql) == 'SELECT' else 'EXPLAIN '
+        cur.execute('SAVEPOINT query_profiler_explain')
+        try:
+            rows = cur.execute(prefix + sql, params).fetchall()
+        except Exception:
+            cur.execute('ROLLBACK TO SAVEPOINT query_profiler_explain')
+            raise
+        cur.execute('RELEASE SAVEPOINT query_profiler_explain')
+        return '\n'.join(row['QUERY PLAN'] for row in rows)
+    finally:
+        cur.close()
+
+
+class QueryProfiler:
+    """Per-process statement stats, slow-query log and per-request repeat counts"""
+
+    def __init__(self, slow_ms=200, explain=True, explain_analyze=False, repeat_threshold=0):
+        self.slow_seconds = slow_ms / 1000 if slow_ms else None
+        self.explain = explain
+        self.explain_analyze = explain_analyze
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._explained_at = {}
+        self._counters = {'statements': 0, 'untracked': 0, 'slow': 0, 'explained': 0, 'repeat_requests': 0}
+
+    def observe(self, db, sql, params, seconds, rows):
+        """Database observer"""
+        fp = fingerprint(sql)
+        slow = self.slow_seconds is not None and seconds >= self.slow_seconds
+        with self._lock:
+            self._counters['statements'] += 1
+            entry = self._stats.get(fp)
+            if entry is None and len(self._stats) < MAX_FINGERPRINTS:
+                entry = self._stats[fp] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'slow': 0}
+            if entry is None:
+                self._counters['untracked'] += 1
+            else:
+                entry['calls'] += 1
+                entry['seconds'] += seconds
+                entry['max_seconds'] = max(entry['max_seconds'], seconds)
+                entry['rows'] += max(rows, 0)
+                entry['slow'] += slow
+
+        if self.repeat_threshold and has_request_context():
+            repeats = g.setdefault('_query_repeats', {})
+            count, total = repeats.get(fp, (0, 0.0))
+            repeats[fp] = (count + 1, total + seconds)
+
+        if slow:
+            self._log_slow(db, sql, params, fp, seconds, rows)
+
+    def _log_slow(self, db, sql, params, fp, seconds, rows):
+        plan = None
+        now = time.monotonic()
+        with self._lock:
+            self._counters['slow'] += 1
+            due = (self.explain and params is not None
+                   and now - self._explained_at.get(fp, -EXPLAIN_INTERVAL) >= EXPLAIN_INTERVAL)
+            if due:
+                self._explained_at[fp] = now
+        if due and _statement_kind(sql) in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+            try:
+                plan = explain(db, sql, params, analyze=self.explain_analyze)
+                with self._lock:
+                    self._counters['explained'] += 1
+            except Exception as e:
+                plan = f'(EXPLAIN failed: {e})'
+        # Parameters are left out on purpose: they hold emails and password hashes
+        message = f"Slow query {seconds * 1000:.1f} ms, {rows} rows: {fp}"
+        logging.warning(f"{message}\n{plan}" if plan else message)
+
+    def check_request(self):
+        """Log fingerprints the current request ran at least repeat_threshold times"""
+        repeats = g.pop('_query_repeats', None)
+        if not repeats:
+            return
+        flagged = False
+        for fp, (count, total) in repeats.items():
+            if count >= self.repeat_threshold:
+                flagged = True
+                logging.warning(f"Possible N+1: {request.method} {request.path} ran {count} times "
+                                f"({total * 1000:.1f} ms): {fp}")
+        if flagged:
+            with self._lock:
+                self._counters['repeat_requests'] += 1
+
+    def stats(self, limit=50):
+        """Counters and the `limit` fingerprints with the most total time (milliseconds)"""
+        with self._lock:
+            entries = sorted(self._stats.items(), key=lambda item: item[1]['seconds'], reverse=True)[:limit]
+            return {
+                'slow_ms': self.slow_seconds * 1000 if self.slow_seconds is not None else None,
+                'repeat_threshold': self.repeat_threshold,
+                **self._counters,
+                'fingerprints': len(self._stats),
+                'top': [{
+                    'fingerprint': fp,
+                    'calls': entry['calls'],
+                    'total_ms': round(entry['seconds'] * 1000, 1),
+                    'mean_ms': round(entry['seconds'] * 1000 / entry['calls'], 2),
+                    'max_ms': round(entry['max_seconds'] * 1000, 1),
+                    'rows': entry['rows'],
+                    'slow': entry['slow'],
+                } for fp, entry in entries],
+            }
+
+
+def init_query_profiler(app):
+    """Create the app's profiler (used by extensions.open_db) and the N+1 check"""
+    config = app.config
+    profiler = QueryProfiler(
+        slow_ms=config.get('SLOW_QUERY_MS', 200),
+        explain=config.get('SLOW_QUERY_EXPLAIN', True),
+        explain_analyze=config.get('SLOW_QUERY_EXPLAIN_ANALYZE', False),
+        repeat_threshold=config.get('QUERY_REPEAT_THRESHOLD', 0),
+    )
+    app.extensions['query_profiler'] = profiler
+
+    if profiler.repeat_threshold:
+        @app.after_request
+        def check_query_repeats(response):
+            profiler.check_request()
+            return response
+
+    return profiler
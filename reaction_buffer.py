@@ -0,0 +1,288 @@
+"""
+Write-behind buffering of reaction toggles
+/react and /unreact record the toggle in memory and answer with projected
+counts; a background thread writes the accumulated changes in batches
+"""
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+
+from reactions import POST_TABLES, REACTION_TABLES
+
+# Rows per multi-row INSERT/DELETE, kept well under SQLite's variable limit
+FLUSH_CHUNK_SIZE = 300
+
+# Posts whose stored reactions are kept in memory, and seconds before one is
+# read again to pick up reactions other processes wrote
+SNAPSHOT_POSTS = 10000
+SNAPSHOT_TTL = 30
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ReactionBuffer:
+    """Bounded, coalescing buffer of pending reaction toggles for one process
+
+    Each entry is keyed by (user_id, emoji) under its post and stores the
+    state the user asked for together with the count delta that implies.
+    An entry is only kept while it differs from what the database will
+    hold, so a react followed by an unreact from the same user cancels out
+    before anything reaches the database.
+
+    A post's stored reactions are read once into a snapshot that the flusher
+    keeps current with what it writes, so toggles on a post seen in the last
+    SNAPSHOT_TTL seconds run no query at all.
+    """
+
+    def __init__(self, open_db, release_db, max_pending=10000, flush_interval_ms=200):
+        self._open_db = open_db
+        self._release_db = release_db
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # {(post_type, post_id): {(user_id, emoji): (add, delta)}}
+        self._pending = {}
+        self._pending_size = 0
+        # Batch currently being written; still counted in projections
+        self._inflight = {}
+        # Bumped whenever a written batch leaves _inflight
+        self._generation = 0
+        # {(post_type, post_id): (loaded_at, {emoji: {user_id}})}, least recently used first
+        self._snapshots = OrderedDict()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_running(self):
+        # Threads do not survive fork(), so each worker starts its own flusher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._pending, self._pending_size, self._inflight = {}, 0, {}
+                self._snapshots = OrderedDict()
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='reaction-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Error flushing reaction buffer: {e}")
+
+    def _snapshot(self, db, post):
+        """Stored reactions of a post as {emoji: {user_id}}; None if the post does not exist"""
+        with self._lock:
+            cached = self._snapshots.get(post)
+            if cached is not None and time.monotonic() - cached[0] < SNAPSHOT_TTL:
+                self._snapshots.move_to_end(post)
+                return cached[1]
+
+        post_type, post_id = post
+        spec = REACTION_TABLES[post_type]
+        while True:
+            with self._lock:
+                generation = self._generation
+            rows = db.fetchall(f'''
+                SELECT r.user_id, r.emoji
+                FROM {POST_TABLES[post_type]} p
+                LEFT JOIN {spec['table']} r ON r.{spec['id_field']} = p.id
+                WHERE p.id = %s
+            ''', (post_id,))
+
+            with self._lock:
+                if self._generation != generation:
+                    # A batch landed while we read; it may or may not be in `rows`
+                    continue
+                if not rows:
+                    return None
+                stored = {}
+                for row in rows:
+                    if row['emoji'] is not None:
+                        stored.setdefault(row['emoji'], set()).add(row['user_id'])
+                self._snapshots[post] = (time.monotonic(), stored)
+                self._snapshots.move_to_end(post)
+                while len(self._snapshots) > SNAPSHOT_POSTS:
+                    self._snapshots.popitem(last=False)
+                return stored
+
+    def toggle(self, db, post_type, post_id, user_id, emoji, add):
+        """Record a toggle and return the projected reactions for the post
+
+        Returns None when the buffer is full or the post does not exist; the
+        caller then writes synchronously instead, which also reports the
+        missing post.
+        """
+        self._ensure_running()
+        post = (post_type, post_id)
+        stored = self._snapshot(db, post)
+        if stored is None:
+            return None
+
+        with self._lock:
+            # A reload may have replaced the snapshot meanwhile
+            cached = self._snapshots.get(post)
+            if cached is not None:
+                stored = cached[1]
+            key = (user_id, emoji)
+            # What the database will hold once the in-flight batch lands
+            inflight = self._inflight.get(post, {}).get(key)
+            base = inflight[0] if inflight else user_id in stored.get(emoji, ())
+
+            entries = self._pending.setdefault(post, {})
+            if add == base:
+                if entries.pop(key, None) is not None:
+                    self._pending_size -= 1
+            else:
+                if key not in entries:
+                    if self._pending_size >= self.max_pending:
+                        if not entries:
+                            del self._pending[post]
+                        return None
+                    self._pending_size += 1
+                entries[key] = (add, 1 if add else -1)
+            if not entries:
+                del self._pending[post]
+
+            return self._project(post, user_id, stored)
+
+    def _project(self, post, user_id, stored):
+        counts = {emoji: len(users) for emoji, users in stored.items()}
+        mine = {emoji for emoji, users in stored.items() if user_id in users}
+        for batch in (self._inflight, self._pending):
+            for (entry_user, emoji), (add, delta) in batch.get(post, {}).items():
+                counts[emoji] = counts.get(emoji, 0) + delta
+                if entry_user == user_id:
+                    (mine.add if add else mine.discard)(emoji)
+        return {
+            emoji: {'count': count, 'user_reacted': emoji in mine}
+            for emoji, count in counts.items() if count > 0
+        }
+
+    def pending_count(self):
+        with self._lock:
+            return self._pending_size
+
+    def flush(self):
+        """Write every pending toggle in one transaction; returns toggles written"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._inflight, self._pending = self._pending, {}
+                written, self._pending_size = self._pending_size, 0
+
+            try:
+                db = self._open_db()
+                try:
+                    self._write(db, self._inflight)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                finally:
+                    self._release_db(db)
+            except Exception:
+                # Put the batch back underneath anything recorded since
+                with self._lock:
+                    for post, entries in self._inflight.items():
+                        merged = dict(entries)
+                        merged.update(self._pending.get(post, {}))
+                        self._pending[post] = merged
+                    self._pending_size = sum(len(entries) for entries in self._pending.values())
+                    self._inflight = {}
+                raise
+
+            with self._lock:
+                # The snapshots now hold what was written
+                for post, entries in self._inflight.items():
+                    cached = self._snapshots.get(post)
+                    if cached is None:
+                        continue
+                    stored = cached[1]
+                    for (user_id, emoji), (add, _) in entries.items():
+                        users = stored.setdefault(emoji, set())
+                        (users.add if add else users.discard)(user_id)
+                        if not users:
+                            del stored[emoji]
+                self._inflight = {}
+                self._generation += 1
+            return written
+
+    def _write(self, db, batch):
+        for post_type, spec in REACTION_TABLES.items():
+            adds, removes, posts = [], [], []
+            for (kind, post_id), entries in batch.items():
+                if kind != post_type:
+                    continue
+                posts.append(post_id)
+                for (user_id, emoji), (add, _) in entries.items():
+                    (adds if add else removes).append((post_id, user_id, emoji))
+            if not posts:
+                continue
+
+            for rows in _chunks(adds, FLUSH_CHUNK_SIZE):
+                values = ', '.join(['(%s, %s, %s)'] * len(rows))
+                # Posts deleted in the meantime are dropped by the join
+                db.execute(f'''
+                    INSERT INTO {spec['table']} ({spec['id_field']}, user_id, emoji)
+                    SELECT v.column1, v.column2, v.column3
+                    FROM (VALUES {values}) AS v
+                    JOIN {POST_TABLES[post_type]} p ON p.id = v.column1
+                    WHERE 1 = 1
+                    ON CONFLICT ({spec['id_field']}, user_id, emoji) DO NOTHING
+                ''', [value for row in rows for value in row])
+
+            for rows in _chunks(removes, FLUSH_CHUNK_SIZE):
+                values = ', '.join(['(%s, %s, %s)'] * len(rows))
+                db.execute(f'''
+                    DELETE FROM {spec['table']}
+                    WHERE ({spec['id_field']}, user_id, emoji) IN (VALUES {values})
+                ''', [value for row in rows for value in row])
+
+            # Recount the touched posts from the raw rows so counters stay exact
+            for ids in _chunks(posts, FLUSH_CHUNK_SIZE):
+                placeholders = ', '.join(['%s'] * len(ids))
+                db.execute(f'''
+                    DELETE FROM reaction_counts
+                    WHERE post_type = '{post_type}' AND post_id IN ({placeholders})
+                ''', ids)
+                db.execute(f'''
+                    INSERT INTO reaction_counts (post_type, post_id, emoji, count)
+                    SELECT '{post_type}', {spec['id_field']}, emoji, COUNT(*)
+                    FROM {spec['table']}
+                    WHERE {spec['id_field']} IN ({placeholders})
+                    GROUP BY {spec['id_field']}, emoji
+                ''', ids)
+
+    def stop(self, flush=True):
+        """Stop the flusher and write whatever is still pending"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval * 5)
+        if flush and self._pid == os.getpid():
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Error flushing reaction buffer on shutdown: {e}")
+
+
+def create_reaction_buffer(open_db, release_db, max_pending, flush_interval_ms):
+    """Create a buffer that is flushed when the process shuts down"""
+    buffer = ReactionBuffer(open_db, release_db, max_pending, flush_interval_ms)
+    atexit.register(buffer.stop)
+    return buffer
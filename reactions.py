@@ -0,0 +1,267 @@
+"""
+Reaction queries shared by the reaction routes and server-rendered pages
+Counts live in the denormalized reaction_counts table, keyed by
+(post_type, post_id, emoji), and are kept in step with the raw
+job_reactions/intro_reactions rows inside the same transaction
+"""
+from db import POSTGRESQL
+
+# Tables holding the posts that can be reacted to
+POST_TABLES = {
+    'job': 'jobs',
+    'intro': 'introductions'
+}
+
+# Whitelist allowed table and field combinations to prevent SQL injection
+REACTION_TABLES = {
+    'job': {'table': 'job_reactions', 'id_field': 'job_id'},
+    'intro': {'table': 'intro_reactions', 'id_field': 'intro_id'}
+}
+
+# Upper bound on posts per bulk request so one call cannot build a huge IN list
+MAX_BULK_POSTS = 200
+
+
+def post_key(post_type, post_id):
+    """Key used for a post in bulk reaction payloads, e.g. 'job:12'"""
+    return f'{post_type}:{post_id}'
+
+
+def parse_post_keys(raw):
+    """Parse 'job:1,intro:2' into [('job', 1), ('intro', 2)]
+
+    Unknown post types and malformed ids are skipped; duplicates are dropped.
+    """
+    posts = []
+    seen = set()
+    for item in (raw or '').split(','):
+        post_type, _, post_id = item.strip().partition(':')
+        if post_type not in REACTION_TABLES or not post_id.isdigit():
+            continue
+        key = (post_type, int(post_id))
+        if key not in seen:
+            seen.add(key)
+            posts.append(key)
+    return posts[:MAX_BULK_POSTS]
+
+
+def load_reactions(db, posts, user_id=None):
+    """Reaction counts for many posts in a single round trip
+
+    Counts are primary-key lookups on reaction_counts; the current user's own
+    reactions come from the raw tables through their unique indexes.
+    Returns {'job:1': {'👍': {'count': 3, 'user_reacted': True}}, ...} with an
+    entry (possibly empty) for every requested post.
+    """
+    result = {post_key(post_type, post_id): {} for post_type, post_id in posts}
+    if not posts:
+        return result
+
+    selects = []
+    params = []
+    for post_type, spec in REACTION_TABLES.items():
+        ids = [post_id for kind, post_id in posts if kind == post_type]
+        if not ids:
+            continue
+        placeholders = ', '.join(['%s'] * len(ids))
+        selects.append(f'''
+            SELECT post_type, post_id, emoji, count, 0 AS mine
+            FROM reaction_counts
+            WHERE post_type = '{post_type}' AND post_id IN ({placeholders}) AND count > 0
+        ''')
+        params.extend(ids)
+        if user_id is not None:
+            selects.append(f'''
+                SELECT '{post_type}' AS post_type, {spec['id_field']} AS post_id, emoji, 0 AS count, 1 AS mine
+                FROM {spec['table']}
+                WHERE {spec['id_field']} IN ({placeholders}) AND user_id = %s
+            ''')
+            params.extend(ids)
+            params.append(user_id)
+
+    mine = []
+    for row in db.fetchall(' UNION ALL '.join(selects), params):
+        key = post_key(row['post_type'], row['post_id'])
+        if row['mine']:
+            mine.append((key, row['emoji']))
+        else:
+            result[key][row['emoji']] = {'count': row['count'], 'user_reacted': False}
+    for key, emoji in mine:
+        if emoji in result[key]:
+            result[key][emoji]['user_reacted'] = True
+    return result
+
+
+def _bump_count(db, post_type, post_id, emoji, delta):
+    if delta > 0:
+        db.execute('''
+            INSERT INTO reaction_counts (post_type, post_id, emoji, count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (post_type, post_id, emoji)
+            DO UPDATE SET count = reaction_counts.count + excluded.count
+        ''', (post_type, post_id, emoji, delta))
+    else:
+        db.execute('''
+            UPDATE reaction_counts SET count = count + %s
+            WHERE post_type = %s AND post_id = %s AND emoji = %s
+        ''', (delta, post_type, post_id, emoji))
+
+
+def add_reaction(db, post_type, post_id, user_id, emoji):
+    """Record a reaction and bump its counter
+
+    Returns False if the reaction already existed or the post does not.
+    The caller owns the transaction and commits both writes together.
+    """
+    spec = REACTION_TABLES[post_type]
+    inserted = db.execute(f'''
+        INSERT INTO {spec['table']} ({spec['id_field']}, user_id, emoji)
+        SELECT id, %s, %s FROM {POST_TABLES[post_type]} WHERE id = %s
+        ON CONFLICT ({spec['id_field']}, user_id, emoji) DO NOTHING
+    ''', (user_id, emoji, post_id))
+    if inserted:
+        _bump_count(db, post_type, post_id, emoji, 1)
+    return bool(inserted)
+
+
+def remove_reaction(db, post_type, post_id, user_id, emoji):
+    """Delete a reaction and decrement its counter; returns False if there was none"""
+    spec = REACTION_TABLES[post_type]
+    deleted = db.execute(f'''
+        DELETE FROM {spec['table']}
+        WHERE {spec['id_field']} = %s AND user_id = %s AND emoji = %s
+    ''', (post_id, user_id, emoji))
+    if deleted:
+        _bump_count(db, post_type, post_id, emoji, -deleted)
+    return bool(deleted)
+
+
+def _collect_toggle_rows(rows):
+    """Fold ('count' | 'mine' | 'post') rows from a toggle statement into reactions"""
+    post_exists = True
+    counts = {}
+    mine = set()
+    for row in rows:
+        if row['kind'] == 'post':
+            post_exists = bool(row['count'])
+        elif row['kind'] == 'mine':
+            mine.add(row['emoji'])
+        else:
+            counts[row['emoji']] = row['count']
+    if not post_exists:
+        return None
+    return {
+        emoji: {'count': count, 'user_reacted': emoji in mine}
+        for emoji, count in counts.items()
+    }
+
+
+def react(db, post_type, post_id, user_id, emoji):
+    """Add a reaction and return the post's updated reactions
+
+    On PostgreSQL the existence check, the insert, the counter bump and the
+    read-back are one statement (one round trip). SQLite has no
+    data-modifying CTEs, so there it runs as a few in-process statements in
+    the same transaction. Returns None if the post does not exist.
+    """
+    spec = REACTION_TABLES[post_type]
+    posts = POST_TABLES[post_type]
+
+    if db.dialect != POSTGRESQL:
+        if not add_reaction(db, post_type, post_id, user_id, emoji):
+            if not db.fetchone(f'SELECT id FROM {posts} WHERE id = %s', (post_id,)):
+                return None
+        return load_reactions(db, [(post_type, post_id)], user_id)[post_key(post_type, post_id)]
+
+    # Statements in one query share a snapshot, so the read-back merges the
+    # rows written by the CTEs with what was there before.
+    rows = db.fetchall(f'''
+        WITH post AS (
+            SELECT id FROM {posts} WHERE id = %s
+        ), ins AS (
+            INSERT INTO {spec['table']} ({spec['id_field']}, user_id, emoji)
+            SELECT id, %s, %s FROM post
+            ON CONFLICT ({spec['id_field']}, user_id, emoji) DO NOTHING
+            RETURNING emoji
+        ), bump AS (
+            INSERT INTO reaction_counts (post_type, post_id, emoji, count)
+            SELECT '{post_type}', %s, emoji, 1 FROM ins
+            ON CONFLICT (post_type, post_id, emoji)
+            DO UPDATE SET count = reaction_counts.count + 1
+            RETURNING emoji, count
+        )
+        SELECT 'count' AS kind, emoji, count FROM bump
+        UNION ALL
+        SELECT 'count', emoji, count FROM reaction_counts
+        WHERE post_type = '{post_type}' AND post_id = %s AND count > 0
+          AND emoji NOT IN (SELECT emoji FROM bump)
+        UNION ALL
+        SELECT 'mine', emoji, 0 FROM {spec['table']}
+        WHERE {spec['id_field']} = %s AND user_id = %s
+        UNION ALL
+        SELECT 'mine', emoji, 0 FROM ins
+        UNION ALL
+        SELECT 'post', NULL, COUNT(*) FROM post
+    ''', (post_id, user_id, emoji, post_id, post_id, post_id, user_id))
+    return _collect_toggle_rows(rows)
+
+
+def unreact(db, post_type, post_id, user_id, emoji):
+    """Remove a reaction and return the post's updated reactions
+
+    Same single-statement shape as react() on PostgreSQL.
+    """
+    spec = REACTION_TABLES[post_type]
+
+    if db.dialect != POSTGRESQL:
+        remove_reaction(db, post_type, post_id, user_id, emoji)
+        return load_reactions(db, [(post_type, post_id)], user_id)[post_key(post_type, post_id)]
+
+    rows = db.fetchall(f'''
+        WITH del AS (
+            DELETE FROM {spec['table']}
+            WHERE {spec['id_field']} = %s AND user_id = %s AND emoji = %s
+            RETURNING emoji
+        ), bump AS (
+            UPDATE reaction_counts SET count = count - 1
+            WHERE post_type = '{post_type}' AND post_id = %s
+              AND emoji IN (SELECT emoji FROM del)
+            RETURNING emoji, count
+        )
+        SELECT 'count' AS kind, emoji, count FROM bump WHERE count > 0
+        UNION ALL
+        SELECT 'count', emoji, count FROM reaction_counts
+        WHERE post_type = '{post_type}' AND post_id = %s AND count > 0
+          AND emoji NOT IN (SELECT emoji FROM bump)
+        UNION ALL
+        SELECT 'mine', emoji, 0 FROM {spec['table']}
+        WHERE {spec['id_field']} = %s AND user_id = %s
+          AND emoji NOT IN (SELECT emoji FROM del)
+    ''', (post_id, user_id, emoji, post_id, post_id, post_id, user_id))
+    return _collect_toggle_rows(rows)
+
+
+def delete_post_counts(db, post_type, post_id):
+    """Drop the counters of a deleted post (its raw rows go by ON DELETE CASCADE)"""
+    db.execute('DELETE FROM reaction_counts WHERE post_type = %s AND post_id = %s',
+               (post_type, post_id))
+
+
+def rebuild_reaction_counts(db):
+    """Recompute every counter from the raw reaction rows in one bulk statement
+
+    Returns the number of counter rows written. The caller commits.
+    """
+    db.execute('DELETE FROM reaction_counts')
+    selects = [
+        f'''
+            SELECT '{post_type}', {spec['id_field']}, emoji, COUNT(*)
+            FROM {spec['table']}
+            GROUP BY {spec['id_field']}, emoji
+        '''
+        for post_type, spec in REACTION_TABLES.items()
+    ]
+    return db.execute(
+        'INSERT INTO reaction_counts (post_type, post_id, emoji, count) '
+        + ' UNION ALL '.join(selects)
+    )
@@ -0,0 +1,184 @@
+"""
+Full-text search over job postings and self-introductions
+Text is tokenized in Python (Hangul as character bigrams, other scripts as
+words) and stored in search_index: an FTS5 table on SQLite, a tsvector column
+with a GIN index on PostgreSQL. Posts are indexed when written and removed
+when deleted, so queries never rescan the content tables.
+"""
+import re
+import base64
+import binascii
+from datetime import datetime
+
+from db import POSTGRESQL
+
+# Runs of Hangul syllables/jamo, or runs of other letters and digits
+_HANGUL_RUN = re.compile(r'[ᄀ-ᇿ㄰-㆏가-힣]+')
+_WORD = re.compile(r'[^\W_]+')
+
+# Characters of an indexed post kept for the result list
+SUMMARY_LENGTH = 200
+
+# Post types in a fixed order; on SQLite the position is folded into the rowid
+POST_TYPES = ('job', 'intro')
+
+
+def tokenize(text):
+    """Split text into search tokens
+
+    Hangul has no reliable word boundaries once particles are attached
+    ('서울에서'), so each Hangul run becomes overlapping character bigrams
+    ('서울', '울에', '에서'); a single syllable stays as it is. Other words
+    are lowercased whole.
+    """
+    tokens = []
+    for word in _WORD.findall((text or '').lower()):
+        pos = 0
+        for run in _HANGUL_RUN.finditer(word):
+            if run.start() > pos:
+                tokens.append(word[pos:run.start()])
+            hangul = run.group()
+            if len(hangul) == 1:
+                tokens.append(hangul)
+            else:
+                tokens.extend(hangul[i:i + 2] for i in range(len(hangul) - 1))
+            pos = run.end()
+        if pos < len(word):
+            tokens.append(word[pos:])
+    return tokens
+
+
+def _doc_id(post_type, post_id):
+    # FTS5 only indexes its rowid, so each post maps to a stable rowid
+    return post_id * len(POST_TYPES) + POST_TYPES.index(post_type)
+
+
+def _tokens_text(*fields):
+    return ' '.join(token for field in fields for token in tokenize(field))
+
+
+def index_post(db, post_type, post_id, title, keywords, body, created_at=None):
+    """Add or replace a post's index entry; the caller commits with the post
+
+    `title` and `keywords` are weighted above `body` when ranking.
+    """
+    remove_post(db, post_type, post_id)
+    summary = (body or '')[:SUMMARY_LENGTH]
+    heading = _tokens_text(title, keywords)
+    text = _tokens_text(body)
+    if db.dialect == POSTGRESQL:
+        db.execute('''
+            INSERT INTO search_index (post_type, post_id, title, summary, created_at, document)
+            VALUES (%s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP),
+                    setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B'))
+        ''', (post_type, post_id, title, summary, created_at, heading, text))
+    else:
+        db.execute('''
+            INSERT INTO search_index (rowid, heading, body, post_type, post_id, title, summary, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))
+        ''', (_doc_id(post_type, post_id), heading, text, post_type, post_id, title, summary, created_at))
+
+
+def remove_post(db, post_type, post_id):
+    """Drop a post's index entry"""
+    if db.dialect == POSTGRESQL:
+        db.execute('DELETE FROM search_index WHERE post_type = %s AND post_id = %s',
+                   (post_type, post_id))
+    else:
+        db.execute('DELETE FROM search_index WHERE rowid = %s', (_doc_id(post_type, post_id),))
+
+
+def _encode_cursor(row):
+    raw = f"{row['score']!r}|{row['post_type']}|{row['post_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        score, post_type, post_id = raw.split('|')
+        return float(score), post_type, int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def search(db, query, page_size, after=None, post_type=None):
+    """Ranked matches for `query`, best first, one page at a time
+
+    Every query token must match. Scores are ordered ascending (bm25 on
+    SQLite, negated ts_rank on PostgreSQL) and pages continue from the
+    (score, post_type, post_id) of the previous page's last hit.
+    Returns (hits, next_cursor).
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return [], None
+
+    if db.dialect == POSTGRESQL:
+        matches = '''
+            SELECT post_type, post_id, title, summary, created_at,
+                   -ts_rank(document, plainto_tsquery('simple', %s))::float8 AS score
+            FROM search_index
+            WHERE document @@ plainto_tsquery('simple', %s)
+        '''
+        params = [' '.join(tokens)] * 2
+    else:
+        # Heading matches count ten times as much as body matches
+        matches = '''
+            SELECT post_type, post_id, title, summary, created_at,
+                   bm25(search_index, 10.0, 1.0) AS score
+            FROM search_index
+            WHERE search_index MATCH %s
+        '''
+        params = [' '.join('"' + token.replace('"', '""') + '"' for token in tokens)]
+
+    conditions = []
+    if post_type:
+        conditions.append('post_type = %s')
+        params.append(post_type)
+    cursor = _decode_cursor(after)
+    if cursor:
+        conditions.append('(score, post_type, post_id) > (%s, %s, %s)')
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    rows = db.fetchall(f'''
+        SELECT * FROM ({matches}) AS hits
+        {where}
+        ORDER BY score, post_type, post_id
+        LIMIT %s
+    ''', (*params, page_size + 1))
+    next_cursor = _encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    for row in rows:
+        # FTS5 columns carry no declared type, so timestamps come back as text
+        if isinstance(row['created_at'], str):
+            row['created_at'] = datetime.fromisoformat(row['created_at'])
+    return rows[:page_size], next_cursor
+
+
+def index_intro(db, intro):
+    """Index an introduction from its row (id, name, introduction, created_at)
+
+    Its preferred job and location, where the page that wrote it asked for
+    them, are the keywords.
+    """
+    keywords = ' '.join(value for value in (intro.get('preferred_jobs'), intro.get('preferred_location')) if value)
+    index_post(db, 'intro', intro['id'], intro['name'], keywords, intro['introduction'], intro['created_at'])
+
+
+def rebuild_search_index(db):
+    """Re-index every job and introduction; returns the number of posts indexed"""
+    db.execute('DELETE FROM search_index')
+    count = 0
+    for job in db.fetchall('SELECT id, title, company, description, created_at FROM jobs'):
+        index_post(db, 'job', job['id'], job['title'], job['company'],
+                   job['description'], job['created_at'])
+        count += 1
+    for intro in db.fetchall('''
+        SELECT id, name, preferred_jobs, preferred_location, introduction, created_at FROM introductions
+    '''):
+        index_intro(db, intro)
+        count += 1
+    return count
@@ -1,31 +1,49 @@
 #!/usr/bin/env python3
 """
 Startup script that runs pre-deployment checks before starting the Flask application
+Development runs one autoreloading gunicorn worker; --production (or
+FLASK_ENV=production) uses the preloaded multi-worker profile in
+gunicorn_config.py. gunicorn replaces this process, so signals such as
+SIGHUP (graceful reload) and SIGTERM go straight to its master
 """
 
+import os
 import sys
-import subprocess
+import argparse
 from pre_deploy_check import run_pre_deployment_checks
 
+DEVELOPMENT_COMMAND = ["gunicorn", "--bind", "0.0.0.0:5000", "--reuse-port", "--reload", "main:app"]
+PRODUCTION_COMMAND = ["gunicorn", "--config", "gunicorn_config.py", "main:app"]
+
 def start_application():
     """Start the application with pre-deployment checks"""
-    print("Starting Korean Job Community Platform...")
-    
+    parser = argparse.ArgumentParser(description='Run pre-deployment checks, then start gunicorn')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--production', action='store_true', help='multi-worker profile (default when FLASK_ENV=production)')
+    mode.add_argument('--development', action='store_true', help='single autoreloading worker')
+    args = parser.parse_args()
+
+    production = args.production or (not args.development and os.environ.get('FLASK_ENV') == 'production')
+    if production:
+        # The app picks its configuration from FLASK_ENV
+        os.environ['FLASK_ENV'] = 'production'
+
+    print(f"Starting Korean Job Community Platform ({'production' if production else 'development'})...")
+
     # Run pre-deployment checks
     if not run_pre_deployment_checks():
         print("Failed pre-deployment checks. Exiting...")
         sys.exit(1)
-    
+
     # Start the application with gunicorn
+    cmd = PRODUCTION_COMMAND if production else DEVELOPMENT_COMMAND
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.stdout.flush()
     try:
-        cmd = ["gunicorn", "--bind", "0.0.0.0:5000", "--reuse-port", "--reload", "main:app"]
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
+        os.execvp(cmd[0], cmd)
+    except OSError as e:
         print(f"Failed to start application: {e}")
         sys.exit(1)
-    except KeyboardInterrupt:
-        print("\nApplication stopped by user")
-        sys.exit(0)
 
 if __name__ == "__main__":
-    start_application()
\ No newline at end of file
+    start_application()
@@ -0,0 +1,85 @@
+"""
+Shared fixtures: an app on TestConfig backed by a migrated SQLite file per
+test, a data-access handle inside its app context, and row factories
+"""
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app
+from config import TestConfig
+from db import Database, SQLITE, connect_sqlite
+from extensions import get_db
+from migrations import migrate
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on its own database; keyword arguments override TestConfig"""
+    def build(**overrides):
+        settings = {
+            'SECRET_KEY': 'test',
+            # Every request opens its own connection, so an in-memory database would start empty
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+            **overrides,
+        }
+        app = create_app(type('Config', (TestConfig,), settings))
+        with app.app_context():
+            migrate(get_db())
+        return app
+    return build
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        yield get_db()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """A bare, unmigrated SQLite database"""
+    db = Database(connect_sqlite(str(tmp_path / 'bare.db')), SQLITE)
+    yield db
+    db.conn.close()
+
+
+@pytest.fixture
+def clock():
+    """Distinct, increasing created_at values"""
+    start = datetime(2025, 1, 1, 9, 0)
+    return (start + timedelta(minutes=minute) for minute in itertools.count())
+
+
+@pytest.fixture
+def make_job(db, clock):
+    def insert(title='이사 도우미 구합니다', description='서울에서 이사 작업을 도와주실 분', company='무빙브릿지', created_at=None):
+        return db.fetchval('''
+            INSERT INTO jobs (title, company, contact, description, created_at)
+            VALUES (%s, %s, %s, %s, %s) RETURNING id
+        ''', (title, company, '010-0000-0000', description, created_at or next(clock)))
+    return insert
+
+
+@pytest.fixture
+def make_intro(db, clock):
+    def insert(name='Nguyen', nationality='vietnam', languages=('Korean',), korean_fluent=True,
+               introduction='성실하게 일하겠습니다', preferred_jobs='moving', created_at=None):
+        return db.fetchval('''
+            INSERT INTO introductions (name, nationality, languages, korean_fluent,
+                                       introduction, preferred_jobs, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (name, nationality, ','.join(languages), korean_fluent, introduction, preferred_jobs,
+              created_at or next(clock)))
+    return insert
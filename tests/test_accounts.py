@@ -0,0 +1,46 @@
+from accounts import AccountAvailability, BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(5000, error_rate=0.01)
+    members = [f'username:user{n}' for n in range(5000)]
+    for key in members:
+        bloom.add(key)
+    assert all(key in bloom for key in members)
+
+    false_positives = sum(f'username:other{n}' in bloom for n in range(20000))
+    assert false_positives < 20000 * 0.03
+
+
+def test_overfilled_bloom_filter_still_has_no_false_negatives():
+    bloom = BloomFilter(10)
+    members = [f'email:{n}@example.com' for n in range(2000)]
+    for key in members:
+        bloom.add(key)
+    assert all(key in bloom for key in members)
+
+
+def test_username_availability(db):
+    db.execute("INSERT INTO users (username, email, password_hash) VALUES ('Minh', 'minh@example.com', 'x')")
+    db.execute('''
+        INSERT INTO companies (company_name, username, business_number, ceo_name, contact_number,
+                               email, password_hash, address)
+        VALUES ('무빙', 'moving', '123-45-67890', '김', '010', 'co@example.com', 'x', '서울')
+    ''')
+    db.commit()
+    availability = AccountAvailability()
+
+    assert not availability.username_available(db, 'minh')
+    assert not availability.username_available(db, 'MOVING')
+    assert availability.username_available(db, 'someone')
+    assert availability.taken(db, username='someone', email='MINH@example.com') == {'email'}
+
+
+def test_accounts_created_after_the_filter_was_built(db):
+    availability = AccountAvailability(ttl=3600)
+    assert availability.username_available(db, 'late')
+
+    db.execute("INSERT INTO users (username, email, password_hash) VALUES ('late', 'late@example.com', 'x')")
+    db.commit()
+    availability.remember(username='late', email='late@example.com')
+    assert not availability.username_available(db, 'late')
@@ -0,0 +1,26 @@
+from db import POSTGRESQL, SQLITE, normalize_sql
+
+
+def test_placeholders_become_question_marks_on_sqlite():
+    sql = 'SELECT * FROM jobs WHERE id = %s AND title = %s'
+    assert normalize_sql(sql, SQLITE) == 'SELECT * FROM jobs WHERE id = ? AND title = ?'
+    assert normalize_sql(sql, POSTGRESQL) == sql
+
+
+def test_whitespace_is_collapsed_outside_literals():
+    sql = '''
+        SELECT id,   title
+        FROM jobs
+        WHERE title = '두  칸'
+    '''
+    assert normalize_sql(sql, SQLITE) == "SELECT id, title FROM jobs WHERE title = '두  칸'"
+
+
+def test_literals_keep_placeholder_text():
+    assert normalize_sql("SELECT '%s', %s", SQLITE) == "SELECT '%s', ?"
+
+
+def test_escaped_percent():
+    sql = "SELECT * FROM jobs WHERE title LIKE '서울%%' AND id %% 2 = %s"
+    assert normalize_sql(sql, SQLITE) == "SELECT * FROM jobs WHERE title LIKE '서울%' AND id % 2 = ?"
+    assert normalize_sql(sql, POSTGRESQL) == sql
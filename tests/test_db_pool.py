@@ -0,0 +1,150 @@
+import os
+import types
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+import db_pool
+
+
+class FakeConnection:
+    """Enough of a psycopg2 connection for the pool; `broken` makes queries fail"""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        if self.conn.broken:
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Connections opened by the pool, in order"""
+    opened = []
+
+    def connect(dsn, cursor_factory=None):
+        opened.append(FakeConnection())
+        return opened[-1]
+    monkeypatch.setattr(db_pool.psycopg2, 'connect', connect)
+    monkeypatch.setattr(db_pool, '_pool', None)
+    return opened
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """Pool clock in seconds; advance with now[0] += n"""
+    current = [1000.0]
+    monkeypatch.setattr(db_pool, 'time', types.SimpleNamespace(monotonic=lambda: current[0]))
+    return current
+
+
+def test_healthy_connection_is_reused(connections):
+    pool = db_pool.ConnectionPool('dsn', min_size=1, max_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert len(connections) == 1
+
+
+def test_pre_ping_replaces_dead_connection(connections):
+    pool = db_pool.ConnectionPool('dsn', min_size=1, max_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.broken = True
+
+    replacement = pool.getconn()
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()['failed_pings'] == 1
+
+
+def test_without_pre_ping_dead_connection_is_handed_out(connections):
+    pool = db_pool.ConnectionPool('dsn', min_size=1, max_size=2, pre_ping=False)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.broken = True
+    assert pool.getconn() is conn
+
+
+def test_old_connections_are_recycled(connections, now):
+    pool = db_pool.ConnectionPool('dsn', min_size=1, max_size=2, recycle=300)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    now[0] += 299
+    assert pool.getconn() is conn
+    pool.putconn(conn)
+
+    now[0] += 2
+    assert pool.getconn() is not conn
+    assert conn.closed
+    assert pool.stats()['recycled'] == 1
+
+
+def test_checkout_times_out_when_exhausted(connections):
+    pool = db_pool.ConnectionPool('dsn', min_size=0, max_size=1, timeout=0.01)
+    pool.getconn()
+    with pytest.raises(db_pool.PoolTimeout):
+        pool.getconn()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_discarded_connection_frees_its_slot(connections):
+    pool = db_pool.ConnectionPool('dsn', min_size=0, max_size=1, timeout=0.01)
+    conn = pool.getconn()
+    pool.putconn(conn, discard=True)
+    assert conn.closed
+    assert pool.getconn() is not conn
+
+
+def test_pool_from_another_process_is_replaced(connections):
+    pool = db_pool.get_pool('dsn', min_size=0)
+    assert db_pool.get_pool('dsn', min_size=0) is pool
+
+    pool.pid = -1
+    assert db_pool.get_pool('dsn', min_size=0) is not pool
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_fork_drops_inherited_pool(connections):
+    pool = db_pool.get_pool('dsn', min_size=1)
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: the inherited pool is gone and its connection untouched
+        ok = db_pool._pool is None and db_pool.get_pool('dsn', min_size=0) is not pool
+        ok = ok and not connections[0].closed
+        os.write(write_end, b'1' if ok else b'0')
+        os._exit(0)
+    os.close(write_end)
+    result = os.read(read_end, 1)
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert result == b'1'
+    assert db_pool.get_pool('dsn', min_size=0) is pool
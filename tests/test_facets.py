@@ -0,0 +1,79 @@
+import re
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import facets
+from pagination import fetch_page
+
+
+@pytest.fixture
+def intros(db, make_intro):
+    """Three introductions with their language rows, by name"""
+    people = {
+        'Anh': dict(nationality='vietnam', korean_fluent=True, languages=('Korean', 'English')),
+        'Binh': dict(nationality='vietnam', korean_fluent=False, languages=('English',)),
+        'Chen': dict(nationality='china', korean_fluent=True, languages=('Korean', 'Chinese')),
+    }
+    ids = {}
+    for name, fields in people.items():
+        ids[name] = make_intro(name=name, **fields)
+        facets.store_values(db, 'language', ids[name], fields['languages'])
+    db.commit()
+    return ids
+
+
+def matching_names(db, filters):
+    where, params = facets.filter_clause(filters)
+    page = fetch_page(db, 'introductions', 'id, name, created_at', 10, where=where, params=params)
+    return sorted(row['name'] for row in page.items)
+
+
+def test_parse_filters():
+    args = MultiDict([('nationality', 'vietnam'), ('nationality', 'vietnam'), ('korean', 'maybe'),
+                      ('language', 'Korean'), ('language', ''), ('unknown', 'x')])
+    assert facets.parse_filters(args) == {'nationality': ['vietnam'], 'language': ['Korean']}
+
+
+def test_filters_combine(db, intros):
+    assert matching_names(db, {}) == ['Anh', 'Binh', 'Chen']
+    assert matching_names(db, {'nationality': ['vietnam', 'china'], 'korean': ['yes']}) == ['Anh', 'Chen']
+    # Multi-valued facets need every value
+    assert matching_names(db, {'language': ['Korean', 'English']}) == ['Anh']
+    assert matching_names(db, {'nationality': ['china'], 'language': ['English']}) == []
+
+
+def test_facet_counts_follow_filters(db, intros):
+    counts = facets.facet_counts(db, {'nationality': ['vietnam']})
+    assert counts['total'] == 2
+    assert counts['nationality'] == {'vietnam': 2}
+    assert counts['korean'] == {'yes': 1, 'no': 1}
+    assert counts['language'] == {'Korean': 1, 'English': 2}
+
+    assert facets.facet_counts(db, {})['language'] == {'Korean': 2, 'English': 2, 'Chinese': 1}
+
+
+def test_store_values_replaces_rows(db, intros):
+    facets.store_values(db, 'language', intros['Binh'], ['Korean', 'Korean'])
+    db.commit()
+    assert matching_names(db, {'language': ['Korean']}) == ['Anh', 'Binh', 'Chen']
+    assert matching_names(db, {'language': ['English']}) == ['Anh']
+
+
+def page_links(html):
+    return re.findall(r'href="([^"]*(?:after|before)=[^"]*)"', html)
+
+
+def test_list_pages_keep_filters(make_app, intros):
+    # Same database as `intros`, one row per page
+    client = make_app(PAGE_SIZE=1).test_client()
+
+    html = client.get('/intro?nationality=vietnam').get_data(as_text=True)
+    assert 'Chen' not in html
+    assert page_links(html) and all('nationality=vietnam' in link for link in page_links(html))
+
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    html = client.get('/admin/intros?nationality=vietnam').get_data(as_text=True)
+    assert 'Chen' not in html
+    assert page_links(html) and all('nationality=vietnam' in link for link in page_links(html))
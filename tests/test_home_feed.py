@@ -0,0 +1,99 @@
+import pytest
+
+import home_feed
+from home_feed import FeedCache, load_feed_sections
+
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    """Sections asked of load_feed_sections, one list per call"""
+    calls = []
+    load = home_feed.load_feed_sections
+
+    def counted(db, sections, limit):
+        calls.append(sorted(sections))
+        return load(db, sections, limit)
+    monkeypatch.setattr(home_feed, 'load_feed_sections', counted)
+    return calls
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(home_feed.time, 'monotonic', lambda: clock[0])
+    return clock
+
+
+def test_sections_are_newest_first_and_limited(db, make_job, make_intro):
+    jobs = [make_job(title=f'공고 {n}') for n in range(4)]
+    make_intro(name='Minh')
+    db.commit()
+
+    feed = load_feed_sections(db, ['jobs', 'intros', 'notices'], limit=3)
+    assert [job['id'] for job in feed['jobs']] == jobs[:0:-1]
+    assert feed['jobs'][0]['title'] == '공고 3' and feed['jobs'][0]['company'] == '무빙브릿지'
+    assert [intro['name'] for intro in feed['intros']] == ['Minh']
+    assert feed['notices'] == []
+    assert load_feed_sections(db, [], limit=3) == {}
+
+
+def test_cache_serves_until_the_ttl(db, make_job, queries, now):
+    make_job(title='첫 공고')
+    db.commit()
+    cache = FeedCache(ttl=30)
+
+    assert cache.get(db)['jobs'][0]['title'] == '첫 공고'
+    assert queries == [sorted(home_feed.FEED_SECTIONS)]
+    make_job(title='둘째 공고')
+    db.commit()
+    now[0] += 29
+    assert cache.get(db)['jobs'][0]['title'] == '첫 공고'
+    assert len(queries) == 1
+
+    now[0] += 2
+    assert cache.get(db)['jobs'][0]['title'] == '둘째 공고'
+    assert len(queries) == 2
+
+
+def test_invalidation_rebuilds_only_that_section(db, make_job, queries, now):
+    cache = FeedCache(ttl=30)
+    cache.get(db)
+    make_job(title='새 공고')
+    db.commit()
+
+    cache.invalidate('jobs')
+    assert cache.get(db)['jobs'][0]['title'] == '새 공고'
+    assert queries[-1] == ['jobs']
+    cache.invalidate()
+    cache.get(db)
+    assert queries[-1] == sorted(home_feed.FEED_SECTIONS)
+
+
+def test_rebuild_that_raced_a_write_is_not_kept(db, make_job, monkeypatch, now):
+    cache = FeedCache(ttl=30)
+    load = home_feed.load_feed_sections
+
+    def racing(db, sections, limit):
+        feed = load(db, sections, limit)
+        # A write commits and invalidates while the old rows are in hand
+        make_job(title='경합 공고')
+        db.commit()
+        cache.invalidate('jobs')
+        return feed
+    monkeypatch.setattr(home_feed, 'load_feed_sections', racing)
+    assert cache.get(db)['jobs'] == []
+
+    monkeypatch.setattr(home_feed, 'load_feed_sections', load)
+    assert cache.get(db)['jobs'][0]['title'] == '경합 공고'
+
+
+def test_home_page_shows_a_new_job_at_once(client, db, make_job):
+    client.get('/')
+    make_job(title='방금 올린 공고')
+    db.commit()
+    assert '방금 올린 공고' not in client.get('/').get_data(as_text=True)
+
+    with client.application.test_request_context():
+        from extensions import content_changed
+        content_changed('jobs')
+    assert '방금 올린 공고' in client.get('/').get_data(as_text=True)
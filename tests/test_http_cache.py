@@ -0,0 +1,58 @@
+from http_cache import bump_content_version, get_content_version
+
+
+def test_list_page_revalidates_until_a_write(client, db, make_job):
+    make_job()
+    bump_content_version(db, 'jobs')
+    db.commit()
+
+    first = client.get('/job')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'].startswith('public')
+    assert first.last_modified is not None
+
+    assert client.get('/job', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/job', headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+
+    make_job(title='새 공고')
+    bump_content_version(db, 'jobs')
+    db.commit()
+    changed = client.get('/job', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert '새 공고' in changed.get_data(as_text=True)
+
+
+def test_etag_differs_per_page_and_viewer(client, db, make_job):
+    make_job()
+    db.commit()
+    anonymous = client.get('/job').headers['ETag']
+    assert client.get('/job?after=x').headers['ETag'] != anonymous
+
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['user_type'] = 'worker'
+    response = client.get('/job', headers={'If-None-Match': anonymous})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_detail_page_changes_with_its_reactions(client, db, make_job):
+    job_id = make_job()
+    db.commit()
+    etag = client.get(f'/job/{job_id}').headers['ETag']
+    assert client.get(f'/job/{job_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    db.execute("INSERT INTO reaction_counts (post_type, post_id, emoji, count) VALUES ('job', %s, '👍', 1)", (job_id,))
+    db.commit()
+    assert client.get(f'/job/{job_id}', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_content_versions_count_writes(db):
+    assert get_content_version(db, 'jobs') == {'version': 0, 'updated_at': None}
+    bump_content_version(db, 'jobs')
+    bump_content_version(db, 'jobs')
+    db.commit()
+    version = get_content_version(db, 'jobs')
+    assert version['version'] == 2 and version['updated_at'] is not None
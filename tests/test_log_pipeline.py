@@ -0,0 +1,86 @@
+import sys
+import json
+import queue
+import logging
+
+import pytest
+
+import log_pipeline
+from log_pipeline import (JsonFormatter, NonBlockingQueueHandler, RequestIdFilter, SamplingFilter,
+                          TextFormatter)
+
+
+def record(level=logging.DEBUG, msg='loaded %s', args=('jobs',), lineno=10, exc_info=None):
+    return logging.LogRecord('movingbridge', level, 'posts.py', lineno, msg, args, exc_info)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(log_pipeline.time, 'monotonic', lambda: clock[0])
+    return clock
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    handler.handle(record())
+    handler.handle(record())
+    assert handler.queue.qsize() == 1 and handler.dropped == 1
+
+
+def test_records_are_rendered_before_queueing():
+    handler = NonBlockingQueueHandler(queue.Queue(10))
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        handler.handle(record(level=logging.ERROR, msg='failed %s', exc_info=sys.exc_info()))
+    queued = handler.queue.get_nowait()
+    assert queued.msg == 'failed jobs' and queued.args is None
+    assert queued.exc_info is None and 'ValueError: boom' in queued.exc_text
+
+
+def test_debug_records_are_sampled_per_call_site(now):
+    sampler = SamplingFilter(per_second=2)
+    assert [sampler.filter(record()) for _ in range(5)] == [True, True, False, False, False]
+    # Other call sites and higher levels have their own budget or none
+    assert sampler.filter(record(lineno=20))
+    assert sampler.filter(record(level=logging.INFO))
+    assert sampler.sampled_out == 3
+
+    now[0] += 0.5
+    passed = record()
+    assert sampler.filter(passed) and passed.sampled_out == 3
+    assert not sampler.filter(record())
+
+
+def test_sampling_can_be_turned_off(now):
+    sampler = SamplingFilter(per_second=0)
+    assert all(sampler.filter(record()) for _ in range(100))
+
+
+def test_formatters_report_skipped_records():
+    sampled = record()
+    sampled.request_id = 'abc'
+    sampled.sampled_out = 4
+    assert TextFormatter().format(sampled).endswith('[abc] loaded jobs (4 similar records skipped)')
+
+    entry = json.loads(JsonFormatter().format(sampled))
+    assert entry['message'] == 'loaded jobs' and entry['request_id'] == 'abc'
+    assert entry['level'] == 'DEBUG' and entry['sampled_out'] == 4
+
+
+def test_request_ids(app, client):
+    response = client.get('/', headers={'X-Request-ID': 'proxy-123.a_b'})
+    assert response.headers['X-Request-ID'] == 'proxy-123.a_b'
+    for bad in ('has space', 'x' * 65, ''):
+        generated = client.get('/', headers={'X-Request-ID': bad}).headers['X-Request-ID']
+        assert generated != bad and len(generated) == 32
+
+    with app.test_request_context(headers={'X-Request-ID': 'req-1'}):
+        app.preprocess_request()
+        stamped = record()
+        RequestIdFilter().filter(stamped)
+        assert stamped.request_id == 'req-1'
+    outside = record()
+    RequestIdFilter().filter(outside)
+    assert outside.request_id == '-'
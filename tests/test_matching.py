@@ -0,0 +1,173 @@
+import pytest
+
+import matching
+from http_cache import bump_content_version
+from matching import MatchEngine, _Profiles
+
+VOCABULARIES = {
+    'job': ['moving', 'factory'],
+    'location': ['seoul', 'busan'],
+    'language': ['Korean', 'English'],
+    'start': ['immediate', 'month'],
+    'hours': ['day', 'night'],
+}
+
+WORKER = {
+    'preferred_jobs': 'moving', 'preferred_location': 'seoul', 'languages': 'Korean',
+    'korean_fluent': True, 'availability': 'immediate', 'work_hours': 'day',
+    'housing_preference': None,
+}
+
+
+@pytest.fixture
+def add_intro(db, make_intro):
+    def insert(**profile):
+        profile = {**WORKER, **profile}
+        intro_id = make_intro(languages=profile['languages'].split(','),
+                              korean_fluent=profile['korean_fluent'])
+        db.execute('''
+            UPDATE introductions SET preferred_jobs = %s, preferred_location = %s,
+                availability = %s, work_hours = %s, housing_preference = %s
+            WHERE id = %s
+        ''', (profile['preferred_jobs'], profile['preferred_location'], profile['availability'],
+              profile['work_hours'], profile['housing_preference'], intro_id))
+        return intro_id
+    return insert
+
+
+@pytest.fixture
+def add_job(db, make_job):
+    def insert(job_type='moving', location='seoul', languages='Korean', korean_required=True,
+               availability='immediate', work_hours='day', housing_provided=False):
+        job_id = make_job()
+        db.execute('''
+            UPDATE jobs SET job_type = %s, location = %s, languages = %s, korean_required = %s,
+                availability = %s, work_hours = %s, housing_provided = %s
+            WHERE id = %s
+        ''', (job_type, location, languages, korean_required, availability, work_hours,
+              housing_provided, job_id))
+        return job_id
+    return insert
+
+
+def ids(hits):
+    return [post_id for post_id, _ in hits]
+
+
+def test_top_workers_and_top_jobs(db, add_intro, add_job):
+    exact = add_intro()
+    other_city = add_intro(preferred_location='busan')
+    anywhere = add_intro(preferred_location='anywhere')
+    unrelated = add_intro(preferred_jobs='factory', preferred_location='busan', languages='English',
+                          korean_fluent=False, availability='month', work_hours='night')
+    job_id = add_job()
+    factory = add_job(job_type='factory', location='busan', korean_required=False)
+    db.commit()
+    engine = MatchEngine(VOCABULARIES)
+
+    hits = engine.top_workers(db, job_id, k=10)
+    # 'anywhere' agrees with Seoul, so it ties with the exact match and comes first as the newer post
+    assert hits == [(anywhere, 1.0), (exact, 1.0), (other_city, 0.8)]
+    assert unrelated not in ids(hits)
+    assert ids(engine.top_workers(db, job_id, k=1)) == [anywhere]
+
+    assert ids(engine.top_jobs(db, exact, k=10)) == [job_id, factory]
+    assert ids(engine.top_jobs(db, unrelated, k=10)) == [factory]
+    assert engine.top_workers(db, 999) is None
+
+
+def test_ties_are_cut_by_newest_id():
+    profiles = _Profiles(2)
+    for post_id, vector in [(1, [1, 0]), (2, [1, 0]), (3, [0, 1]), (4, [1, 0]), (5, [0, 0])]:
+        profiles.upsert(post_id, matching.np.asarray(vector, dtype=matching.np.float32))
+    query = matching.np.asarray([2, 1], dtype=matching.np.float32)
+
+    assert profiles.top(query, 2) == [(4, 2.0), (2, 2.0)]
+    # Rows scoring nothing are left out even when k allows them
+    assert profiles.top(query, 10) == [(4, 2.0), (2, 2.0), (1, 2.0), (3, 1.0)]
+    assert profiles.top(query, 0) == []
+
+
+def test_remove_moves_the_last_row_into_the_hole():
+    profiles = _Profiles(1)
+    for post_id in range(1, 21):
+        profiles.upsert(post_id, matching.np.asarray([post_id], dtype=matching.np.float32))
+    profiles.remove(3)
+    profiles.remove(3)
+    profiles.upsert(20, matching.np.asarray([100], dtype=matching.np.float32))
+
+    assert profiles.count == 19 and profiles.positions[20] == 2
+    assert all(int(profiles.ids[position]) == post_id for post_id, position in profiles.positions.items())
+    query = matching.np.asarray([1], dtype=matching.np.float32)
+    assert profiles.top(query, 3) == [(20, 100.0), (19, 19.0), (18, 18.0)]
+
+
+def test_refresh_applies_this_process_writes(db, add_intro, add_job):
+    first = add_intro()
+    job_id = add_job()
+    db.commit()
+    engine = MatchEngine(VOCABULARIES, refresh_interval=3600)
+    assert ids(engine.top_workers(db, job_id)) == [first]
+
+    second = add_intro()
+    bump_content_version(db, 'introductions', second)
+    db.commit()
+    engine.refresh(db, 'intro', second)
+    db.execute('DELETE FROM introductions WHERE id = %s', (first,))
+    bump_content_version(db, 'introductions', first)
+    db.commit()
+    engine.refresh(db, 'intro', first)
+
+    # Both writes were this process's own, so nothing is left to catch up on
+    assert engine._sides['intro'].version == 2
+    assert ids(engine.top_workers(db, job_id)) == [second]
+
+
+def test_other_processes_writes_are_caught_up_row_by_row(db, add_intro, add_job, monkeypatch):
+    first = add_intro()
+    job_id = add_job()
+    db.commit()
+    engine = MatchEngine(VOCABULARIES, refresh_interval=3600)
+    assert ids(engine.top_workers(db, job_id)) == [first]
+    monkeypatch.setattr(engine, '_load', lambda *args: pytest.fail('reloaded the whole table'))
+
+    # Written by another worker: logged, but never passed to this engine's refresh()
+    second = add_intro()
+    bump_content_version(db, 'introductions', second)
+    db.execute("UPDATE introductions SET preferred_jobs = 'factory' WHERE id = %s", (first,))
+    bump_content_version(db, 'introductions', first)
+    db.commit()
+    assert ids(engine.top_workers(db, job_id)) == [second, first]
+    assert dict(engine.top_workers(db, job_id))[first] < 1.0
+
+
+def test_unlogged_writes_reload_after_the_interval(db, add_intro, add_job):
+    add_intro()
+    job_id = add_job()
+    db.commit()
+    engine = MatchEngine(VOCABULARIES, refresh_interval=3600)
+    engine.top_workers(db, job_id)
+
+    # Bulk loads bump the version without logging ids
+    bulk = add_intro()
+    bump_content_version(db, 'introductions')
+    db.commit()
+    assert bulk not in ids(engine.top_workers(db, job_id))
+    engine.refresh_interval = 0
+    assert bulk in ids(engine.top_workers(db, job_id))
+
+
+def test_without_numpy_the_scores_are_the_same(db, add_intro, add_job, monkeypatch):
+    for location in ('seoul', 'busan', 'anywhere', 'seoul'):
+        add_intro(preferred_location=location)
+    add_intro(preferred_jobs='factory', korean_fluent=False)
+    job_id = add_job(housing_provided=True)
+    db.commit()
+    expected = MatchEngine(VOCABULARIES).top_workers(db, job_id, k=3)
+
+    monkeypatch.setattr(matching, 'np', None)
+    engine = MatchEngine(VOCABULARIES)
+    hits = engine.top_workers(db, job_id, k=3)
+    assert ids(hits) == ids(expected)
+    assert [score for _, score in hits] == pytest.approx([score for _, score in expected])
+    assert isinstance(engine._sides['intro'].profiles.matrix, list)
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import metrics
+from metrics import Histogram, Registry
+
+LATENCY = 'movingbridge_http_request_duration_seconds'
+RESPONSES = 'movingbridge_http_responses_total'
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for value in (0.05, 0.1, 0.3, 0.7, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5 and histogram.total == pytest.approx(4.15)
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.6) == 0.5
+    assert histogram.quantile(0.99) == float('inf')
+    assert Histogram((0.1,)).quantile(0.5) is None
+
+
+def test_merge_adds_snapshots_together():
+    first, second = Registry(), Registry()
+    first.observe(LATENCY, ('posts.index', 'GET'), 0.02)
+    first.inc(RESPONSES, ('posts.index', 'GET', '200'))
+    second.observe(LATENCY, ('posts.index', 'GET'), 2.0)
+    second.inc(RESPONSES, ('posts.index', 'GET', '200'), 3)
+    second.inc(RESPONSES, ('posts.index', 'GET', '304'))
+
+    merged = Registry()
+    merged.merge(first.snapshot())
+    # Through JSON, as the dump files are read
+    merged.merge(json.loads(json.dumps(second.snapshot())))
+    merged.merge({'series': [{'name': 'unknown_metric', 'labels': [], 'value': 1}]})
+
+    values = {(name, labels): value for name, labels, value in merged.series()}
+    assert values[(RESPONSES, ('posts.index', 'GET', '200'))] == 4
+    assert values[(RESPONSES, ('posts.index', 'GET', '304'))] == 1
+    latency = values[(LATENCY, ('posts.index', 'GET'))]
+    assert latency.count == 2 and latency.total == pytest.approx(2.02)
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    registry.observe(LATENCY, ('posts.index', 'GET'), 0.02)
+    registry.inc(RESPONSES, ('posts.index', 'GET', '200'))
+    text = registry.render()
+
+    assert '# TYPE movingbridge_http_request_duration_seconds histogram' in text
+    assert 'movingbridge_http_request_duration_seconds_bucket{endpoint="posts.index",method="GET",le="0.01"} 0' in text
+    assert 'movingbridge_http_request_duration_seconds_bucket{endpoint="posts.index",method="GET",le="0.025"} 1' in text
+    assert 'movingbridge_http_request_duration_seconds_bucket{endpoint="posts.index",method="GET",le="+Inf"} 1' in text
+    assert 'movingbridge_http_request_duration_seconds_count{endpoint="posts.index",method="GET"} 1' in text
+    assert 'movingbridge_http_responses_total{endpoint="posts.index",method="GET",status="200"} 1' in text
+
+
+def test_requests_are_counted_with_their_queries(client):
+    client.get('/job')
+    values = {(name, labels): value for name, labels, value in metrics.registry.series()}
+    assert values[(RESPONSES, ('posts.job_list', 'GET', '200'))] == 1
+    assert values[('movingbridge_db_queries_per_request', ('posts.job_list',))].total >= 1
+    assert values[('movingbridge_template_seconds_per_request', ('posts.job_list',))].total > 0
+
+
+def test_metrics_endpoint_needs_admin_or_token(make_app):
+    app = make_app(METRICS_TOKEN='scrape-token')
+    client = app.test_client()
+
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    assert client.get('/metrics').status_code == 200
+
+
+def test_metrics_endpoint_merges_other_workers_dumps(make_app, tmp_path):
+    dump_path = str(tmp_path / 'metrics-{pid}.json')
+    other = Registry()
+    other.inc(RESPONSES, ('posts.index', 'GET', '200'), 5)
+    with open(dump_path.format(pid=1), 'w') as f:
+        json.dump(other.snapshot(), f)
+    (tmp_path / 'metrics-2.json').write_text('{not json')
+
+    app = make_app(METRICS_DUMP_PATH=dump_path, METRICS_DUMP_INTERVAL=3600)
+    client = app.test_client()
+    client.get('/')
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    text = client.get('/metrics').get_data(as_text=True)
+
+    # This process's live request plus the other worker's five
+    assert 'movingbridge_http_responses_total{endpoint="posts.index",method="GET",status="200"} 6' in text
@@ -0,0 +1,89 @@
+import pytest
+
+import migrations
+from migrations import MIGRATIONS, applied_versions, migrate
+
+LATEST = [version for version, _, _ in MIGRATIONS]
+
+
+def tables(db):
+    return {row['name'] for row in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def columns(db, table):
+    return {row['name'] for row in db.fetchall(f'PRAGMA table_info({table})')}
+
+
+def test_fresh_database_gets_every_migration_once(sqlite_db):
+    assert migrate(sqlite_db) == LATEST
+    assert applied_versions(sqlite_db) == set(LATEST)
+    assert {'jobs', 'introductions', 'reaction_counts', 'content_versions', 'search_index'} <= tables(sqlite_db)
+    assert migrate(sqlite_db) == []
+
+
+def test_target_stops_early(sqlite_db):
+    assert migrate(sqlite_db, target=2) == [1, 2]
+    assert 'content_versions' not in tables(sqlite_db)
+    assert migrate(sqlite_db) == LATEST[2:]
+
+
+def test_failed_migration_is_rolled_back(sqlite_db, monkeypatch):
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [
+        (99, 'broken', ['CREATE TABLE half_done (id INTEGER)', 'SELECT * FROM no_such_table']),
+    ])
+    with pytest.raises(Exception, match='no_such_table'):
+        migrate(sqlite_db)
+
+    # Earlier migrations stay applied; none of the broken one's DDL survives
+    assert applied_versions(sqlite_db) == set(LATEST)
+    assert 'half_done' not in tables(sqlite_db)
+    assert sqlite_db.conn.isolation_level == ''
+
+
+def test_legacy_tables_gain_missing_columns(sqlite_db):
+    # Shape of the tables the old database_setup.py created
+    sqlite_db.execute('''CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL, password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    sqlite_db.execute('''CREATE TABLE introductions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, nationality TEXT NOT NULL,
+        languages TEXT NOT NULL, youtube_link TEXT, introduction TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    sqlite_db.execute("INSERT INTO users (username, email, password) VALUES ('minh', 'minh@example.com', 'pbkdf2:old')")
+    sqlite_db.execute('''INSERT INTO introductions (name, nationality, languages, introduction)
+                         VALUES ('Minh', 'vietnam', 'Korean,English', '안녕하세요')''')
+    sqlite_db.commit()
+
+    assert migrate(sqlite_db) == LATEST
+    assert {'user_id', 'korean_fluent', 'step_completed', 'licenses'} <= columns(sqlite_db, 'introductions')
+    assert sqlite_db.fetchone('SELECT password_hash FROM users')['password_hash'] == 'pbkdf2:old'
+    assert sqlite_db.fetchone('SELECT step_completed FROM introductions')['step_completed'] == 1
+    assert {row['language'] for row in sqlite_db.fetchall('SELECT language FROM introduction_languages')} == {'Korean', 'English'}
+
+
+def test_legacy_tables_that_cannot_be_upgraded_are_refused(sqlite_db):
+    # The old init_dev_db.py named this column author_name
+    sqlite_db.execute('''CREATE TABLE forum_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT NOT NULL,
+        author_name TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    sqlite_db.commit()
+
+    with pytest.raises(RuntimeError, match='forum_posts.author'):
+        migrate(sqlite_db)
+    assert applied_versions(sqlite_db) == set()
+    assert 'jobs' not in tables(sqlite_db)
+
+
+def test_job_profile_columns_the_table_already_has_are_kept(sqlite_db):
+    # The old init_dev_db.py jobs table, with the columns migration 1 needs added by hand
+    sqlite_db.execute('''CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT NOT NULL,
+        location TEXT NOT NULL, job_type TEXT NOT NULL, company TEXT NOT NULL DEFAULT '',
+        contact TEXT NOT NULL DEFAULT '', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    sqlite_db.execute("INSERT INTO jobs (title, description, location, job_type) VALUES ('이사', '서울', 'seoul', 'moving')")
+    sqlite_db.commit()
+
+    assert migrate(sqlite_db) == LATEST
+    assert {'job_type', 'location', 'languages', 'korean_required', 'housing_provided'} <= columns(sqlite_db, 'jobs')
+    assert sqlite_db.fetchone('SELECT location, job_type FROM jobs') == {'location': 'seoul', 'job_type': 'moving'}
@@ -0,0 +1,83 @@
+import re
+from datetime import datetime
+from html import unescape
+
+from pagination import decode_cursor, encode_cursor, fetch_page
+
+
+def page_ids(page):
+    return [row['id'] for row in page.items]
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor({'created_at': created_at, 'id': 42})
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_malformed_cursors_are_ignored():
+    for cursor in (None, '', 'not base64!', 'aGVsbG8', encode_cursor({'created_at': datetime(2025, 1, 1), 'id': 1})[:-3]):
+        assert decode_cursor(cursor) is None
+
+
+def test_pages_walk_forward_and_back(db, make_job):
+    ids = [make_job(title=f'공고 {n}') for n in range(5)]
+    newest_first = ids[::-1]
+
+    first = fetch_page(db, 'jobs', 'id, created_at', 2)
+    assert page_ids(first) == newest_first[:2]
+    assert not first.has_prev and first.has_next
+
+    second = fetch_page(db, 'jobs', 'id, created_at', 2, after=first.next_cursor)
+    assert page_ids(second) == newest_first[2:4]
+    assert second.has_prev and second.has_next
+
+    last = fetch_page(db, 'jobs', 'id, created_at', 2, after=second.next_cursor)
+    assert page_ids(last) == newest_first[4:]
+    assert last.has_prev and not last.has_next
+
+    back = fetch_page(db, 'jobs', 'id, created_at', 2, before=last.prev_cursor)
+    assert page_ids(back) == newest_first[2:4]
+    assert back.has_prev and back.has_next
+
+    start = fetch_page(db, 'jobs', 'id, created_at', 2, before=back.prev_cursor)
+    assert page_ids(start) == newest_first[:2]
+    assert not start.has_prev
+
+
+def test_rows_sharing_a_timestamp_are_split_by_id(db, make_job):
+    same = datetime(2025, 2, 1, 10, 0)
+    ids = [make_job(created_at=same) for _ in range(3)]
+
+    first = fetch_page(db, 'jobs', 'id, created_at', 2)
+    rest = fetch_page(db, 'jobs', 'id, created_at', 2, after=first.next_cursor)
+    assert page_ids(first) + page_ids(rest) == ids[::-1]
+    assert not rest.has_next
+
+
+def test_where_clause_narrows_pages(db, make_job):
+    make_job(company='A')
+    wanted = make_job(company='B')
+    make_job(company='A')
+
+    page = fetch_page(db, 'jobs', 'id, created_at', 10, where='company = %s', params=('B',))
+    assert page_ids(page) == [wanted]
+
+
+def test_empty_table(db):
+    page = fetch_page(db, 'jobs', 'id, created_at', 10)
+    assert page.items == [] and not page.has_next and not page.has_prev
+
+
+def test_list_page_links_to_the_next_page(make_app, db, make_job):
+    client = make_app(PAGE_SIZE=2).test_client()
+    for n in range(3):
+        make_job(title=f'공고 {n}')
+    db.commit()
+
+    html = client.get('/job').get_data(as_text=True)
+    assert '공고 2' in html and '공고 1' in html and '공고 0' not in html
+    next_link = unescape(re.search(r'href="([^"]*after=[^"]*)"', html).group(1))
+    html = client.get(next_link).get_data(as_text=True)
+    assert '공고 0' in html and '공고 1' not in html
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+import passwords
+from passwords import HasherBusy, PasswordHasher
+
+
+@pytest.fixture
+def stalled(monkeypatch):
+    """Make hashing and verifying wait until `release` is set"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def stall(result):
+        def run(*args):
+            started.set()
+            release.wait(5)
+            return result
+        return run
+    monkeypatch.setattr(passwords, 'generate_password_hash', stall('pbkdf2:sha256:1000$stalled$hash'))
+    monkeypatch.setattr(passwords, 'check_password_hash', stall(True))
+    yield started, release
+    release.set()
+
+
+def in_background(func, *args, **kwargs):
+    thread = threading.Thread(target=func, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000')
+    password_hash = hasher.hash('비밀번호123')
+    assert hasher.verify(password_hash, '비밀번호123')
+    assert not hasher.verify(password_hash, 'wrong')
+
+
+def test_outdated_hash_is_upgraded_on_login():
+    old = PasswordHasher(method='pbkdf2:sha256:1000').hash('secret')
+    hasher = PasswordHasher(method='pbkdf2:sha256:2000')
+    matches, new_hash = hasher.verify_and_update(old, 'secret')
+    assert matches and new_hash.startswith('pbkdf2:sha256:2000$')
+    assert hasher.verify_and_update(new_hash, 'secret') == (True, None)
+    assert hasher.verify_and_update(old, 'wrong') == (False, None)
+
+
+def test_full_queue_is_rejected(stalled):
+    started, release = stalled
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, max_queue=0)
+    thread = in_background(hasher.hash, 'first')
+    assert started.wait(5)
+
+    with pytest.raises(HasherBusy):
+        hasher.hash('second')
+    release.set()
+    thread.join(5)
+    assert hasher.stats()['rejected'] == 1
+    # The slot is free again
+    assert hasher.hash('third')
+
+
+def test_slow_hash_times_out(stalled):
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', timeout=0.05)
+    with pytest.raises(HasherBusy):
+        hasher.hash('slow')
+    assert hasher.stats()['timeouts'] == 1
+
+
+def test_busy_hasher_answers_503(make_app, stalled):
+    started, release = stalled
+    app = make_app(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0)
+    with app.app_context():
+        from extensions import get_db
+        db = get_db()
+        db.execute("INSERT INTO users (username, email, password_hash) VALUES ('minh', 'minh@example.com', %s)",
+                   ('pbkdf2:sha256:1000$salt$hash',))
+        db.commit()
+    login = {'email': 'minh', 'password': 'secret'}
+
+    thread = in_background(app.test_client().post, '/login', data=login)
+    assert started.wait(5)
+    response = app.test_client().post('/login', data=login)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    release.set()
+    thread.join(5)
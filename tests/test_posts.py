@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import search
+
+
+def log_in(client, user_id=1, user_type='worker'):
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['user_type'] = user_type
+
+
+def test_forum_posts_are_shared_between_workers(make_app):
+    # Two app instances on one database stand in for two gunicorn workers
+    first, second = make_app().test_client(), make_app().test_client()
+
+    response = first.post('/forum/new', data={'author': 'Minh', 'title': '비자 질문', 'content': '연장 방법이 궁금합니다'})
+    assert response.status_code == 302
+    other = second.post('/forum/new', data={'author': 'Anh', 'title': '숙소 정보', 'content': '부산 숙소 추천'})
+    first_id = int(response.headers['Location'].rsplit('/', 1)[1])
+    second_id = int(other.headers['Location'].rsplit('/', 1)[1])
+    assert first_id != second_id
+
+    assert '비자 질문' in second.get(f'/forum/{first_id}').get_data(as_text=True)
+    listing = first.get('/forum').get_data(as_text=True)
+    assert '비자 질문' in listing and '숙소 정보' in listing
+
+
+def test_missing_fields_store_nothing(client, db):
+    client.post('/forum/new', data={'author': 'Minh', 'title': '', 'content': '내용'})
+    assert db.fetchval('SELECT COUNT(*) FROM forum_posts') == 0
+
+
+def test_new_introduction_is_stored_indexed_and_faceted(make_app, db):
+    client = make_app().test_client()
+    log_in(client, user_id=5)
+    before = datetime.now()
+    response = client.post('/intro/new', data={
+        'name': 'Binh', 'nationality': 'vietnam', 'languages': 'Korean, English, Korean',
+        'introduction': '주말 이사 작업 경험이 많습니다',
+    })
+    intro_id = int(response.headers['Location'].rsplit('/', 1)[1])
+
+    intro = db.fetchone('SELECT user_id, languages, created_at FROM introductions WHERE id = %s', (intro_id,))
+    assert intro['user_id'] == 5 and intro['languages'] == 'Korean,English'
+    assert before <= intro['created_at'] <= datetime.now()
+    languages = db.fetchall('SELECT language FROM introduction_languages WHERE intro_id = %s', (intro_id,))
+    assert {row['language'] for row in languages} == {'Korean', 'English'}
+    hits, _ = search.search(db, '이사', 10)
+    assert [(hit['post_type'], hit['post_id']) for hit in hits] == [('intro', intro_id)]
+    assert 'Binh' in make_app().test_client().get('/intro').get_data(as_text=True)
+
+
+def test_new_introduction_needs_login(client, db):
+    response = client.post('/intro/new', data={'name': 'Binh', 'nationality': 'vietnam',
+                                               'languages': 'Korean', 'introduction': '안녕하세요'})
+    assert response.status_code == 302 and '/login' in response.headers['Location']
+    assert db.fetchval('SELECT COUNT(*) FROM introductions') == 0
@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+
+from query_profiler import QueryProfiler, fingerprint
+
+
+@pytest.fixture
+def warnings(caplog):
+    caplog.set_level(logging.WARNING)
+    return lambda: [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+
+
+def test_fingerprint_folds_literals_and_value_lists():
+    assert fingerprint("SELECT * FROM jobs WHERE id = 12 AND title = 'it''s' -- note") == \
+        'SELECT * FROM jobs WHERE id = ? AND title = ?'
+    assert fingerprint('SELECT id FROM jobs WHERE id IN (%s, %s, %s)') == \
+        fingerprint('SELECT id FROM jobs WHERE id IN (?, ?)') == 'SELECT id FROM jobs WHERE id IN (?+)'
+    assert fingerprint('/* a */ SELECT   1.5') == 'SELECT ?'
+
+
+def test_slow_query_is_logged_with_its_plan_once_per_interval(db, warnings):
+    profiler = QueryProfiler(slow_ms=100)
+    sql = 'SELECT * FROM jobs WHERE id = %s'
+    profiler.observe(db, sql, (1,), 0.05, 1)
+    assert warnings() == []
+
+    profiler.observe(db, sql, (1,), 0.25, 1)
+    profiler.observe(db, sql, (2,), 0.3, 0)
+    first, second = warnings()
+    assert first.startswith('Slow query 250.0 ms, 1 rows: SELECT * FROM jobs WHERE id = ?\n')
+    # The plan itself, never the parameters
+    assert 'jobs' in first.split('\n', 1)[1]
+    assert '\n' not in second
+
+    stats = profiler.stats()
+    assert (stats['statements'], stats['slow'], stats['explained']) == (3, 2, 1)
+    assert stats['top'][0]['calls'] == 3 and stats['top'][0]['slow'] == 2
+
+
+def test_failed_explain_is_reported_not_raised(db, warnings):
+    QueryProfiler(slow_ms=1).observe(db, 'SELECT * FROM no_such_table', (), 1.0, 0)
+    assert 'EXPLAIN failed' in warnings()[0]
+
+
+def test_repeated_statements_are_flagged_as_n_plus_one(app, warnings):
+    profiler = QueryProfiler(slow_ms=None, repeat_threshold=3)
+    with app.test_request_context('/job'):
+        for job_id in range(3):
+            profiler.observe(None, 'SELECT * FROM job_reactions WHERE job_id = %s', (job_id,), 0.001, 0)
+        profiler.observe(None, 'SELECT * FROM jobs', (), 0.001, 5)
+        profiler.check_request()
+    assert warnings() == ['Possible N+1: GET /job ran 3 times (3.0 ms): SELECT * FROM job_reactions WHERE job_id = ?']
+    assert profiler.stats()['repeat_requests'] == 1
+
+    with app.test_request_context('/job'):
+        profiler.observe(None, 'SELECT * FROM jobs', (), 0.001, 5)
+        profiler.check_request()
+    assert len(warnings()) == 1
+
+
+def test_requests_feed_the_app_profiler(make_app, warnings):
+    app = make_app(SLOW_QUERY_MS=0, QUERY_REPEAT_THRESHOLD=1)
+    app.test_client().get('/job')
+
+    stats = app.extensions['query_profiler'].stats()
+    assert stats['statements'] > 0 and stats['slow'] == 0
+    assert any(message.startswith('Possible N+1: GET /job') for message in warnings())
@@ -0,0 +1,129 @@
+import pytest
+
+import reaction_buffer
+from db import SQLITE, Database, connect_sqlite
+from reaction_buffer import ReactionBuffer, create_reaction_buffer
+
+
+@pytest.fixture
+def open_db(app, tmp_path):
+    # The same file the app fixture migrated
+    return lambda: Database(connect_sqlite(str(tmp_path / 'test.db')), SQLITE)
+
+
+def release_db(db):
+    db.conn.close()
+
+
+@pytest.fixture
+def buffer(open_db):
+    # Flushed by hand; the background flusher never wakes up during a test
+    buffer = ReactionBuffer(open_db, release_db, max_pending=100, flush_interval_ms=3600 * 1000)
+    yield buffer
+    buffer.stop(flush=False)
+
+
+def stored(db, job_id):
+    rows = db.fetchall('SELECT user_id, emoji FROM job_reactions WHERE job_id = %s', (job_id,))
+    return {(row['user_id'], row['emoji']) for row in rows}
+
+
+def counts(db, job_id):
+    rows = db.fetchall("SELECT emoji, count FROM reaction_counts WHERE post_type = 'job' AND post_id = %s", (job_id,))
+    return {row['emoji']: row['count'] for row in rows if row['count']}
+
+
+def test_toggles_are_written_in_one_flush(db, buffer, make_job):
+    job_id = make_job()
+    db.commit()
+
+    assert buffer.toggle(db, 'job', job_id, 1, '👍', add=True) == {'👍': {'count': 1, 'user_reacted': True}}
+    assert buffer.toggle(db, 'job', job_id, 2, '👍', add=True) == {'👍': {'count': 2, 'user_reacted': True}}
+    assert buffer.toggle(db, 'job', job_id, 2, '❤️', add=True) == {
+        '👍': {'count': 2, 'user_reacted': True}, '❤️': {'count': 1, 'user_reacted': True}}
+    assert buffer.pending_count() == 3 and stored(db, job_id) == set()
+
+    assert buffer.flush() == 3
+    assert buffer.pending_count() == 0
+    assert stored(db, job_id) == {(1, '👍'), (2, '👍'), (2, '❤️')}
+    assert counts(db, job_id) == {'👍': 2, '❤️': 1}
+    assert buffer.flush() == 0
+
+
+def test_react_then_unreact_never_reaches_the_database(db, buffer, make_job):
+    job_id = make_job()
+    db.commit()
+
+    buffer.toggle(db, 'job', job_id, 1, '👍', add=True)
+    assert buffer.toggle(db, 'job', job_id, 1, '👍', add=False) == {}
+    # Reacting twice is one entry, unreacting what is not there is none
+    buffer.toggle(db, 'job', job_id, 2, '🌟', add=True)
+    buffer.toggle(db, 'job', job_id, 2, '🌟', add=True)
+    buffer.toggle(db, 'job', job_id, 3, '🌟', add=False)
+    assert buffer.pending_count() == 1
+    assert buffer.flush() == 1
+    assert stored(db, job_id) == {(2, '🌟')}
+
+
+def test_toggles_on_a_known_post_run_no_query(db, buffer, make_job, monkeypatch):
+    job_id = make_job()
+    db.execute("INSERT INTO job_reactions (job_id, user_id, emoji) VALUES (%s, 7, '👍')", (job_id,))
+    db.commit()
+    buffer.toggle(db, 'job', job_id, 1, '👍', add=True)
+
+    def no_query(*args, **kwargs):
+        pytest.fail('toggle queried the database')
+    for method in ('fetchall', 'fetchone', 'execute'):
+        monkeypatch.setattr(db, method, no_query)
+
+    assert buffer.toggle(db, 'job', job_id, 2, '👍', add=True) == {'👍': {'count': 3, 'user_reacted': True}}
+    buffer.flush()
+    # The snapshot took in what was flushed
+    assert buffer.toggle(db, 'job', job_id, 7, '👍', add=False) == {'👍': {'count': 2, 'user_reacted': False}}
+    assert buffer.toggle(db, 'job', job_id, 1, '👍', add=True) == {'👍': {'count': 2, 'user_reacted': True}}
+
+
+def test_missing_post_and_full_buffer_fall_back(db, open_db, make_job):
+    job_id = make_job()
+    db.commit()
+    buffer = ReactionBuffer(open_db, release_db, max_pending=1, flush_interval_ms=3600 * 1000)
+    try:
+        assert buffer.toggle(db, 'job', 999, 1, '👍', add=True) is None
+        assert buffer.toggle(db, 'job', job_id, 1, '👍', add=True) is not None
+        assert buffer.toggle(db, 'job', job_id, 2, '👍', add=True) is None
+        assert buffer.pending_count() == 1
+    finally:
+        buffer.stop(flush=False)
+
+
+def test_failed_flush_keeps_the_batch(db, buffer, make_job, monkeypatch):
+    job_id = make_job()
+    db.commit()
+    buffer.toggle(db, 'job', job_id, 1, '👍', add=True)
+
+    def broken(db, batch):
+        raise RuntimeError('database went away')
+    monkeypatch.setattr(buffer, '_write', broken)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.pending_count() == 1
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert stored(db, job_id) == {(1, '👍')}
+
+
+def test_pending_toggles_are_flushed_at_exit(db, open_db, make_job, monkeypatch):
+    job_id = make_job()
+    db.commit()
+    at_exit = []
+    monkeypatch.setattr(reaction_buffer.atexit, 'register', at_exit.append)
+
+    buffer = create_reaction_buffer(open_db, release_db, max_pending=100, flush_interval_ms=3600 * 1000)
+    buffer.toggle(db, 'job', job_id, 1, '👍', add=True)
+    assert stored(db, job_id) == set()
+
+    for callback in at_exit:
+        callback()
+    assert stored(db, job_id) == {(1, '👍')}
+    assert buffer.pending_count() == 0
@@ -0,0 +1,153 @@
+import pytest
+
+import reactions
+
+
+def test_reactions_of_many_posts_load_in_one_query(db, make_job, make_intro, monkeypatch):
+    job_id = make_job()
+    intro_id = make_intro()
+    for user_id in (1, 2):
+        reactions.add_reaction(db, 'job', job_id, user_id, '👍')
+    reactions.add_reaction(db, 'job', job_id, 2, '❤️')
+    reactions.add_reaction(db, 'intro', intro_id, 1, '🌟')
+    db.commit()
+
+    queries = []
+    fetchall = db.fetchall
+    monkeypatch.setattr(db, 'fetchall', lambda *args: queries.append(args) or fetchall(*args))
+    loaded = reactions.load_reactions(db, [('job', job_id), ('intro', intro_id), ('job', 999)], user_id=2)
+    assert loaded == {
+        f'job:{job_id}': {'👍': {'count': 2, 'user_reacted': True}, '❤️': {'count': 1, 'user_reacted': True}},
+        f'intro:{intro_id}': {'🌟': {'count': 1, 'user_reacted': False}},
+        'job:999': {},
+    }
+    assert len(queries) == 1
+    assert reactions.load_reactions(db, []) == {}
+
+
+def test_parse_post_keys():
+    assert reactions.parse_post_keys('job:1, intro:2,job:1,forum:3,job:x,') == [('job', 1), ('intro', 2)]
+
+
+def test_bulk_reactions_route(client, db, make_job):
+    job_id = make_job()
+    reactions.add_reaction(db, 'job', job_id, 1, '👍')
+    db.commit()
+
+    response = client.get(f'/reactions?posts=job:{job_id},intro:5')
+    assert response.get_json()['reactions'] == {f'job:{job_id}': {'👍': {'count': 1, 'user_reacted': False}},
+                                                'intro:5': {}}
+    assert client.get('/reactions?posts=forum:1').status_code == 400
+
+
+def raw_counts(db):
+    """{(post_type, post_id, emoji): n} counted from the raw reaction rows"""
+    counts = {}
+    for post_type, spec in reactions.REACTION_TABLES.items():
+        for row in db.fetchall(f'''
+            SELECT {spec['id_field']} AS post_id, emoji, COUNT(*) AS n
+            FROM {spec['table']} GROUP BY {spec['id_field']}, emoji
+        '''):
+            counts[(post_type, row['post_id'], row['emoji'])] = row['n']
+    return counts
+
+
+def stored_counts(db):
+    return {(row['post_type'], row['post_id'], row['emoji']): row['count']
+            for row in db.fetchall('SELECT * FROM reaction_counts WHERE count > 0')}
+
+
+def test_add_and_remove_keep_counters_in_step(db, make_job, make_intro):
+    job_id = make_job()
+    intro_id = make_intro()
+
+    assert reactions.add_reaction(db, 'job', job_id, 1, '👍')
+    # Reacting twice with the same emoji does not count twice
+    assert not reactions.add_reaction(db, 'job', job_id, 1, '👍')
+    reactions.add_reaction(db, 'job', job_id, 2, '👍')
+    reactions.add_reaction(db, 'job', job_id, 2, '❤️')
+    reactions.add_reaction(db, 'intro', intro_id, 1, '🌟')
+    db.commit()
+    assert stored_counts(db) == raw_counts(db) == {
+        ('job', job_id, '👍'): 2, ('job', job_id, '❤️'): 1, ('intro', intro_id, '🌟'): 1}
+
+    assert reactions.remove_reaction(db, 'job', job_id, 1, '👍')
+    # Removing a reaction that is not there changes nothing
+    assert not reactions.remove_reaction(db, 'job', job_id, 1, '👍')
+    db.commit()
+    assert stored_counts(db) == raw_counts(db)
+
+
+def test_rebuild_reaction_counts_repairs_drift(db, make_job, make_intro):
+    job_id = make_job()
+    intro_id = make_intro()
+    for user_id in (1, 2, 3):
+        reactions.add_reaction(db, 'job', job_id, user_id, '👍')
+    reactions.add_reaction(db, 'intro', intro_id, 1, '🌟')
+    db.execute("UPDATE reaction_counts SET count = 99 WHERE post_type = 'job'")
+    db.execute("INSERT INTO reaction_counts (post_type, post_id, emoji, count) VALUES ('intro', 7, '😀', 5)")
+    db.commit()
+
+    assert reactions.rebuild_reaction_counts(db) == 2
+    db.commit()
+    assert stored_counts(db) == raw_counts(db) == {('job', job_id, '👍'): 3, ('intro', intro_id, '🌟'): 1}
+
+
+@pytest.fixture
+def logged_in(client):
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['user_type'] = 'worker'
+    return client
+
+
+def test_reaction_routes(app, logged_in, make_job, db):
+    job_id = make_job()
+    db.commit()
+
+    response = logged_in.post(f'/react/job/{job_id}', json={'emoji': '👍'})
+    assert response.status_code == 200
+    assert response.get_json()['reactions'] == {'👍': {'count': 1, 'user_reacted': True}}
+    assert stored_counts(db) == {('job', job_id, '👍'): 1}
+
+    assert logged_in.post('/react/job/999', json={'emoji': '👍'}).status_code == 404
+    assert logged_in.post('/react/forum/1', json={'emoji': '👍'}).status_code == 400
+    assert app.test_client().post(f'/react/job/{job_id}', json={'emoji': '👍'}).status_code == 401
+
+    response = logged_in.post(f'/unreact/job/{job_id}', json={'emoji': '👍'})
+    assert response.get_json()['reactions'] == {}
+    assert stored_counts(db) == {}
+
+
+def test_react_and_unreact_return_the_updated_reactions(db, make_job, make_intro):
+    job_id = make_job()
+    intro_id = make_intro()
+
+    assert reactions.react(db, 'job', job_id, 1, '👍') == {'👍': {'count': 1, 'user_reacted': True}}
+    assert reactions.react(db, 'job', job_id, 1, '👍') == {'👍': {'count': 1, 'user_reacted': True}}
+    assert reactions.react(db, 'job', job_id, 2, '👍') == {'👍': {'count': 2, 'user_reacted': True}}
+    reactions.react(db, 'job', job_id, 2, '❤️')
+    reactions.react(db, 'intro', intro_id, 1, '🌟')
+    db.commit()
+    assert stored_counts(db) == raw_counts(db)
+
+    remaining = {'👍': {'count': 1, 'user_reacted': False}, '❤️': {'count': 1, 'user_reacted': False}}
+    assert reactions.unreact(db, 'job', job_id, 1, '👍') == remaining
+    assert reactions.unreact(db, 'job', job_id, 1, '👍') == remaining
+    db.commit()
+    assert stored_counts(db) == raw_counts(db)
+
+
+def test_react_to_missing_post(db):
+    assert reactions.react(db, 'job', 999, 1, '👍') is None
+    assert raw_counts(db) == {}
+
+
+def test_write_behind_rejects_missing_post(make_app):
+    app = make_app(REACTION_WRITE_BEHIND=True)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['user_type'] = 'worker'
+
+    assert client.post('/react/job/999', json={'emoji': '👍'}).status_code == 404
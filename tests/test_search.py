@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import search
+
+
+def test_hangul_runs_become_bigrams():
+    assert search.tokenize('서울에서') == ['서울', '울에', '에서']
+    assert search.tokenize('집 구함') == ['집', '구함']
+
+
+def test_other_words_are_lowercased_whole():
+    assert search.tokenize('Moving HELP, 2025!') == ['moving', 'help', '2025']
+    assert search.tokenize('abc가나다') == ['abc', '가나', '나다']
+    assert search.tokenize('') == [] and search.tokenize(None) == []
+
+
+def index(db, post_type, post_id, title, body, keywords=''):
+    search.index_post(db, post_type, post_id, title, keywords, body, datetime(2025, 1, 1))
+
+
+def hit_keys(hits):
+    return [(hit['post_type'], hit['post_id']) for hit in hits]
+
+
+def test_particles_do_not_hide_matches(db):
+    index(db, 'job', 1, '이사 도우미', '서울에서 주말 이사 작업')
+    index(db, 'job', 2, '공장 생산직', '부산 공장')
+    db.commit()
+
+    hits, next_cursor = search.search(db, '서울', 10)
+    assert hit_keys(hits) == [('job', 1)] and next_cursor is None
+    # Every query token must match
+    assert search.search(db, '서울 공장', 10) == ([], None)
+
+
+def test_heading_outranks_body(db):
+    index(db, 'job', 1, '청소 직원', '사무실 이사 후 정리')
+    index(db, 'intro', 1, 'Minh', '이사 경험 많음', keywords='이사')
+    db.commit()
+    hits, _ = search.search(db, '이사', 10)
+    assert hit_keys(hits) == [('intro', 1), ('job', 1)]
+
+
+def test_pages_cover_every_hit_once(db):
+    for post_id in range(1, 8):
+        index(db, 'job' if post_id % 2 else 'intro', post_id, f'모집 {post_id}', '서울 지역 이사')
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        hits, cursor = search.search(db, '서울 이사', 3, after=cursor)
+        assert len(hits) <= 3
+        seen.extend(hit_keys(hits))
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 7
+
+    hits, _ = search.search(db, '서울', 10, post_type='intro')
+    assert {post_type for post_type, _ in hit_keys(hits)} == {'intro'} and len(hits) == 3
+
+
+def test_reindex_and_remove(db):
+    index(db, 'job', 1, '이사', '서울')
+    index(db, 'job', 1, '청소', '부산')
+    db.commit()
+    assert search.search(db, '서울', 10)[0] == []
+    assert hit_keys(search.search(db, '부산', 10)[0]) == [('job', 1)]
+
+    search.remove_post(db, 'job', 1)
+    db.commit()
+    assert search.search(db, '부산', 10)[0] == []
+
+
+def test_rebuild_search_index(db, make_job, make_intro):
+    job_id = make_job(title='이사 도우미', description='서울에서 이사')
+    intro_id = make_intro(name='Minh', introduction='서울에서 일하고 싶습니다')
+    db.commit()
+
+    assert search.rebuild_search_index(db) == 2
+    db.commit()
+    hits, _ = search.search(db, '서울', 10)
+    assert sorted(hit_keys(hits)) == [('intro', intro_id), ('job', job_id)]
+    assert all(isinstance(hit['created_at'], datetime) for hit in hits)
+
+
+def test_search_page(client, db, make_job):
+    job_id = make_job(title='이사 도우미 모집')
+    search.rebuild_search_index(db)
+    db.commit()
+    html = client.get('/search?q=도우미').get_data(as_text=True)
+    assert f'/job/{job_id}' in html
+
+
+def test_registration_indexes_preferences_with_local_time(client, db):
+    before = datetime.now()
+    response = client.post('/register/worker', data={
+        'name': 'Tran', 'username': 'tran01', 'email': 'tran@example.com',
+        'password': 'secret123', 'confirm_password': 'secret123',
+        'nationality': 'vietnam', 'gender': 'male', 'korean_fluent': 'yes', 'languages': ['Korean'],
+        'preferred_jobs': 'moving', 'preferred_location': 'busan', 'availability': 'immediate',
+        'self_intro': '성실하게 일하겠습니다 잘 부탁드립니다', 'privacy_agreement': 'y', 'terms_agreement': 'y',
+    })
+    assert response.status_code == 302
+
+    intro = db.fetchone("SELECT id, created_at FROM introductions WHERE name = 'Tran'")
+    assert before <= intro['created_at'] <= datetime.now()
+    hits, _ = search.search(db, 'busan', 10)
+    assert hit_keys(hits) == [('intro', intro['id'])]
+    assert hits[0]['created_at'] == intro['created_at']
+    assert hit_keys(search.search(db, 'moving', 10)[0]) == [('intro', intro['id'])]